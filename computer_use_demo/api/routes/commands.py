@@ -15,7 +15,10 @@ from computer_use_demo.api.schema import (
 )
 from computer_use_demo.api.services.command_processor import CommandProcessor
 from computer_use_demo.api.utils.result_store import ResultStore
-from computer_use_demo.api.utils.streamlit_bridge import read_commands
+from computer_use_demo.api.utils.streamlit_bridge import (
+    get_command_output,
+    read_commands,
+)
 
 router = APIRouter()
 
@@ -115,6 +118,18 @@ async def get_command_status(
     return response
 
 
+@router.get("/command-output/{command_id}")
+async def get_command_output_since(command_id: str, since: int = 0):
+    """
+    Get output streamed by tools while a command runs. Pass the `output_length` of
+    the previous response as `since` to only get new output.
+    """
+    output = get_command_output(command_id, since)
+    if output is None:
+        raise HTTPException(status_code=404, detail="Command not found")
+    return output
+
+
 @router.get("/pending-commands")
 async def get_pending_commands():
     """Get all commands that are pending or in progress."""
@@ -11,6 +11,9 @@ from typing import Any, Dict, List, Optional
 # Use a location both services can access
 COMMANDS_FILE = Path("/home/computeruse/.anthropic/api_commands.json")
 
+# Only the most recent partial output is kept per command, to bound the file size
+MAX_PARTIAL_OUTPUT_CHARS = 64 * 1024
+
 
 def init_commands_file():
     """Initialize the commands file if it doesn't exist"""
@@ -80,6 +83,47 @@ def mark_command_as_completed(command_id: str, result: Dict[str, Any]):
     return False
 
 
+def append_command_output(
+    command_id: str,
+    text: str,
+    skipped: int = 0,
+    max_chars: int = MAX_PARTIAL_OUTPUT_CHARS,
+):
+    """
+    Append partial tool output to a command while it is being processed, after
+    `skipped` characters of output that were dropped before reaching the bridge
+    """
+    commands = read_commands()
+    for command in commands:
+        if command["id"] == command_id:
+            output = ("" if skipped else command.get("partial_output", "")) + text
+            command["partial_output"] = output[-max_chars:]
+            command["output_length"] = (
+                command.get("output_length", 0) + skipped + len(text)
+            )
+            write_commands(commands)
+            return True
+    return False
+
+
+def get_command_output(command_id: str, since: int = 0) -> Optional[Dict[str, Any]]:
+    """Get the partial output of a command past the first `since` characters"""
+    for command in read_commands():
+        if command["id"] == command_id:
+            output = command.get("partial_output", "")
+            length = command.get("output_length", 0)
+            # the first character still kept in partial_output
+            start = length - len(output)
+            return {
+                "command_id": command_id,
+                "status": command["status"],
+                "output": output[max(0, since - start) :],
+                "output_length": length,
+                "truncated": since < start,
+            }
+    return None
+
+
 def get_pending_commands() -> List[Dict[str, Any]]:
     """Get all pending commands that need processing"""
     commands = read_commands()
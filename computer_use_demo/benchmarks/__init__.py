@@ -0,0 +1,3 @@
+"""
+Micro-benchmarks for the tool implementations, meant to be run inside the container.
+"""
@@ -0,0 +1,77 @@
+"""
+Compare the latency of the screenshot capture backends against a running display.
+
+Usage: python -m computer_use_demo.benchmarks.capture [--iterations N] [--resample FILTER]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from typing import get_args
+
+from computer_use_demo.tools.capture import CAPTURE_BACKENDS, CaptureError
+from computer_use_demo.tools.computer import scaling_target
+from computer_use_demo.tools.imaging import ResampleFilter, encode_png, resize_image
+
+
+def _summary(samples: list[float]) -> str:
+    return f"p50={statistics.median(samples):.1f}ms max={max(samples):.1f}ms"
+
+
+async def bench(
+    name: str, display_num: int | None, iterations: int, resample: ResampleFilter
+):
+    try:
+        backend = CAPTURE_BACKENDS[name](display_num)
+    except CaptureError as e:
+        print(f"{name:>8}: unavailable ({e.message})")  # noqa: T201
+        return
+    grab_ms, resize_ms, encode_ms = [], [], []
+    try:
+        for _ in range(iterations):
+            start = time.perf_counter()
+            frame = await backend.grab()
+            grabbed = time.perf_counter()
+            image = frame.to_image()
+            if target := scaling_target(frame.width, frame.height):
+                image = resize_image(
+                    image, (target["width"], target["height"]), resample=resample
+                )
+            resized = time.perf_counter()
+            encode_png(image)
+            grab_ms.append((grabbed - start) * 1000)
+            resize_ms.append((resized - grabbed) * 1000)
+            encode_ms.append((time.perf_counter() - resized) * 1000)
+    except CaptureError as e:
+        print(f"{name:>8}: failed ({e.message})")  # noqa: T201
+        return
+    finally:
+        backend.close()
+    print(  # noqa: T201
+        f"{name:>8}: grab {_summary(grab_ms)}, resize ({resample}) {_summary(resize_ms)}, "
+        f"encode {_summary(encode_ms)} "
+        f"({frame.width}x{frame.height} -> {image.width}x{image.height}, {iterations} iterations)"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument(
+        "--resample", choices=get_args(ResampleFilter), default="lanczos"
+    )
+    args = parser.parse_args()
+    display_num = os.getenv("DISPLAY_NUM")
+    for name in CAPTURE_BACKENDS:
+        await bench(
+            name,
+            int(display_num) if display_num else None,
+            args.iterations,
+            args.resample,
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
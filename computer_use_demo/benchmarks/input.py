@@ -0,0 +1,78 @@
+"""
+Compare per-action input latency of spawning xdotool, through the shell and directly,
+against in-process XTEST injection.
+
+Usage: python -m computer_use_demo.benchmarks.input [--iterations N]
+"""
+
+import argparse
+import asyncio
+import os
+import shlex
+import statistics
+import time
+
+from computer_use_demo.tools.base import ToolError
+from computer_use_demo.tools.injector import XTestInjector, parse_xdotool
+from computer_use_demo.tools.run import SPAWN_STATS, run
+
+# representative actions, as built by the computer tool
+ACTIONS = {
+    "mouse_move": "mousemove --sync 200 200",
+    "left_click": "click 1",
+    "double_click": "click --repeat 2 --delay 10 1",
+    "key": "key -- ctrl+shift",
+    "scroll": "mousemove --sync 300 300 click --repeat 3 5",
+}
+
+
+def _summary(samples: list[float]) -> str:
+    return f"p50={statistics.median(samples):.1f}ms max={max(samples):.1f}ms"
+
+
+async def bench(display_num: int | None, iterations: int):
+    prefix = f"DISPLAY=:{display_num} " if display_num is not None else ""
+    env = {"DISPLAY": f":{display_num}"} if display_num is not None else None
+    injector = XTestInjector(display_num)
+    try:
+        for action, command in ACTIONS.items():
+            shell_ms, exec_ms, injected_ms = [], [], []
+            argv = ["xdotool", *shlex.split(command)]
+            steps = parse_xdotool(shlex.split(command))
+            for _ in range(iterations):
+                start = time.perf_counter()
+                await run(f"{prefix}xdotool {command}")
+                shell_ms.append((time.perf_counter() - start) * 1000)
+                start = time.perf_counter()
+                await run(argv, env=env)
+                exec_ms.append((time.perf_counter() - start) * 1000)
+                start = time.perf_counter()
+                await injector.run(steps)
+                injected_ms.append((time.perf_counter() - start) * 1000)
+            print(  # noqa: T201
+                f"{action:>12}: sh -c xdotool {_summary(shell_ms)}, "
+                f"xdotool {_summary(exec_ms)}, "
+                f"xtest {_summary(injected_ms)} ({iterations} iterations)"
+            )
+        for label, stats in SPAWN_STATS.summary().items():
+            print(  # noqa: T201
+                f"{label:>14}: p50={stats['p50_ms']:.1f}ms p95={stats['p95_ms']:.1f}ms "
+                f"({stats['count']} spawns, {stats['failures']} failed)"
+            )
+    finally:
+        injector.close()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+    display_num = os.getenv("DISPLAY_NUM")
+    try:
+        await bench(int(display_num) if display_num else None, args.iterations)
+    except ToolError as e:
+        print(f"unavailable ({e.message})")  # noqa: T201
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -2,10 +2,12 @@
 Agentic sampling loop that calls the Anthropic API and local implementation of anthropic-defined computer use tools.
 """
 
+import logging
 import platform
 from collections.abc import Callable
 from datetime import datetime
 from enum import StrEnum
+from functools import partial
 from typing import Any, cast
 
 import httpx
@@ -36,6 +38,8 @@ from .tools import (
     ToolVersion,
 )
 
+logger = logging.getLogger(__name__)
+
 PROMPT_CACHING_BETA_FLAG = "prompt-caching-2024-07-31"
 
 
@@ -84,105 +88,120 @@ async def sampling_loop(
     tool_version: ToolVersion,
     thinking_budget: int | None = None,
     token_efficient_tools_beta: bool = False,
+    tool_output_stream_callback: Callable[[str, str], None] | None = None,
 ):
     """
     Agentic sampling loop for the assistant/tool interaction of computer use.
+
+    `tool_output_stream_callback` receives partial output from tools that stream
+    it, such as bash, along with the tool use id, before `tool_output_callback`
+    receives the final result.
     """
     tool_group = TOOL_GROUPS_BY_VERSION[tool_version]
-    tool_collection = ToolCollection(*(ToolCls() for ToolCls in tool_group.tools))
+    tool_collection = ToolCollection(*tool_group.create_tools())
     system = BetaTextBlockParam(
         type="text",
         text=f"{SYSTEM_PROMPT}{' ' + system_prompt_suffix if system_prompt_suffix else ''}",
     )
 
-    while True:
-        enable_prompt_caching = False
-        betas = [tool_group.beta_flag] if tool_group.beta_flag else []
-        if token_efficient_tools_beta:
-            betas.append("token-efficient-tools-2025-02-19")
-        image_truncation_threshold = only_n_most_recent_images or 0
-        if provider == APIProvider.ANTHROPIC:
-            client = Anthropic(api_key=api_key, max_retries=4)
-            enable_prompt_caching = True
-        elif provider == APIProvider.VERTEX:
-            client = AnthropicVertex()
-        elif provider == APIProvider.BEDROCK:
-            client = AnthropicBedrock()
-
-        if enable_prompt_caching:
-            betas.append(PROMPT_CACHING_BETA_FLAG)
-            _inject_prompt_caching(messages)
-            # Because cached reads are 10% of the price, we don't think it's
-            # ever sensible to break the cache by truncating images
-            only_n_most_recent_images = 0
-            # Use type ignore to bypass TypedDict check until SDK types are updated
-            system["cache_control"] = {"type": "ephemeral"}  # type: ignore
-
-        if only_n_most_recent_images:
-            _maybe_filter_to_n_most_recent_images(
-                messages,
-                only_n_most_recent_images,
-                min_removal_threshold=image_truncation_threshold,
-            )
-        extra_body = {}
-        if thinking_budget:
-            # Ensure we only send the required fields for thinking
-            extra_body = {
-                "thinking": {"type": "enabled", "budget_tokens": thinking_budget}
-            }
-
-        # Call the API
-        # we use raw_response to provide debug information to streamlit. Your
-        # implementation may be able call the SDK directly with:
-        # `response = client.messages.create(...)` instead.
-        try:
-            raw_response = client.beta.messages.with_raw_response.create(
-                max_tokens=max_tokens,
-                messages=messages,
-                model=model,
-                system=[system],
-                tools=tool_collection.to_params(),
-                betas=betas,
-                extra_body=extra_body,
-            )
-        except (APIStatusError, APIResponseValidationError) as e:
-            api_response_callback(e.request, e.response, e)
-            return messages
-        except APIError as e:
-            api_response_callback(e.request, e.body, e)
-            return messages
-
-        api_response_callback(
-            raw_response.http_response.request, raw_response.http_response, None
-        )
-
-        response = raw_response.parse()
-
-        response_params = _response_to_params(response)
-        messages.append(
-            {
-                "role": "assistant",
-                "content": response_params,
-            }
-        )
-
-        tool_result_content: list[BetaToolResultBlockParam] = []
-        for content_block in response_params:
-            output_callback(content_block)
-            if content_block["type"] == "tool_use":
-                result = await tool_collection.run(
-                    name=content_block["name"],
-                    tool_input=cast(dict[str, Any], content_block["input"]),
+    try:
+        while True:
+            enable_prompt_caching = False
+            betas = [tool_group.beta_flag] if tool_group.beta_flag else []
+            if token_efficient_tools_beta:
+                betas.append("token-efficient-tools-2025-02-19")
+            image_truncation_threshold = only_n_most_recent_images or 0
+            if provider == APIProvider.ANTHROPIC:
+                client = Anthropic(api_key=api_key, max_retries=4)
+                enable_prompt_caching = True
+            elif provider == APIProvider.VERTEX:
+                client = AnthropicVertex()
+            elif provider == APIProvider.BEDROCK:
+                client = AnthropicBedrock()
+
+            if enable_prompt_caching:
+                betas.append(PROMPT_CACHING_BETA_FLAG)
+                _inject_prompt_caching(messages)
+                # Because cached reads are 10% of the price, we don't think it's
+                # ever sensible to break the cache by truncating images
+                only_n_most_recent_images = 0
+                # Use type ignore to bypass TypedDict check until SDK types are updated
+                system["cache_control"] = {"type": "ephemeral"}  # type: ignore
+
+            if only_n_most_recent_images:
+                _maybe_filter_to_n_most_recent_images(
+                    messages,
+                    only_n_most_recent_images,
+                    min_removal_threshold=image_truncation_threshold,
                 )
-                tool_result_content.append(
-                    _make_api_tool_result(result, content_block["id"])
+            extra_body = {}
+            if thinking_budget:
+                # Ensure we only send the required fields for thinking
+                extra_body = {
+                    "thinking": {"type": "enabled", "budget_tokens": thinking_budget}
+                }
+
+            # Call the API
+            # we use raw_response to provide debug information to streamlit. Your
+            # implementation may be able call the SDK directly with:
+            # `response = client.messages.create(...)` instead.
+            try:
+                raw_response = client.beta.messages.with_raw_response.create(
+                    max_tokens=max_tokens,
+                    messages=messages,
+                    model=model,
+                    system=[system],
+                    tools=tool_collection.to_params(),
+                    betas=betas,
+                    extra_body=extra_body,
                 )
-                tool_output_callback(result, content_block["id"])
+            except (APIStatusError, APIResponseValidationError) as e:
+                api_response_callback(e.request, e.response, e)
+                return messages
+            except APIError as e:
+                api_response_callback(e.request, e.body, e)
+                return messages
+
+            api_response_callback(
+                raw_response.http_response.request, raw_response.http_response, None
+            )
+
+            response = raw_response.parse()
 
-        if not tool_result_content:
-            return messages
+            response_params = _response_to_params(response)
+            messages.append(
+                {
+                    "role": "assistant",
+                    "content": response_params,
+                }
+            )
 
-        messages.append({"content": tool_result_content, "role": "user"})
+            tool_result_content: list[BetaToolResultBlockParam] = []
+            for content_block in response_params:
+                output_callback(content_block)
+                if content_block["type"] == "tool_use":
+                    result = await tool_collection.run(
+                        name=content_block["name"],
+                        tool_input=cast(dict[str, Any], content_block["input"]),
+                        output_callback=partial(
+                            tool_output_stream_callback, tool_id=content_block["id"]
+                        )
+                        if tool_output_stream_callback
+                        else None,
+                    )
+                    tool_result_content.append(
+                        _make_api_tool_result(result, content_block["id"])
+                    )
+                    tool_output_callback(result, content_block["id"])
+
+            if not tool_result_content:
+                return messages
+
+            messages.append({"content": tool_result_content, "role": "user"})
+    finally:
+        logger.info("tool stats: %s", tool_collection.stats())
+        # release what the tools hold, such as X connections and the bash shell
+        await tool_collection.close()
 
 
 def _maybe_filter_to_n_most_recent_images(
@@ -292,11 +311,13 @@ def _make_api_tool_result(
         is_error = True
         tool_result_content = _maybe_prepend_system_tool_result(result, result.error)
     else:
-        if result.output:
+        if result.output or result.system:
             tool_result_content.append(
                 {
                     "type": "text",
-                    "text": _maybe_prepend_system_tool_result(result, result.output),
+                    "text": _maybe_prepend_system_tool_result(
+                        result, result.output or ""
+                    ),
                 }
             )
         if result.base64_image:
@@ -305,7 +326,7 @@ def _make_api_tool_result(
                     "type": "image",
                     "source": {
                         "type": "base64",
-                        "media_type": "image/png",
+                        "media_type": result.image_media_type or "image/png",
                         "data": result.base64_image,
                     },
                 }
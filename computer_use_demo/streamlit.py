@@ -7,6 +7,7 @@ import base64
 import os
 import random
 import subprocess
+import time
 import traceback
 from contextlib import contextmanager
 from dataclasses import dataclass
@@ -35,6 +36,7 @@ from computer_use_demo.tools import ToolResult, ToolVersion
 # Import the bridge functions
 try:
     from computer_use_demo.api.utils.streamlit_bridge import (
+        append_command_output,
         cleanup_old_commands,
         get_pending_commands,
         mark_command_as_completed,
@@ -45,6 +47,12 @@ try:
 except ImportError:
     BRIDGE_AVAILABLE = False
 
+# the most recent output shown while a tool is running
+STREAM_TAIL_CHARS = 5_000
+# how often output is forwarded to API clients while a tool is running
+BRIDGE_FLUSH_INTERVAL = 0.5  # seconds
+BRIDGE_MAX_UNSENT_CHARS = 64 * 1024
+
 PROVIDER_TO_DEFAULT_MODEL_NAME: dict[APIProvider, str] = {
     APIProvider.ANTHROPIC: "claude-3-7-sonnet-20250219",
     APIProvider.BEDROCK: "anthropic.claude-3-5-sonnet-20241022-v2:0",
@@ -167,6 +175,18 @@ class Sender(StrEnum):
     TOOL = "tool"
 
 
+@dataclass
+class ToolOutputStream:
+    """Partial output of a running tool, shown live and forwarded to API clients."""
+
+    placeholder: DeltaGenerator
+    tail: str = ""
+    unsent: str = ""
+    # characters dropped from unsent because it grew past BRIDGE_MAX_UNSENT_CHARS
+    skipped: int = 0
+    last_flush: float = 0.0
+
+
 def setup_state():
     if "messages" not in st.session_state:
         st.session_state.messages = []
@@ -373,6 +393,7 @@ async def main():
             # we don't have a user message to respond to, exit early
             return
 
+        streams: dict[str, ToolOutputStream] = {}
         with track_sampling_loop():
             # run the agent sampling loop with the newest message
             st.session_state.messages = await sampling_loop(
@@ -382,7 +403,12 @@ async def main():
                 messages=st.session_state.messages,
                 output_callback=partial(_render_message, Sender.BOT),
                 tool_output_callback=partial(
-                    _tool_output_callback, tool_state=st.session_state.tools
+                    _tool_output_callback,
+                    tool_state=st.session_state.tools,
+                    streams=streams,
+                ),
+                tool_output_stream_callback=partial(
+                    _tool_output_stream_callback, streams=streams
                 ),
                 api_response_callback=partial(
                     _api_response_callback,
@@ -500,13 +526,48 @@ def _api_response_callback(
 
 
 def _tool_output_callback(
-    tool_output: ToolResult, tool_id: str, tool_state: dict[str, ToolResult]
+    tool_output: ToolResult,
+    tool_id: str,
+    tool_state: dict[str, ToolResult],
+    streams: dict[str, ToolOutputStream] | None = None,
 ):
     """Handle a tool output by storing it to state and rendering it."""
     tool_state[tool_id] = tool_output
+    if streams and (stream := streams.pop(tool_id, None)):
+        # the final output replaces the partial output
+        _flush_tool_output_stream(stream)
+        stream.placeholder.empty()
     _render_message(Sender.TOOL, tool_output)
 
 
+def _tool_output_stream_callback(
+    chunk: str, tool_id: str, streams: dict[str, ToolOutputStream]
+):
+    """Render partial output of a running tool, and forward it to API clients."""
+    if (stream := streams.get(tool_id)) is None:
+        stream = streams[tool_id] = ToolOutputStream(placeholder=st.empty())
+    stream.tail = (stream.tail + chunk)[-STREAM_TAIL_CHARS:]
+    stream.unsent += chunk
+    if len(stream.unsent) > BRIDGE_MAX_UNSENT_CHARS:
+        stream.skipped += len(stream.unsent) - BRIDGE_MAX_UNSENT_CHARS
+        stream.unsent = stream.unsent[-BRIDGE_MAX_UNSENT_CHARS:]
+    with stream.placeholder.chat_message(Sender.TOOL):
+        st.code(stream.tail)
+    if time.monotonic() - stream.last_flush >= BRIDGE_FLUSH_INTERVAL:
+        _flush_tool_output_stream(stream)
+
+
+def _flush_tool_output_stream(stream: ToolOutputStream):
+    """Forward output not yet sent to the API commands being processed."""
+    stream.last_flush = time.monotonic()
+    if not BRIDGE_AVAILABLE or not stream.unsent:
+        return
+    for cmd_id, cmd_info in st.session_state.api_commands.items():
+        if cmd_info["status"] == "queued":
+            append_command_output(cmd_id, stream.unsent, skipped=stream.skipped)
+    stream.unsent, stream.skipped = "", 0
+
+
 def _render_api_response(
     request: httpx.Request,
     response: httpx.Response | object | None,
@@ -1,13 +1,20 @@
 from abc import ABCMeta, abstractmethod
+from collections.abc import Callable
 from dataclasses import dataclass, fields, replace
-from typing import Any
+from typing import Any, Generic, TypeVar
 
-from anthropic.types.beta import BetaToolUnionParam
+from anthropic.types.beta import BetaToolParam, BetaToolUnionParam
+
+# receives output from a tool as it is produced
+OutputCallback = Callable[[str], None]
 
 
 class BaseAnthropicTool(metaclass=ABCMeta):
     """Abstract base class for Anthropic-defined tools."""
 
+    # whether the tool accepts an `output_callback` to stream partial output to
+    streams_output: bool = False
+
     @abstractmethod
     def __call__(self, **kwargs) -> Any:
         """Executes the tool with the given arguments."""
@@ -19,6 +26,42 @@ class BaseAnthropicTool(metaclass=ABCMeta):
     ) -> BetaToolUnionParam:
         raise NotImplementedError
 
+    async def close(self):  # noqa: B027
+        """Release what the tool holds once it is no longer used."""
+
+    def stats(self) -> dict[str, Any]:
+        """Figures on how the tool has been performing, such as timings."""
+        return {}
+
+    def companion_tools(self) -> list["CompanionTool"]:
+        """Custom tools offered alongside this one, see `CompanionTool`."""
+        return []
+
+
+T = TypeVar("T", bound=BaseAnthropicTool)
+
+
+class CompanionTool(BaseAnthropicTool, Generic[T]):
+    """
+    A custom tool exposing a capability of an Anthropic-defined tool, whose schema
+    can't be extended, under a name, description and input schema of its own.
+    """
+
+    name: str
+    description: str
+    input_schema: dict[str, Any]
+
+    def __init__(self, tool: T):
+        self.tool = tool
+        super().__init__()
+
+    def to_params(self) -> BetaToolParam:
+        return {
+            "name": self.name,
+            "description": self.description,
+            "input_schema": self.input_schema,
+        }
+
 
 @dataclass(kw_only=True, frozen=True)
 class ToolResult:
@@ -27,6 +70,8 @@ class ToolResult:
     output: str | None = None
     error: str | None = None
     base64_image: str | None = None
+    # defaults to image/png when unset
+    image_media_type: str | None = None
     system: str | None = None
 
     def __bool__(self):
@@ -46,6 +91,9 @@ class ToolResult:
             output=combine_fields(self.output, other.output),
             error=combine_fields(self.error, other.error),
             base64_image=combine_fields(self.base64_image, other.base64_image, False),
+            image_media_type=combine_fields(
+                self.image_media_type, other.image_media_type, False
+            ),
             system=combine_fields(self.system, other.system),
         )
 
@@ -54,9 +102,13 @@ class ToolResult:
         return replace(self, **kwargs)
 
 
+@dataclass(kw_only=True, frozen=True)
 class CLIResult(ToolResult):
     """A ToolResult that can be rendered as a CLI output."""
 
+    exit_code: int | None = None
+    duration: float | None = None  # seconds
+
 
 class ToolFailure(ToolResult):
     """A ToolResult that represents a failure."""
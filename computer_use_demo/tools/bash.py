@@ -1,51 +1,256 @@
 import asyncio
+import atexit
+import codecs
+import contextlib
+import logging
 import os
-from typing import Any, Literal
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Literal, get_args
+from uuid import uuid4
 
-from .base import BaseAnthropicTool, CLIResult, ToolError, ToolResult
+from .base import (
+    BaseAnthropicTool,
+    CLIResult,
+    CompanionTool,
+    OutputCallback,
+    ToolError,
+    ToolResult,
+)
+from .run import MAX_RESPONSE_LEN
+from .stats import percentiles_ms
+
+logger = logging.getLogger(__name__)
+
+BASH_SESSION_POOL_SIZE = 2
+
+JobAction = Literal["start", "poll", "tail", "kill", "list"]
+
+
+class _OutputCapture:
+    """
+    The output of a command on one stream. At most `head_bytes` from its start and
+    `tail_bytes` from its end are kept in memory; once it outgrows them, the whole
+    output is written to a spill file instead, up to `max_spill_bytes`.
+    """
+
+    def __init__(
+        self, name: str, head_bytes: int, tail_bytes: int, max_spill_bytes: int
+    ):
+        self.name = name
+        self.head_bytes = head_bytes
+        self.tail_bytes = tail_bytes
+        self.max_spill_bytes = max_spill_bytes
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.size = 0
+        self.spill_path: Path | None = None
+        self.spilled = 0
+        self._spill = None
+
+    @property
+    def elided(self) -> int:
+        """Bytes of output kept neither in the head nor the tail."""
+        return self.size - len(self.head) - len(self.tail)
+
+    def write(self, data: bytes):
+        self.size += len(data)
+        if len(self.head) < self.head_bytes:
+            room = self.head_bytes - len(self.head)
+            self.head += data[:room]
+            data = data[room:]
+        if not data:
+            return
+        if self._spill is None and len(self.tail) + len(data) > self.tail_bytes:
+            spill = tempfile.NamedTemporaryFile(
+                prefix=f"bash_{self.name}_", suffix=".log", delete=False
+            )
+            self._spill, self.spill_path = spill, Path(spill.name)
+            self._write_spill(self.head)
+            self._write_spill(self.tail)
+        if self._spill is not None:
+            self._write_spill(data)
+        self.tail += data
+        del self.tail[: max(0, len(self.tail) - self.tail_bytes)]
+
+    def _write_spill(self, data: bytes | bytearray):
+        assert self._spill
+        data = data[: self.max_spill_bytes - self.spilled]
+        self._spill.write(data)
+        self.spilled += len(data)
+
+    def close(self):
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+
+    def text(self) -> str:
+        """The output, with a note on where to find the part left out, if any."""
+        if not self.elided:
+            return (self.head + self.tail).decode(errors="replace")
+        if self.spilled < self.size:
+            location = f"the first {self.spilled} bytes were saved to {self.spill_path}"
+        else:
+            location = f"the full output was saved to {self.spill_path}"
+        return (
+            self.head.decode(errors="replace")
+            + f"\n<response clipped: {self.elided} of {self.size} bytes of {self.name} "
+            f"were left out; {location}>\n" + self.tail.decode(errors="replace")
+        )
+
+
+def _close_pipes(process: subprocess.Popen):
+    for pipe in (process.stdin, process.stdout, process.stderr):
+        if pipe is not None:
+            with contextlib.suppress(OSError):
+                pipe.close()
+
+
+class _PipedProcess:
+    """
+    A process started with `subprocess.Popen`, whose pipes are read and written
+    through asyncio streams on the event loop it was attached to. Unlike an
+    `asyncio.subprocess.Process`, the process isn't tied to a loop, so it can be
+    started ahead of time and used by whichever loop claims it.
+    """
+
+    def __init__(
+        self,
+        popen: subprocess.Popen,
+        stdin: asyncio.StreamWriter,
+        stdout: asyncio.StreamReader,
+        stderr: asyncio.StreamReader,
+        transports: tuple[asyncio.BaseTransport, ...],
+    ):
+        self.popen = popen
+        self.stdin = stdin
+        self.stdout = stdout
+        self.stderr = stderr
+        self._transports = transports
+
+    @classmethod
+    async def attach(cls, popen: subprocess.Popen) -> "_PipedProcess":
+        assert popen.stdin and popen.stdout and popen.stderr
+        loop = asyncio.get_running_loop()
+        stdout, stderr = asyncio.StreamReader(), asyncio.StreamReader()
+        stdout_transport, _ = await loop.connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(stdout), popen.stdout
+        )
+        stderr_transport, _ = await loop.connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(stderr), popen.stderr
+        )
+        stdin_transport, protocol = await loop.connect_write_pipe(
+            asyncio.streams.FlowControlMixin, popen.stdin
+        )
+        stdin = asyncio.StreamWriter(stdin_transport, protocol, None, loop)
+        return cls(
+            popen,
+            stdin,
+            stdout,
+            stderr,
+            (stdin_transport, stdout_transport, stderr_transport),
+        )
+
+    @property
+    def pid(self) -> int:
+        return self.popen.pid
+
+    @property
+    def returncode(self) -> int | None:
+        return self.popen.poll()
+
+    async def wait(self) -> int:
+        return await asyncio.to_thread(self.popen.wait)
+
+    def detach(self):
+        """Close the pipes, which the process reads as the end of its input."""
+        for transport in self._transports:
+            transport.close()
 
 
 class _BashSession:
     """A session of a bash shell."""
 
     _started: bool
-    _process: asyncio.subprocess.Process
+    _process: _PipedProcess
 
     command: str = "/bin/bash"
-    _output_delay: float = 0.2  # seconds
+    _read_size: int = 64 * 1024  # bytes
     _timeout: float = 120.0  # seconds
     _sentinel: str = "<<exit>>"
+    # output kept in memory per stream, the rest is spilled to a file
+    _head_bytes: int = MAX_RESPONSE_LEN // 2
+    _tail_bytes: int = MAX_RESPONSE_LEN // 2
+    _max_spill_bytes: int = 256 * 1024 * 1024
+    # older spill files are deleted past this many
+    _max_spill_files: int = 10
 
     def __init__(self):
         self._started = False
         self._timed_out = False
+        # bytes read past a sentinel, kept for the next command
+        self._pending: dict[str, bytearray] = {
+            "stdout": bytearray(),
+            "stderr": bytearray(),
+        }
+        self._spill_files: deque[Path] = deque()
 
-    async def start(self):
-        if self._started:
-            return
-
-        self._process = await asyncio.create_subprocess_shell(
-            self.command,
-            preexec_fn=os.setsid,
+    @classmethod
+    def spawn(cls) -> subprocess.Popen:
+        """Start bash in a session of its own, without tying it to an event loop."""
+        return subprocess.Popen(
+            cls.command,
             shell=True,
             bufsize=0,
-            stdin=asyncio.subprocess.PIPE,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            start_new_session=True,
         )
 
+    async def start(self, process: subprocess.Popen | None = None):
+        """Start bash, or take over `process`, a shell started by `spawn`."""
+        if self._started:
+            return
+
+        if process is None:
+            process = await asyncio.to_thread(self.spawn)
+        self._process = await _PipedProcess.attach(process)
+
         self._started = True
 
     def stop(self):
-        """Terminate the bash shell."""
+        """Terminate the bash shell, along with anything it is running."""
         if not self._started:
             raise ToolError("Session has not started.")
-        if self._process.returncode is not None:
-            return
-        self._process.terminate()
+        if self._process.returncode is None:
+            # signal the whole session, /bin/sh may have forked bash rather than
+            # exec'd it
+            with contextlib.suppress(ProcessLookupError):
+                os.killpg(self._process.pid, signal.SIGTERM)
+        self.close()
 
-    async def run(self, command: str):
-        """Execute a command in the bash shell."""
+    def close(self):
+        """
+        Close the pipes to the bash shell, which exits once it has run what it was
+        given. Unlike `stop`, commands it started in the background keep running.
+        """
+        if not self._started:
+            raise ToolError("Session has not started.")
+        while self._spill_files:
+            self._spill_files.popleft().unlink(missing_ok=True)
+        self._process.detach()
+
+    async def run(self, command: str, output_callback: OutputCallback | None = None):
+        """
+        Execute a command in the bash shell, passing its output to `output_callback`
+        as it arrives.
+        """
         if not self._started:
             raise ToolError("Session has not started.")
         if self._process.returncode is not None:
@@ -63,42 +268,413 @@ class _BashSession:
         assert self._process.stdout
         assert self._process.stderr
 
-        # send command to the process
+        # send command to the process, followed by a sentinel unique to it so that
+        # it can't be matched by the command's own output. the sentinel on stdout
+        # carries the exit code, and the one on stderr shows that everything the
+        # command wrote to it has been read.
+        sentinel = f"{self._sentinel.removesuffix('>>')}:{uuid4().hex}>>"
+        start = time.monotonic()
         self._process.stdin.write(
-            command.encode() + f"; echo '{self._sentinel}'\n".encode()
+            command.encode()
+            + f"\nprintf '%s%d\\n' '{sentinel}' $?; echo '{sentinel}' >&2\n".encode()
         )
         await self._process.stdin.drain()
 
-        # read output from the process, until the sentinel is found
+        # read output from the process as it arrives, until the sentinels are found
         try:
             async with asyncio.timeout(self._timeout):
-                while True:
-                    await asyncio.sleep(self._output_delay)
-                    # if we read directly from stdout/stderr, it will wait forever for
-                    # EOF. use the StreamReader buffer directly instead.
-                    output = self._process.stdout._buffer.decode()  # pyright: ignore[reportAttributeAccessIssue]
-                    if self._sentinel in output:
-                        # strip the sentinel and break
-                        output = output[: output.index(self._sentinel)]
-                        break
+                (output, status), (error, _) = await asyncio.gather(
+                    self._read_until_sentinel(
+                        "stdout", self._process.stdout, sentinel, output_callback
+                    ),
+                    self._read_until_sentinel(
+                        "stderr", self._process.stderr, sentinel, output_callback
+                    ),
+                )
+                if status is None:
+                    # bash exited before the sentinel, e.g. on `exit`
+                    status = str(await self._process.wait())
         except asyncio.TimeoutError:
             self._timed_out = True
             raise ToolError(
                 f"timed out: bash has not returned in {self._timeout} seconds and must be restarted",
             ) from None
+        duration = time.monotonic() - start
 
         if output.endswith("\n"):
             output = output[:-1]
-
-        error = self._process.stderr._buffer.decode()  # pyright: ignore[reportAttributeAccessIssue]
         if error.endswith("\n"):
             error = error[:-1]
 
-        # clear the buffers so that the next output can be read correctly
-        self._process.stdout._buffer.clear()  # pyright: ignore[reportAttributeAccessIssue]
-        self._process.stderr._buffer.clear()  # pyright: ignore[reportAttributeAccessIssue]
+        exit_code = int(status)
+        return CLIResult(
+            output=output,
+            error=error,
+            exit_code=exit_code,
+            duration=duration,
+            system=f"exit code {exit_code} after {duration:.2f}s",
+        )
+
+    async def _read_until_sentinel(
+        self,
+        name: str,
+        stream: asyncio.StreamReader,
+        sentinel: str,
+        output_callback: OutputCallback | None = None,
+    ) -> tuple[str, str | None]:
+        """
+        Read `stream` until a line starting with `sentinel`, returning what came
+        before it and the rest of that line, or None for the rest if the stream
+        ended first. Only bytes that may still be part of the sentinel are held
+        back for scanning; the rest go to a bounded `_OutputCapture`.
+        """
+        marker = sentinel.encode()
+        window = self._pending[name]
+        capture = _OutputCapture(
+            name, self._head_bytes, self._tail_bytes, self._max_spill_bytes
+        )
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+        def flush(data: bytes | bytearray, final: bool = False):
+            capture.write(data)
+            if output_callback is not None:
+                if text := decoder.decode(bytes(data), final=final):
+                    output_callback(text)
+
+        try:
+            while True:
+                index = window.find(marker)
+                if index != -1 and (end := window.find(b"\n", index)) != -1:
+                    break
+                if index == -1:
+                    # hold back a tail that could be the start of the sentinel
+                    index = len(window) - next(
+                        (
+                            length
+                            for length in range(
+                                min(len(marker) - 1, len(window)), 0, -1
+                            )
+                            if window.endswith(marker[:length])
+                        ),
+                        0,
+                    )
+                if index:
+                    flush(window[:index])
+                    del window[:index]
+                chunk = await stream.read(self._read_size)
+                if not chunk:
+                    flush(window, final=True)
+                    window.clear()
+                    return capture.text(), None
+                window += chunk
+            flush(window[:index], final=True)
+            rest = window[index + len(marker) : end].decode()
+            del window[: end + 1]
+            return capture.text(), rest
+        finally:
+            # spill files are kept for the agent to read, but only the latest few
+            capture.close()
+            if capture.spill_path is not None:
+                self._spill_files.append(capture.spill_path)
+                while len(self._spill_files) > self._max_spill_files:
+                    self._spill_files.popleft().unlink(missing_ok=True)
 
-        return CLIResult(output=output, error=error)
+
+class BashSessionPool:
+    """
+    Keeps a few bash shells started ahead of time, so that new and restarted
+    sessions don't wait for bash to start. Shells are started and reaped on
+    background threads and only attached to an event loop once claimed, so one pool
+    serves every `sampling_loop`, whichever event loop it runs on.
+    """
+
+    # seconds to wait for a shell to exit before signalling it
+    _exit_timeout: float = 5.0
+
+    def __init__(self, size: int = BASH_SESSION_POOL_SIZE):
+        self.size = size
+        self._ready: deque[subprocess.Popen] = deque()
+        self._lock = threading.Lock()
+        self._spawns: set[threading.Thread] = set()
+        self.spawn_times: deque[float] = deque(maxlen=100)
+        self.claims = 0
+        self.cold_starts = 0
+
+    @classmethod
+    def from_env(cls) -> "BashSessionPool":
+        """A pool of the size set by $BASH_SESSION_POOL_SIZE."""
+        return cls(int(os.getenv("BASH_SESSION_POOL_SIZE") or BASH_SESSION_POOL_SIZE))
+
+    async def claim(self) -> _BashSession:
+        """A session attached to the running event loop, from the pool if one is ready."""
+        process = None
+        with self._lock:
+            self.claims += 1
+            while self._ready and process is None:
+                process = self._ready.popleft()
+                if process.poll() is not None:
+                    _close_pipes(process)
+                    process = None
+            if process is None:
+                self.cold_starts += 1
+        if process is None:
+            process = await asyncio.to_thread(self._spawn)
+        self._refill()
+        session = _BashSession()
+        await session.start(process)
+        return session
+
+    def release(self, session: _BashSession):
+        """
+        Let go of a session that is no longer used, without waiting for its shell to
+        exit. An idle shell exits by itself once its pipes are closed, leaving what
+        it started in the background running; one that timed out is stopped.
+        """
+        if session._timed_out:
+            session.stop()
+        else:
+            session.close()
+        threading.Thread(
+            target=self._reap, args=(session._process.popen,), daemon=True
+        ).start()
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "size": self.size,
+            "ready": len(self._ready),
+            "spawning": len(self._spawns),
+            "claims": self.claims,
+            "cold_starts": self.cold_starts,
+            **percentiles_ms(list(self.spawn_times), "spawn_"),
+        }
+
+    def close(self):
+        """Stop the shells in the pool, once the ones being started are ready."""
+        self._wait_for_spawns()
+        with self._lock:
+            ready = list(self._ready)
+            self._ready.clear()
+        for process in ready:
+            _close_pipes(process)
+            self._reap(process)
+
+    def _wait_for_spawns(self):
+        for thread in list(self._spawns):
+            thread.join()
+
+    def _refill(self):
+        with self._lock:
+            for _ in range(self.size - len(self._ready) - len(self._spawns)):
+                thread = threading.Thread(
+                    target=self._spawn_ready, name="bash-pool", daemon=True
+                )
+                self._spawns.add(thread)
+                thread.start()
+
+    def _spawn(self) -> subprocess.Popen:
+        start = time.monotonic()
+        process = _BashSession.spawn()
+        assert process.stdin and process.stdout
+        # bash is ready once it has run a command
+        ready = _BashSession._sentinel.encode()
+        process.stdin.write(b"echo '" + ready + b"'\n")
+        while (line := process.stdout.readline()) != ready + b"\n":
+            if not line:
+                _close_pipes(process)
+                raise ToolError(
+                    f"bash exited with returncode {process.wait()} as it started"
+                )
+        self.spawn_times.append(time.monotonic() - start)
+        return process
+
+    def _spawn_ready(self):
+        try:
+            process = self._spawn()
+        except Exception:
+            logger.exception("failed to start a pooled bash session")
+            process = None
+        with self._lock:
+            if process is not None:
+                self._ready.append(process)
+            self._spawns.discard(threading.current_thread())
+
+    def _reap(self, process: subprocess.Popen):
+        """Wait for a shell to exit, and signal its whole session if it doesn't."""
+        for sig in (signal.SIGTERM, signal.SIGKILL):
+            try:
+                process.wait(self._exit_timeout)
+                return
+            except subprocess.TimeoutExpired:
+                logger.warning(
+                    "bash session %d did not exit, sending %s", process.pid, sig.name
+                )
+                with contextlib.suppress(ProcessLookupError):
+                    os.killpg(process.pid, sig)
+        process.wait()
+
+
+BASH_SESSION_POOL = BashSessionPool.from_env()
+
+
+class _BashJob:
+    """
+    A command running detached from the bash session, in its own process group.
+    A thread reads its stdout and stderr together into a bounded `_OutputCapture`,
+    so that the job outlives the event loop it was started from.
+    """
+
+    _read_size: int = 64 * 1024  # bytes
+    # seconds to wait for a job to exit after SIGTERM, before SIGKILL
+    _kill_timeout: float = 5.0
+
+    def __init__(
+        self,
+        job_id: int,
+        command: str,
+        cwd: str | None,
+        head_bytes: int,
+        tail_bytes: int,
+        max_spill_bytes: int,
+    ):
+        self.id = job_id
+        self.command = command
+        self.capture = _OutputCapture(
+            f"job{job_id}", head_bytes, tail_bytes, max_spill_bytes
+        )
+        self._lock = threading.Lock()
+        self.start_time = time.monotonic()
+        self.end_time: float | None = None
+        self.process = subprocess.Popen(
+            ["/bin/bash", "-c", command],
+            cwd=cwd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            start_new_session=True,
+        )
+        threading.Thread(
+            target=self._read, name=f"bash-job-{job_id}", daemon=True
+        ).start()
+
+    def _read(self):
+        assert self.process.stdout
+        while chunk := self.process.stdout.read1(self._read_size):
+            with self._lock:
+                self.capture.write(chunk)
+        self.process.stdout.close()
+        self.process.wait()
+        with self._lock:
+            self.capture.close()
+            self.end_time = time.monotonic()
+
+    @property
+    def running(self) -> bool:
+        return self.process.poll() is None
+
+    def status(self) -> str:
+        returncode = self.process.poll()
+        elapsed = (self.end_time or time.monotonic()) - self.start_time
+        if returncode is None:
+            state = "running"
+        elif returncode < 0:
+            state = f"killed by signal {-returncode}"
+        else:
+            state = f"exited with code {returncode}"
+        return (
+            f"job {self.id} {state} after {elapsed:.1f}s, "
+            f"{self.capture.size} bytes of output: {self.command}"
+        )
+
+    def output(self) -> str:
+        """The output so far, clipped like that of a command in the session."""
+        with self._lock:
+            return self.capture.text().removesuffix("\n")
+
+    def tail(self, lines: int) -> str:
+        """The last `lines` lines of output, out of those still in memory."""
+        with self._lock:
+            capture = self.capture
+            tail = bytes(
+                capture.tail if capture.elided else capture.head + capture.tail
+            )
+        return "\n".join(
+            tail.decode(errors="replace").removesuffix("\n").split("\n")[-lines:]
+        )
+
+    async def kill(self):
+        """SIGTERM the job's process group, and SIGKILL it if it doesn't exit."""
+        for sig in (signal.SIGTERM, signal.SIGKILL):
+            with contextlib.suppress(ProcessLookupError):
+                os.killpg(self.process.pid, sig)
+            try:
+                await asyncio.to_thread(self.process.wait, self._kill_timeout)
+                return
+            except subprocess.TimeoutExpired:
+                continue
+
+    def discard(self):
+        """Delete the spill file of a job that has finished."""
+        if self.capture.spill_path is not None:
+            self.capture.spill_path.unlink(missing_ok=True)
+
+
+class BashJobs:
+    """
+    The background jobs of every bash tool. They are kept for the whole process,
+    like the jobs themselves, so that a job started in one `sampling_loop` can
+    still be polled or killed in the next.
+    """
+
+    # finished jobs are forgotten, oldest first, past this many jobs
+    max_jobs: int = 16
+
+    def __init__(self):
+        self._jobs: dict[int, _BashJob] = {}
+        self._next_id = 1
+        # tools on different event loops, and threads, share the jobs
+        self._lock = threading.Lock()
+
+    def start(self, command: str, cwd: str | None) -> _BashJob:
+        with self._lock:
+            if len(self._jobs) >= self.max_jobs:
+                finished = [job for job in self._jobs.values() if not job.running]
+                if not finished:
+                    raise ToolError(
+                        f"{self.max_jobs} jobs are running, kill one before starting another"
+                    )
+                self._jobs.pop(finished[0].id).discard()
+            job = _BashJob(
+                self._next_id,
+                command,
+                cwd,
+                _BashSession._head_bytes,
+                _BashSession._tail_bytes,
+                _BashSession._max_spill_bytes,
+            )
+            self._jobs[job.id] = job
+            self._next_id += 1
+            return job
+
+    def get(self, job_id: int | None) -> _BashJob:
+        with self._lock:
+            if job_id not in self._jobs:
+                raise ToolError(f"no job with {job_id=}")
+            return self._jobs[job_id]
+
+    def jobs(self) -> list[_BashJob]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def close(self):
+        """Kill the jobs still running, so that none outlives the process."""
+        for job in self.jobs():
+            if job.running:
+                with contextlib.suppress(ProcessLookupError):
+                    os.killpg(job.process.pid, signal.SIGKILL)
+
+
+BASH_JOBS = BashJobs()
+atexit.register(BASH_JOBS.close)
 
 
 class BashTool20250124(BaseAnthropicTool):
@@ -111,6 +687,9 @@ class BashTool20250124(BaseAnthropicTool):
 
     api_type: Literal["bash_20250124"] = "bash_20250124"
     name: Literal["bash"] = "bash"
+    streams_output = True
+
+    _job_tail_lines: int = 20
 
     def __init__(self):
         self._session = None
@@ -123,25 +702,135 @@ class BashTool20250124(BaseAnthropicTool):
         }
 
     async def __call__(
-        self, command: str | None = None, restart: bool = False, **kwargs
+        self,
+        command: str | None = None,
+        restart: bool = False,
+        output_callback: OutputCallback | None = None,
+        **kwargs,
     ):
         if restart:
             if self._session:
-                self._session.stop()
-            self._session = _BashSession()
-            await self._session.start()
+                BASH_SESSION_POOL.release(self._session)
+            self._session = await BASH_SESSION_POOL.claim()
 
             return ToolResult(system="tool has been restarted.")
 
         if self._session is None:
-            self._session = _BashSession()
-            await self._session.start()
+            self._session = await BASH_SESSION_POOL.claim()
 
         if command is not None:
-            return await self._session.run(command)
+            return await self._session.run(command, output_callback)
 
         raise ToolError("no command provided.")
 
+    def stats(self) -> dict[str, Any]:
+        return {"session_pool": BASH_SESSION_POOL.stats()}
+
+    async def close(self):
+        """Give the bash session back to the pool, which stops it."""
+        if self._session is not None:
+            BASH_SESSION_POOL.release(self._session)
+            self._session = None
+
+    async def job(
+        self,
+        action: JobAction,
+        command: str | None = None,
+        job_id: int | None = None,
+        lines: int | None = None,
+    ) -> ToolResult:
+        """
+        Start a command as a background job, or poll, tail or kill one, while the
+        bash session stays free for other commands.
+        """
+        if action == "start":
+            if not command:
+                raise ToolError("no command provided.")
+            job = await self._start_job(command)
+            return ToolResult(output=f"started job {job.id}", system=job.status())
+        if action == "list":
+            return ToolResult(
+                output="\n".join(job.status() for job in BASH_JOBS.jobs()) or "no jobs"
+            )
+        if action not in get_args(JobAction):
+            raise ToolError(f"Invalid job action: {action}")
+        job = BASH_JOBS.get(job_id)
+
+        if action == "kill":
+            await job.kill()
+            return ToolResult(output=job.output(), system=job.status())
+        if action == "tail":
+            return ToolResult(
+                output=job.tail(lines or self._job_tail_lines), system=job.status()
+            )
+        # poll: the whole output once the job has finished
+        if job.running:
+            return ToolResult(system=job.status())
+        return CLIResult(
+            output=job.output(),
+            exit_code=job.process.returncode,
+            duration=(job.end_time or time.monotonic()) - job.start_time,
+            system=job.status(),
+        )
+
+    async def _start_job(self, command: str) -> _BashJob:
+        # start the job where the session is, if it can tell
+        cwd = None
+        if self._session is not None:
+            with contextlib.suppress(ToolError):
+                result = await self._session.run("pwd")
+                # a shell that has exited reports that as a plain ToolResult
+                if (
+                    isinstance(result, CLIResult)
+                    and result.exit_code == 0
+                    and os.path.isdir(result.output or "")
+                ):
+                    cwd = result.output
+        return BASH_JOBS.start(command, cwd)
+
+    def companion_tools(self) -> list[CompanionTool]:
+        return [BashJobTool20250124(self)]
+
+
+class BashJobTool20250124(CompanionTool[BashTool20250124]):
+    """Exposes the background jobs of a bash tool."""
+
+    name: Literal["bash_job"] = "bash_job"
+    description = (
+        "Run a long command, such as a build, a test suite or a download, as "
+        "a background job so that the bash tool stays free in the meantime. "
+        "`start` runs `command` with bash in the bash tool's working "
+        "directory, detached from its shell, and returns a job id at once. "
+        "`poll` reports whether a job is still running, and its output once "
+        "it has finished; `tail` shows its last `lines` lines of output so "
+        "far; `kill` stops it; `list` reports every job. Jobs keep running "
+        "until they finish or are killed, even when the bash tool is "
+        "restarted."
+    )
+    input_schema = {
+        "type": "object",
+        "properties": {
+            "action": {"type": "string", "enum": list(get_args(JobAction))},
+            "command": {"type": "string"},
+            "job_id": {"type": "integer"},
+            "lines": {"type": "integer", "minimum": 1},
+        },
+        "required": ["action"],
+    }
+
+    async def __call__(
+        self,
+        *,
+        action: JobAction | None = None,
+        command: str | None = None,
+        job_id: int | None = None,
+        lines: int | None = None,
+        **kwargs,
+    ):
+        if action is None:
+            raise ToolError("no action provided.")
+        return await self.tool.job(action, command, job_id, lines)
+
 
 class BashTool20241022(BashTool20250124):
     api_type: Literal["bash_20241022"] = "bash_20241022"  # pyright: ignore[reportIncompatibleVariableOverride]
@@ -0,0 +1,290 @@
+"""Screen capture backends used by the computer tool."""
+
+import array
+import asyncio
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import zlib
+from abc import ABCMeta, abstractmethod
+from dataclasses import dataclass
+from io import BytesIO
+from pathlib import Path
+from typing import Protocol
+from uuid import uuid4
+
+from PIL import Image
+
+from .base import ToolError
+from .run import run
+
+try:
+    from Xlib import X, display as xdisplay, error as xerror
+
+    XLIB_AVAILABLE = True
+except ImportError:
+    XLIB_AVAILABLE = False
+
+# scrot can only write to a file, so keep it in memory-backed storage where possible
+SCRATCH_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+
+CAPTURE_BACKEND_ENV = "SCREENSHOT_BACKEND"
+
+# (left, top, right, bottom) in screen pixels, right and bottom exclusive
+Box = tuple[int, int, int, int]
+
+
+class CaptureError(ToolError):
+    """Raised when a capture backend is unable to grab the screen."""
+
+
+@dataclass(kw_only=True, frozen=True)
+class Frame:
+    """A captured screen held in memory as raw pixels."""
+
+    width: int
+    height: int
+    data: bytes
+    # raw layout of `data`, as understood by Pillow's raw decoder
+    mode: str = "RGB"
+
+    def to_image(self) -> Image.Image:
+        return Image.frombuffer(
+            "RGB", (self.width, self.height), self.data, "raw", self.mode, 0, 1
+        )
+
+    def checksum(self) -> int:
+        """A cheap checksum of the raw pixels, for detecting changes between frames."""
+        return zlib.crc32(self.data)
+
+    def digest(self) -> bytes:
+        """A collision resistant hash of the raw pixels, for caching derived images."""
+        return hashlib.sha1(self.data, usedforsecurity=False).digest()
+
+
+class CursorImage(Protocol):
+    """The pointer as returned by XFixesGetCursorImage."""
+
+    x: int  # position of the pointer on the screen
+    y: int
+    width: int
+    height: int
+    xhot: int  # hotspot within the image
+    yhot: int
+    cursor_image: list[int]  # premultiplied ARGB, one int per pixel
+
+
+def draw_cursor(
+    frame: Frame, cursor: CursorImage, left: int = 0, top: int = 0
+) -> Frame:
+    """
+    Composite the pointer onto a BGRX `frame`, which shows the screen from
+    (`left`, `top`). The frame is returned unchanged if the pointer lies outside it.
+    """
+    x = cursor.x - cursor.xhot - left
+    y = cursor.y - cursor.yhot - top
+    box = (
+        max(0, x),
+        max(0, y),
+        min(frame.width, x + cursor.width),
+        min(frame.height, y + cursor.height),
+    )
+    if box[0] >= box[2] or box[1] >= box[3]:
+        return frame
+    # Only the pixels under the pointer are composited. Both images are handled
+    # with their channels in BGR order, which compositing doesn't care about: the
+    # pointer's ints are premultiplied BGRA bytes on little-endian hosts.
+    screen = Image.frombuffer(
+        "RGBA", (frame.width, frame.height), frame.data, "raw", "RGBA", 0, 1
+    )
+    pointer = Image.frombuffer(
+        "RGBA",
+        (cursor.width, cursor.height),
+        array.array("I", cursor.cursor_image).tobytes(),
+        "raw",
+        "RGBa",
+        0,
+        1,
+    ).crop((box[0] - x, box[1] - y, box[2] - x, box[3] - y))
+    under = screen.crop(box)
+    # the X byte of BGRX is padding, not alpha
+    under.putalpha(255)
+    under.alpha_composite(pointer)
+    data = bytearray(frame.data)
+    row_size = under.width * 4
+    drawn = under.tobytes()
+    for row in range(under.height):
+        offset = ((box[1] + row) * frame.width + box[0]) * 4
+        data[offset : offset + row_size] = drawn[row * row_size : (row + 1) * row_size]
+    return Frame(width=frame.width, height=frame.height, data=data, mode="BGRX")
+
+
+class CaptureBackend(metaclass=ABCMeta):
+    """Grabs the contents of an X display as a `Frame`."""
+
+    name: str
+    # whether a grab is cheap enough to poll, i.e. does not spawn a process
+    in_process: bool = False
+
+    def __init__(self, display_num: int | None):
+        self.display_num = display_num
+
+    @abstractmethod
+    async def grab(self, box: Box | None = None) -> Frame:
+        """Capture the whole screen, or only the rectangle `box` of it."""
+        ...
+
+    def close(self):  # noqa: B027
+        """Release any resources held by the backend."""
+
+
+class XlibCapture(CaptureBackend):
+    """
+    Captures the screen in-process with XGetImage over a persistent X connection.
+    No subprocess is spawned and nothing is written to disk. XGetImage leaves out
+    the pointer, which is drawn in from XFixes to match what scrot captures.
+    """
+
+    name = "xlib"
+    in_process = True
+
+    def __init__(self, display_num: int | None):
+        super().__init__(display_num)
+        if not XLIB_AVAILABLE:
+            raise CaptureError("python-xlib is not installed")
+        self._display = None
+        self._xfixes = False
+        # python-xlib connections are not thread safe, and grabs run off the event loop
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._display is None:
+            name = f":{self.display_num}" if self.display_num is not None else None
+            try:
+                self._display = xdisplay.Display(name)
+            except (xerror.DisplayError, OSError) as e:
+                raise CaptureError(f"Unable to connect to X display: {e}") from None
+            try:
+                # XFixes requests fail until the client has negotiated a version
+                if self._display.has_extension("XFIXES"):
+                    self._display.xfixes_query_version()
+                    self._xfixes = True
+            except xerror.XError:
+                pass
+        return self._display
+
+    def _cursor(self, display) -> CursorImage | None:
+        """The pointer, or None if the server can't tell what it looks like."""
+        if not self._xfixes:
+            return None
+        try:
+            return display.xfixes_get_cursor_image(None)
+        except xerror.XError:
+            return None
+
+    def _grab(self, box: Box | None) -> Frame:
+        with self._lock:
+            display = self._connect()
+            screen = display.screen()
+            if screen.root_depth not in (24, 32):
+                raise CaptureError(f"Unsupported X display depth {screen.root_depth}")
+            left, top = 0, 0
+            width, height = screen.width_in_pixels, screen.height_in_pixels
+            if box is not None:
+                left, top = max(0, box[0]), max(0, box[1])
+                width = min(width, box[2]) - left
+                height = min(height, box[3]) - top
+                if width <= 0 or height <= 0:
+                    # the caller's mistake, not a failure of the backend
+                    raise ToolError(f"{box} does not overlap the screen")
+            try:
+                image = screen.root.get_image(
+                    left, top, width, height, X.ZPixmap, 0xFFFFFFFF
+                )
+            except (xerror.XError, OSError) as e:
+                # drop the connection so the next grab reconnects
+                self._close()
+                raise CaptureError(f"XGetImage failed: {e}") from None
+            cursor = self._cursor(display)
+        # 24/32 bit ZPixmaps are laid out as little-endian BGRX
+        frame = Frame(width=width, height=height, data=image.data, mode="BGRX")
+        if cursor is not None:
+            frame = draw_cursor(frame, cursor, left, top)
+        return frame
+
+    async def grab(self, box: Box | None = None) -> Frame:
+        return await asyncio.to_thread(self._grab, box)
+
+    def _close(self):
+        if self._display is not None:
+            try:
+                self._display.close()
+            except Exception:
+                pass
+            self._display = None
+            self._xfixes = False
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+
+class ScrotCapture(CaptureBackend):
+    """Captures the screen by shelling out to gnome-screenshot or scrot."""
+
+    name = "scrot"
+
+    def __init__(self, display_num: int | None):
+        super().__init__(display_num)
+        self._display_env = (
+            {"DISPLAY": f":{display_num}"} if display_num is not None else None
+        )
+
+    async def grab(self, box: Box | None = None) -> Frame:
+        path = Path(SCRATCH_DIR) / f"screenshot_{uuid4().hex}.png"
+
+        # Try gnome-screenshot first
+        if shutil.which("gnome-screenshot"):
+            screenshot_cmd = ["gnome-screenshot", "-f", str(path), "-p"]
+        else:
+            # Fall back to scrot if gnome-screenshot isn't available
+            screenshot_cmd = ["scrot", "-p", str(path)]
+
+        try:
+            _, _, stderr = await run(screenshot_cmd, env=self._display_env)
+            if not path.exists():
+                raise CaptureError(f"Failed to take screenshot: {stderr}")
+            png_bytes = path.read_bytes()
+        finally:
+            path.unlink(missing_ok=True)
+
+        with Image.open(BytesIO(png_bytes)) as png:
+            image = png.convert("RGB")
+        if box is not None:
+            image = image.crop(box)
+        return Frame(width=image.width, height=image.height, data=image.tobytes())
+
+
+CAPTURE_BACKENDS: dict[str, type[CaptureBackend]] = {
+    XlibCapture.name: XlibCapture,
+    ScrotCapture.name: ScrotCapture,
+}
+
+
+def select_capture_backend(display_num: int | None) -> CaptureBackend:
+    """
+    Pick the capture backend named by $SCREENSHOT_BACKEND, or the fastest one
+    available when it is unset.
+    """
+    preferred = os.getenv(CAPTURE_BACKEND_ENV)
+    if preferred:
+        if preferred not in CAPTURE_BACKENDS:
+            raise ToolError(
+                f"Unknown screenshot backend {preferred!r}, expected one of {list(CAPTURE_BACKENDS)}"
+            )
+        return CAPTURE_BACKENDS[preferred](display_num)
+    if XLIB_AVAILABLE:
+        return XlibCapture(display_num)
+    return ScrotCapture(display_num)
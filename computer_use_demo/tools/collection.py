@@ -6,6 +6,7 @@ from anthropic.types.beta import BetaToolUnionParam
 
 from .base import (
     BaseAnthropicTool,
+    OutputCallback,
     ToolError,
     ToolFailure,
     ToolResult,
@@ -24,11 +25,32 @@ class ToolCollection:
     ) -> list[BetaToolUnionParam]:
         return [tool.to_params() for tool in self.tools]
 
-    async def run(self, *, name: str, tool_input: dict[str, Any]) -> ToolResult:
+    async def run(
+        self,
+        *,
+        name: str,
+        tool_input: dict[str, Any],
+        output_callback: OutputCallback | None = None,
+    ) -> ToolResult:
         tool = self.tool_map.get(name)
         if not tool:
             return ToolFailure(error=f"Tool {name} is invalid")
+        if output_callback is not None and tool.streams_output:
+            tool_input = {**tool_input, "output_callback": output_callback}
         try:
             return await tool(**tool_input)
         except ToolError as e:
             return ToolFailure(error=e.message)
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """The figures of every tool that reports any, by tool name."""
+        return {
+            name: stats
+            for name, tool in self.tool_map.items()
+            if (stats := tool.stats())
+        }
+
+    async def close(self):
+        """Close every tool; the collection can't be used afterwards."""
+        for tool in self.tools:
+            await tool.close()
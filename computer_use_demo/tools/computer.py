@@ -1,23 +1,73 @@
 import asyncio
 import base64
+import logging
 import os
 import shlex
 import shutil
+import time
+from collections import OrderedDict, deque
+from collections.abc import Hashable
 from enum import StrEnum
+from functools import cache
 from pathlib import Path
-from typing import Literal, TypedDict, cast, get_args
-from uuid import uuid4
+from typing import Any, Literal, TypedDict, cast, get_args
 
-from anthropic.types.beta import BetaToolComputerUse20241022Param, BetaToolUnionParam
+from anthropic.types.beta import (
+    BetaToolComputerUse20241022Param,
+    BetaToolUnionParam,
+)
+
+from .base import BaseAnthropicTool, CompanionTool, ToolError, ToolResult
+from .capture import (
+    Box,
+    CaptureBackend,
+    CaptureError,
+    Frame,
+    ScrotCapture,
+    select_capture_backend,
+)
+from .damage import DamageTracker
+from .imaging import (
+    EncodedImage,
+    EncodingPolicy,
+    ResampleFilter,
+    encode_image,
+    resize_image,
+)
+from .injector import (
+    InjectionError,
+    UnsupportedCommand,
+    XTestInjector,
+    parse_xdotool,
+    select_input_backend,
+)
+from .keyboard import (
+    PASTE_MIN_CHARS,
+    TypingStrategy,
+    choose_typing_strategy,
+    paste_method,
+)
+from .run import SPAWN_STATS, run
+from .settle import SettleResult, SettleStats, wait_for_settle
 
-from .base import BaseAnthropicTool, ToolError, ToolResult
-from .run import run
+logger = logging.getLogger(__name__)
 
 OUTPUT_DIR = "/tmp/outputs"
 
+MAX_ZOOM_SCALE = 4
+
+MAX_BATCH_ACTIONS = 20
+
 TYPING_DELAY_MS = 12
 TYPING_GROUP_SIZE = 50
 
+SCREENSHOT_CACHE_MAX_ENTRIES = 8
+SCREENSHOT_CACHE_MAX_BYTES = 16 * 1024 * 1024
+
+SCREENSHOT_RING_MAX_BYTES = 64 * 1024 * 1024
+
+FILE_EXTENSIONS = {"image/png": "png", "image/jpeg": "jpg", "image/webp": "webp"}
+
 Action_20241022 = Literal[
     "key",
     "type",
@@ -40,11 +90,23 @@ Action_20250124 = (
         "hold_key",
         "wait",
         "triple_click",
+        "zoom",
     ]
 )
 
 ScrollDirection = Literal["up", "down", "left", "right"]
 
+SettleMode = Literal["fixed", "adaptive"]
+
+# actions that only return a screenshot, which a batch takes at the end anyway
+NON_BATCHABLE_ACTIONS = ("screenshot", "zoom")
+BATCHABLE_ACTIONS = [
+    action
+    for actions in get_args(Action_20250124)
+    for action in get_args(actions)
+    if action not in NON_BATCHABLE_ACTIONS
+]
+
 
 class Resolution(TypedDict):
     width: int
@@ -59,6 +121,20 @@ MAX_SCALING_TARGETS: dict[str, Resolution] = {
     "FWXGA": Resolution(width=1366, height=768),  # ~16:9
 }
 
+
+@cache
+def scaling_target(width: int, height: int) -> Resolution | None:
+    """The scaling target matching the aspect ratio of a screen, if it is larger than it."""
+    ratio = width / height
+    for dimension in MAX_SCALING_TARGETS.values():
+        # allow some error in the aspect ratio - not ratios are exactly 16:9
+        if abs(dimension["width"] / dimension["height"] - ratio) < 0.02:
+            if dimension["width"] < width:
+                return dimension
+            break
+    return None
+
+
 CLICK_BUTTONS = {
     "left_click": 1,
     "right_click": 3,
@@ -83,6 +159,121 @@ def chunks(s: str, chunk_size: int) -> list[str]:
     return [s[i : i + chunk_size] for i in range(0, len(s), chunk_size)]
 
 
+class ScreenshotCache:
+    """
+    An LRU cache of screenshot results keyed by a hash of the raw frame, so an
+    unchanged screen is not resized and encoded again.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = SCREENSHOT_CACHE_MAX_ENTRIES,
+        max_bytes: int = SCREENSHOT_CACHE_MAX_BYTES,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[Hashable, ToolResult] = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> ToolResult | None:
+        result = self._entries.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return result
+
+    def put(self, key: Hashable, result: ToolResult):
+        size = len(result.base64_image or "")
+        if size > self.max_bytes or self.max_entries <= 0:
+            return
+        if (previous := self._entries.pop(key, None)) is not None:
+            self._bytes -= len(previous.base64_image or "")
+        self._entries[key] = result
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted.base64_image or "")
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+        }
+
+
+class ScreenshotRing:
+    """
+    Keeps the most recent screenshots on disk for debugging, evicting the oldest
+    files past `max_files` or `max_bytes`.
+    """
+
+    def __init__(
+        self,
+        directory: str = OUTPUT_DIR,
+        max_files: int = 100,
+        max_bytes: int = SCREENSHOT_RING_MAX_BYTES,
+    ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self.bytes_written = 0
+        # pick up files left by earlier runs so they count towards the limits
+        self._files: deque[tuple[Path, int]] = deque(
+            (path, path.stat().st_size)
+            for path in sorted(
+                self.directory.glob("screenshot_*"), key=lambda p: p.stat().st_mtime
+            )
+        )
+        self._bytes = sum(size for _, size in self._files)
+        self._evict()
+
+    @classmethod
+    def from_env(cls) -> "ScreenshotRing | None":
+        """A ring configured by $SCREENSHOT_RING_MAX_FILES, or None if it is unset."""
+        try:
+            max_files = int(os.getenv("SCREENSHOT_RING_MAX_FILES") or 0)
+            max_bytes = int(
+                os.getenv("SCREENSHOT_RING_MAX_BYTES") or SCREENSHOT_RING_MAX_BYTES
+            )
+        except ValueError as e:
+            raise ToolError(f"Invalid screenshot ring setting: {e}") from None
+        if max_files <= 0:
+            return None
+        return cls(max_files=max_files, max_bytes=max_bytes)
+
+    def write(self, image: EncodedImage) -> Path:
+        extension = FILE_EXTENSIONS.get(image.media_type, "img")
+        path = self.directory / f"screenshot_{time.time_ns()}.{extension}"
+        path.write_bytes(image.data)
+        self.bytes_written += len(image.data)
+        self._files.append((path, len(image.data)))
+        self._bytes += len(image.data)
+        self._evict()
+        return path
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "bytes_written": self.bytes_written,
+            "files": len(self._files),
+            "bytes": self._bytes,
+        }
+
+    def _evict(self):
+        while self._files and (
+            len(self._files) > self.max_files or self._bytes > self.max_bytes
+        ):
+            path, size = self._files.popleft()
+            path.unlink(missing_ok=True)
+            self._bytes -= size
+
+
 class BaseComputerTool:
     """
     A tool that allows the agent to interact with the screen, keyboard, and mouse of the current computer.
@@ -94,8 +285,15 @@ class BaseComputerTool:
     height: int
     display_num: int | None
 
+    _capture: CaptureBackend
+    # in adaptive mode, the delay is the longest we wait for the screen to settle
     _screenshot_delay = 2.0
+    _settle_mode: SettleMode = "adaptive"
+    _settle_min_delay = 0.05
+    _settle_interval = 0.05
+    _settle_stable_samples = 3
     _scaling_enabled = True
+    _resample_filter: ResampleFilter = "lanczos"
 
     @property
     def options(self) -> ComputerToolOptions:
@@ -117,11 +315,47 @@ class BaseComputerTool:
         if (display_num := os.getenv("DISPLAY_NUM")) is not None:
             self.display_num = int(display_num)
             self._display_prefix = f"DISPLAY=:{self.display_num} "
+            self._display_env: dict[str, str] | None = {
+                "DISPLAY": f":{self.display_num}"
+            }
         else:
             self.display_num = None
             self._display_prefix = ""
+            self._display_env = None
 
         self.xdotool = f"{self._display_prefix}xdotool"
+        self._capture = select_capture_backend(self.display_num)
+        # xdotool commands are replayed in-process when an injector is available
+        self.injector: XTestInjector | None = select_input_backend(self.display_num)
+        self.settle_stats = SettleStats()
+        self.screenshot_cache = ScreenshotCache()
+        self.encoding_policy = EncodingPolicy.from_env()
+        # screenshots stay in memory unless a debug ring is configured
+        self.screenshot_ring = ScreenshotRing.from_env()
+        # when running, screen changes are known without capturing the screen
+        self.damage = DamageTracker(self.display_num)
+        self.damage.start()
+        self._last_screenshot: tuple[int, Hashable, ToolResult] | None = None
+        # set while running a batch, which takes a single screenshot at the end
+        self._batching = False
+
+    def stats(self) -> dict[str, Any]:
+        stats = {
+            "settle": self.settle_stats.summary(),
+            "screenshot_cache": self.screenshot_cache.stats(),
+            # the processes spawned by every tool, which are mostly this one's
+            "spawns": SPAWN_STATS.summary(),
+        }
+        if self.screenshot_ring is not None:
+            stats["screenshot_ring"] = self.screenshot_ring.stats()
+        return stats
+
+    async def close(self):
+        """Stop tracking damage and close the tool's X connections."""
+        await asyncio.to_thread(self.damage.stop)
+        self._capture.close()
+        if self.injector is not None:
+            self.injector.close()
 
     async def __call__(
         self,
@@ -161,21 +395,7 @@ class BaseComputerTool:
                 command_parts = [self.xdotool, f"key -- {text}"]
                 return await self.shell(" ".join(command_parts))
             elif action == "type":
-                results: list[ToolResult] = []
-                for chunk in chunks(text, TYPING_GROUP_SIZE):
-                    command_parts = [
-                        self.xdotool,
-                        f"type --delay {TYPING_DELAY_MS} -- {shlex.quote(chunk)}",
-                    ]
-                    results.append(
-                        await self.shell(" ".join(command_parts), take_screenshot=False)
-                    )
-                screenshot_base64 = (await self.screenshot()).base64_image
-                return ToolResult(
-                    output="".join(result.output or "" for result in results),
-                    error="".join(result.error or "" for result in results),
-                    base64_image=screenshot_base64,
-                )
+                return await self.type_text(text)
 
         if action in (
             "left_click",
@@ -211,6 +431,87 @@ class BaseComputerTool:
 
         raise ToolError(f"Invalid action: {action}")
 
+    async def type_text(self, text: str) -> ToolResult:
+        """
+        Type `text` directly if it is short, paste it if it is long and the focused
+        window supports pasting, and otherwise type it in delayed chunks.
+        """
+        start = time.monotonic()
+        paste = None
+        if len(text) >= PASTE_MIN_CHARS and shutil.which("xclip"):
+            paste = paste_method(await self._active_window_class())
+        strategy: TypingStrategy = choose_typing_strategy(text, paste is not None)
+
+        results: list[ToolResult] = []
+        if strategy == "paste":
+            assert paste
+            selection, paste_key = paste
+            # xclip forks a child to serve the selection, which would hold on to
+            # any output pipe it inherits, and `run` reads until both are closed.
+            # The text goes to stdin, as it may exceed the limit on an argument.
+            try:
+                returncode, _, _ = await run(
+                    f"{self._display_prefix}xclip -selection {selection} "
+                    ">/dev/null 2>&1",
+                    stdin=text.encode(),
+                )
+            except OSError as e:
+                logger.warning("unable to run xclip: %s", e)
+                returncode = None
+            if returncode is None:
+                strategy = "keystrokes"
+            elif returncode:
+                logger.warning(
+                    "setting the %s selection failed with exit code %d",
+                    selection,
+                    returncode,
+                )
+                strategy = "keystrokes"
+            else:
+                results.append(
+                    await self.shell(
+                        f"{self.xdotool} key -- {paste_key}", take_screenshot=False
+                    )
+                )
+        if strategy == "direct":
+            results.append(
+                await self.shell(
+                    f"{self.xdotool} type --delay 0 -- {shlex.quote(text)}",
+                    take_screenshot=False,
+                )
+            )
+        elif strategy == "keystrokes":
+            for chunk in chunks(text, TYPING_GROUP_SIZE):
+                command_parts = [
+                    self.xdotool,
+                    f"type --delay {TYPING_DELAY_MS} -- {shlex.quote(chunk)}",
+                ]
+                results.append(
+                    await self.shell(" ".join(command_parts), take_screenshot=False)
+                )
+        elapsed = time.monotonic() - start
+
+        screenshot = ToolResult()
+        if not self._batching:
+            # injected text arrives at once, likely before the window redraws it
+            await self.wait_for_settle(f"{self.xdotool} type")
+            screenshot = await self.screenshot()
+        return ToolResult(
+            output="".join(result.output or "" for result in results),
+            error="".join(result.error or "" for result in results),
+            base64_image=screenshot.base64_image,
+            image_media_type=screenshot.image_media_type,
+            system=f"typed {len(text)} characters by {strategy} in {elapsed * 1000:.0f}ms",
+        )
+
+    async def _active_window_class(self) -> str | None:
+        result = await self.shell(
+            f"{self.xdotool} getactivewindow getwindowclassname", take_screenshot=False
+        )
+        if result.error:
+            return None
+        return (result.output or "").strip() or None
+
     def validate_and_get_coordinates(self, coordinate: tuple[int, int] | None = None):
         if not isinstance(coordinate, list) or len(coordinate) != 2:
             raise ToolError(f"{coordinate} must be a tuple of length 2")
@@ -221,56 +522,203 @@ class BaseComputerTool:
 
     async def screenshot(self):
         """Take a screenshot of the current screen and return the base64 encoded image."""
-        output_dir = Path(OUTPUT_DIR)
-        output_dir.mkdir(parents=True, exist_ok=True)
-        path = output_dir / f"screenshot_{uuid4().hex}.png"
+        size = None
+        if self._scaling_enabled and (
+            target := scaling_target(self.width, self.height)
+        ):
+            size = (target["width"], target["height"])
+        settings = (size, self._resample_filter, self.encoding_policy)
+
+        # nothing was damaged since the last screenshot, so it is still current
+        generation = self.damage.generation
+        if self.damage.running and self._last_screenshot is not None:
+            last_generation, last_settings, last_result = self._last_screenshot
+            if generation == last_generation and settings == last_settings:
+                return last_result
+
+        frame = await self._grab_frame()
+        # hashing, resizing and encoding take long enough to stall the event loop
+        cache_key = (
+            await asyncio.to_thread(frame.digest),
+            frame.width,
+            frame.height,
+            settings,
+        )
+        if (result := self.screenshot_cache.get(cache_key)) is None:
+            result = self._image_result(
+                await asyncio.to_thread(self._encode_frame, frame, size)
+            )
+            self.screenshot_cache.put(cache_key, result)
+        self._last_screenshot = (generation, settings, result)
+        return result
+
+    def _encode_frame(
+        self, frame: Frame, size: tuple[int, int] | None, scale: float = 1
+    ) -> EncodedImage:
+        """
+        Resize a frame to `size`, or by `scale`, and encode it with the tool's
+        screenshot settings.
+        """
+        image = frame.to_image()
+        if size is None and scale != 1:
+            size = (round(image.width * scale), round(image.height * scale))
+        if size:
+            image = resize_image(image, size, resample=self._resample_filter)
+        return encode_image(image, self.encoding_policy)
+
+    async def zoom(self, region: list[int] | None, scale: int | float | None = None):
+        """
+        Capture only `region` ([x0, y0, x1, y1] in API coordinates) of the screen at
+        native resolution, optionally upscaled by `scale`.
+        """
+        if (
+            not isinstance(region, list)
+            or len(region) != 4
+            or not all(isinstance(i, int) and i >= 0 for i in region)
+        ):
+            raise ToolError(f"{region=} must be a list of four non-negative ints")
+        if region[0] >= region[2] or region[1] >= region[3]:
+            raise ToolError(f"{region=} must be [x0, y0, x1, y1] with x0 < x1, y0 < y1")
+        if scale is None:
+            scale = 1
+        if not isinstance(scale, (int, float)) or not 1 <= scale <= MAX_ZOOM_SCALE:
+            raise ToolError(f"{scale=} must be a number between 1 and {MAX_ZOOM_SCALE}")
 
-        # Try gnome-screenshot first
-        if shutil.which("gnome-screenshot"):
-            screenshot_cmd = f"{self._display_prefix}gnome-screenshot -f {path} -p"
-        else:
-            # Fall back to scrot if gnome-screenshot isn't available
-            screenshot_cmd = f"{self._display_prefix}scrot -p {path}"
+        width, height = self.scale_coordinates(
+            ScalingSource.COMPUTER, self.width, self.height
+        )
+        if region[2] > width or region[3] > height:
+            raise ToolError(f"{region=} must lie within the {width}x{height} screen")
+
+        left, top = self.scale_coordinates(ScalingSource.API, region[0], region[1])
+        right, bottom = self.scale_coordinates(ScalingSource.API, region[2], region[3])
+        # scaling back up can round past the edge of the screen
+        box = (left, top, min(right, self.width), min(bottom, self.height))
+        frame = await self._grab_frame(box)
+        return self._image_result(
+            await asyncio.to_thread(self._encode_frame, frame, None, scale)
+        )
 
-        result = await self.shell(screenshot_cmd, take_screenshot=False)
-        if self._scaling_enabled:
-            x, y = self.scale_coordinates(
-                ScalingSource.COMPUTER, self.width, self.height
-            )
-            await self.shell(
-                f"convert {path} -resize {x}x{y}! {path}", take_screenshot=False
-            )
+    def _image_result(self, encoded: EncodedImage) -> ToolResult:
+        if self.screenshot_ring is not None:
+            self.screenshot_ring.write(encoded)
+        return ToolResult(
+            base64_image=base64.b64encode(encoded.data).decode(),
+            image_media_type=encoded.media_type,
+        )
 
-        if path.exists():
-            return result.replace(
-                base64_image=base64.b64encode(path.read_bytes()).decode()
-            )
-        raise ToolError(f"Failed to take screenshot: {result.error}")
+    async def _grab_frame(self, box: Box | None = None) -> Frame:
+        """Capture the screen, falling back to scrot if the in-process backend fails."""
+        try:
+            return await self._capture.grab(box)
+        except CaptureError:
+            if self._capture.name == ScrotCapture.name:
+                raise
+            self._capture.close()
+            self._capture = ScrotCapture(self.display_num)
+            return await self._capture.grab(box)
 
     async def shell(self, command: str, take_screenshot=True) -> ToolResult:
         """Run a shell command and return the output, error, and optionally a screenshot."""
-        _, stdout, stderr = await run(command)
-        base64_image = None
+        stdout = await self._inject(command)
+        if stdout is not None:
+            result = ToolResult(output=stdout, error="")
+        else:
+            _, stdout, stderr = await run(
+                self._xdotool_argv(command) or command, env=self._display_env
+            )
+            result = ToolResult(output=stdout, error=stderr)
 
-        if take_screenshot:
+        if take_screenshot and not self._batching:
             # delay to let things settle before taking a screenshot
+            await self.wait_for_settle(command)
+            screenshot = await self.screenshot()
+            result = result.replace(
+                base64_image=screenshot.base64_image,
+                image_media_type=screenshot.image_media_type,
+            )
+
+        return result
+
+    def _xdotool_argv(self, command: str) -> list[str] | None:
+        """
+        The argv of an xdotool command, split like the injector splits it, to run
+        it without a shell; None for other commands.
+        """
+        if not command.startswith(f"{self.xdotool} "):
+            return None
+        try:
+            return ["xdotool", *shlex.split(command.removeprefix(self.xdotool))]
+        except ValueError:
+            return None
+
+    async def _inject(self, command: str) -> str | None:
+        """
+        Replay an xdotool command with the injector, returning its output, or None
+        if the command has to be run as a subprocess instead.
+        """
+        if self.injector is None or not command.startswith(f"{self.xdotool} "):
+            return None
+        try:
+            steps = parse_xdotool(shlex.split(command.removeprefix(self.xdotool)))
+            return await self.injector.run(steps)
+        except UnsupportedCommand as e:
+            logger.debug("running %r with xdotool: %s", command, e)
+            return None
+        except InjectionError as e:
+            # the X server can't be reached in-process, so stop trying
+            logger.warning("input injection disabled: %s", e)
+            self.injector.close()
+            self.injector = None
+            if e.partial:
+                # running the command with xdotool would repeat the input sent
+                raise
+            return None
+
+    async def wait_for_settle(self, command: str) -> SettleResult:
+        """
+        Wait for the screen to stop changing after running `command`. Falls back to
+        the fixed delay when polling the screen would be too expensive.
+        """
+        words = command.removeprefix(self.xdotool).split()
+        label = words[0] if words else command
+        if self._settle_mode == "fixed" or not (
+            self.damage.running or self._capture.in_process
+        ):
             await asyncio.sleep(self._screenshot_delay)
-            base64_image = (await self.screenshot()).base64_image
+            result = SettleResult(
+                label=label, elapsed=self._screenshot_delay, samples=0, settled=True
+            )
+        else:
+            result = await wait_for_settle(
+                self._sample_checksum,
+                label=label,
+                min_delay=self._settle_min_delay,
+                max_delay=self._screenshot_delay,
+                interval=self._settle_interval,
+                stable_samples=self._settle_stable_samples,
+            )
+        self.settle_stats.record(result)
+        logger.debug(
+            "%s settled=%s after %.0fms (%d samples)",
+            label,
+            result.settled,
+            result.elapsed * 1000,
+            result.samples,
+        )
+        return result
 
-        return ToolResult(output=stdout, error=stderr, base64_image=base64_image)
+    async def _sample_checksum(self) -> int:
+        if self.damage.running:
+            # the damage generation only changes when something was drawn
+            return self.damage.generation
+        return (await self._grab_frame()).checksum()
 
     def scale_coordinates(self, source: ScalingSource, x: int, y: int):
         """Scale coordinates to a target maximum resolution."""
         if not self._scaling_enabled:
             return x, y
-        ratio = self.width / self.height
-        target_dimension = None
-        for dimension in MAX_SCALING_TARGETS.values():
-            # allow some error in the aspect ratio - not ratios are exactly 16:9
-            if abs(dimension["width"] / dimension["height"] - ratio) < 0.02:
-                if dimension["width"] < self.width:
-                    target_dimension = dimension
-                break
+        target_dimension = scaling_target(self.width, self.height)
         if target_dimension is None:
             return x, y
         # should be less than 1
@@ -311,8 +759,14 @@ class ComputerTool20250124(BaseComputerTool, BaseAnthropicTool):
         scroll_amount: int | None = None,
         duration: int | float | None = None,
         key: str | None = None,
+        region: list[int] | None = None,
+        scale: int | float | None = None,
         **kwargs,
     ):
+        if action == "zoom":
+            if region is None:
+                raise ToolError(f"region is required for {action}")
+            return await self.zoom(region, scale)
         if action in ("left_mouse_down", "left_mouse_up"):
             if coordinate is not None:
                 raise ToolError(f"coordinate is not accepted for {action=}.")
@@ -372,7 +826,7 @@ class ComputerTool20250124(BaseComputerTool, BaseAnthropicTool):
 
             if action == "wait":
                 await asyncio.sleep(duration)
-                return await self.screenshot()
+                return ToolResult() if self._batching else await self.screenshot()
 
         if action in (
             "left_click",
@@ -400,3 +854,130 @@ class ComputerTool20250124(BaseComputerTool, BaseAnthropicTool):
         return await super().__call__(
             action=action, text=text, coordinate=coordinate, key=key, **kwargs
         )
+
+    async def batch(self, actions: list[dict] | None) -> ToolResult:
+        """
+        Run `actions` back to back, stopping at the first error, and take a single
+        screenshot once the screen has settled after the last one.
+        """
+        if not isinstance(actions, list) or not actions:
+            raise ToolError(f"{actions=} must be a non-empty list")
+        if len(actions) > MAX_BATCH_ACTIONS:
+            raise ToolError(f"A batch is limited to {MAX_BATCH_ACTIONS} actions")
+        for step in actions:
+            if not isinstance(step, dict) or not isinstance(step.get("action"), str):
+                raise ToolError(f"{step=} must be an object with an action")
+            if step["action"] not in BATCHABLE_ACTIONS:
+                raise ToolError(f"{step['action']} is not accepted in a batch")
+
+        lines, error = [], None
+        self._batching = True
+        try:
+            for i, step in enumerate(actions, start=1):
+                try:
+                    result = await self(**step)
+                except ToolError as e:
+                    error = f"Step {i} ({step['action']}) failed: {e.message}"
+                    break
+                if result.error:
+                    error = f"Step {i} ({step['action']}) failed: {result.error}"
+                    break
+                lines.append(f"Step {i} ({step['action']}): {result.output or 'ok'}")
+        finally:
+            self._batching = False
+
+        await self.wait_for_settle("batch")
+        screenshot = await self.screenshot()
+        return ToolResult(
+            output="\n".join(lines),
+            error=error,
+            base64_image=screenshot.base64_image,
+            image_media_type=screenshot.image_media_type,
+        )
+
+    def companion_tools(self) -> list[CompanionTool]:
+        return [ComputerBatchTool20250124(self), ComputerZoomTool20250124(self)]
+
+
+class ComputerBatchTool20250124(CompanionTool[ComputerTool20250124]):
+    """Exposes the batch mode of a computer tool."""
+
+    name: Literal["computer_batch"] = "computer_batch"
+    description = (
+        "Run a sequence of computer tool actions back to back, e.g. click a "
+        "field, type text and press Enter, and return a single screenshot "
+        "after the last one. Stops at the first action that fails and "
+        "reports the output of every action that ran. Accepts the same "
+        "actions and parameters as the computer tool, except for "
+        f"{' and '.join(NON_BATCHABLE_ACTIONS)}."
+    )
+    input_schema = {
+        "type": "object",
+        "properties": {
+            "actions": {
+                "type": "array",
+                "minItems": 1,
+                "maxItems": MAX_BATCH_ACTIONS,
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "action": {"type": "string", "enum": BATCHABLE_ACTIONS},
+                        "text": {"type": "string"},
+                        "coordinate": {
+                            "type": "array",
+                            "items": {"type": "integer", "minimum": 0},
+                            "minItems": 2,
+                            "maxItems": 2,
+                        },
+                        "scroll_direction": {
+                            "type": "string",
+                            "enum": list(get_args(ScrollDirection)),
+                        },
+                        "scroll_amount": {"type": "integer", "minimum": 0},
+                        "duration": {"type": "number", "minimum": 0},
+                        "key": {"type": "string"},
+                    },
+                    "required": ["action"],
+                },
+            }
+        },
+        "required": ["actions"],
+    }
+
+    async def __call__(self, *, actions: list[dict] | None = None, **kwargs):
+        return await self.tool.batch(actions)
+
+
+class ComputerZoomTool20250124(CompanionTool[ComputerTool20250124]):
+    """Exposes the zoom action of a computer tool."""
+
+    name: Literal["computer_zoom"] = "computer_zoom"
+    description = (
+        "Capture only a region of the screen, at the screen's full "
+        "resolution or upscaled by `scale`, to read small text or inspect "
+        "details without taking another screenshot. `region` is "
+        "[x0, y0, x1, y1] in the coordinates of the computer tool's "
+        "screenshots, with x0 < x1 and y0 < y1."
+    )
+    input_schema = {
+        "type": "object",
+        "properties": {
+            "region": {
+                "type": "array",
+                "items": {"type": "integer", "minimum": 0},
+                "minItems": 4,
+                "maxItems": 4,
+            },
+            "scale": {"type": "number", "minimum": 1, "maximum": MAX_ZOOM_SCALE},
+        },
+        "required": ["region"],
+    }
+
+    async def __call__(
+        self,
+        *,
+        region: list[int] | None = None,
+        scale: int | float | None = None,
+        **kwargs,
+    ):
+        return await self.tool(action="zoom", region=region, scale=scale)
@@ -0,0 +1,132 @@
+"""Tracks which parts of the screen changed, using the X DAMAGE extension."""
+
+import select
+import threading
+import time
+
+from .capture import XLIB_AVAILABLE, Box
+
+if XLIB_AVAILABLE:
+    from Xlib import X, display as xdisplay, error as xerror
+    from Xlib.ext import damage as xdamage
+
+# past this many rectangles, dirty regions are merged into their bounding box
+MAX_DIRTY_RECTS = 64
+
+
+class DamageTracker:
+    """
+    Subscribes to damage on the root window from a background thread, and keeps a
+    running set of dirty rectangles and the time of the last change. Reads are O(1)
+    so that callers can check for changes without capturing the screen.
+    """
+
+    def __init__(self, display_num: int | None, max_rects: int = MAX_DIRTY_RECTS):
+        self.display_num = display_num
+        self.max_rects = max_rects
+        # incremented on every damage event
+        self.generation = 0
+        # time.monotonic() of the latest damage event
+        self.last_change: float | None = None
+        self._dirty: list[Box] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> bool:
+        """Start tracking; returns False if the display or extension is unavailable."""
+        if self.running:
+            return True
+        if not XLIB_AVAILABLE:
+            return False
+        name = f":{self.display_num}" if self.display_num is not None else None
+        try:
+            display = xdisplay.Display(name)
+        except (xerror.DisplayError, OSError):
+            return False
+        if not display.has_extension("DAMAGE"):
+            display.close()
+            return False
+        display.damage_query_version()
+        damage = display.screen().root.damage_create(
+            xdamage.DamageReportDeltaRectangles
+        )
+        display.flush()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(display, damage), name="damage", daemon=True
+        )
+        self._thread.start()
+        return True
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def changed_since(self, generation: int) -> bool:
+        return self.generation != generation
+
+    def quiet_for(self) -> float:
+        """Seconds since the screen last changed, infinite if it never has."""
+        if self.last_change is None:
+            return float("inf")
+        return time.monotonic() - self.last_change
+
+    def dirty_rects(self, clear: bool = False) -> list[Box]:
+        """The rectangles damaged since the last clear."""
+        with self._lock:
+            rects = list(self._dirty)
+            if clear:
+                self._dirty.clear()
+        return rects
+
+    def _record(self, rect: Box):
+        with self._lock:
+            self._dirty.append(rect)
+            if len(self._dirty) > self.max_rects:
+                self._dirty = [
+                    (
+                        min(r[0] for r in self._dirty),
+                        min(r[1] for r in self._dirty),
+                        max(r[2] for r in self._dirty),
+                        max(r[3] for r in self._dirty),
+                    )
+                ]
+            self.last_change = time.monotonic()
+            self.generation += 1
+
+    def _run(self, display, damage):
+        notify = display.extension_event.DamageNotify
+        try:
+            while not self._stop.is_set():
+                if not display.pending_events():
+                    select.select([display], [], [], 0.1)
+                    continue
+                while display.pending_events():
+                    event = display.next_event()
+                    if event.type & 0x7F == notify:
+                        area = event.area
+                        self._record(
+                            (
+                                area.x,
+                                area.y,
+                                area.x + area.width,
+                                area.y + area.height,
+                            )
+                        )
+                # reset the damage region so that further changes are reported again
+                display.damage_subtract(damage, X.NONE, X.NONE)
+                display.flush()
+        except (xerror.ConnectionClosedError, OSError):
+            pass
+        finally:
+            try:
+                display.close()
+            except Exception:
+                pass
@@ -1,9 +1,15 @@
-from collections import defaultdict
+import codecs
+import itertools
+import zlib
+from collections import deque
 from pathlib import Path
 from typing import Any, Literal, get_args
 
-from .base import BaseAnthropicTool, CLIResult, ToolError, ToolResult
-from .run import maybe_truncate, run
+from .base import BaseAnthropicTool, CLIResult, CompanionTool, ToolError, ToolResult
+from .lines import LineIndex, LineIndexCache
+from .listing import DirectoryCache, list_directory
+from .offload import Offloader
+from .run import MAX_RESPONSE_LEN, maybe_truncate
 
 Command = Literal[
     "view",
@@ -12,7 +18,230 @@ Command = Literal[
     "insert",
     "undo_edit",
 ]
+# the commands that can be applied together by `batch`
+BatchCommand = Literal["str_replace", "insert"]
+# the type of each parameter an edit of a batch may have
+BATCH_EDIT_PARAMS: dict[str, type] = {
+    "old_str": str,
+    "new_str": str,
+    "insert_line": int,
+}
+MAX_BATCH_EDITS: int = 50
 SNIPPET_LINES: int = 4
+# compressed bytes of undo history kept per file and across all files
+HISTORY_MAX_FILE_BYTES: int = 8 * 1024 * 1024
+HISTORY_MAX_BYTES: int = 32 * 1024 * 1024
+# files from this size on are viewed through a line index instead of read whole
+VIEW_INDEX_MIN_BYTES: int = 1024 * 1024
+# threads reading, writing and formatting files, shared by every edit tool
+EDIT_IO_WORKERS: int = 4
+
+# file I/O and formatting run here, so that large files don't stall the event loop
+EDIT_IO = Offloader(EDIT_IO_WORKERS, "edit-io")
+
+
+def _replace_unique(
+    text: str, old_str: str, new_str: str, path: Path
+) -> tuple[str, int]:
+    """
+    Replace the only occurrence of `old_str` in `text`, returning the new text and
+    where the replacement starts.
+    """
+    # find old_str, and check that it doesn't appear again after that
+    index = text.find(old_str)
+    if index == -1:
+        raise ToolError(
+            f"No replacement was performed, old_str `{old_str}` did not appear verbatim in {path}."
+        )
+    if text.find(old_str, index + max(len(old_str), 1)) != -1:
+        lines = _match_lines(text, old_str, index)
+        raise ToolError(
+            f"No replacement was performed. Multiple occurrences of old_str `{old_str}` in lines {lines}. Please ensure it is unique"
+        )
+    return text[:index] + new_str + text[index + len(old_str) :], index
+
+
+def _insert_at_line(text: str, insert_line: int, new_str: str) -> tuple[str, int]:
+    """
+    Insert `new_str` as lines after line `insert_line` of `text` (0 for the
+    start), returning the new text and where the insertion starts.
+    """
+    n_lines_file = text.count("\n") + 1
+    if insert_line < 0 or insert_line > n_lines_file:
+        raise ToolError(
+            f"Invalid `insert_line` parameter: {insert_line}. It should be within the range of lines of the file: {[0, n_lines_file]}"
+        )
+    if insert_line == n_lines_file:
+        return text + "\n" + new_str, len(text) + 1
+    index = len(text) - len(text.split("\n", insert_line)[-1])
+    return text[:index] + new_str + "\n" + text[index:], index
+
+
+def _match_lines(text: str, sub: str, index: int) -> list[int]:
+    """The lines on which `sub` occurs in `text`, from its occurrence at `index` on."""
+    lines: list[int] = []
+    line, position = 1, 0
+    while index != -1:
+        line += text.count("\n", position, index)
+        if not lines or lines[-1] != line:
+            lines.append(line)
+        position = index
+        index = text.find(sub, index + max(len(sub), 1))
+    return lines
+
+
+def _line_start(text: str, index: int, lines_before: int) -> int:
+    """Where the line `lines_before` lines above the one at `index` starts."""
+    for _ in range(lines_before + 1):
+        index = text.rfind("\n", 0, index)
+        if index == -1:
+            return 0
+    return index + 1
+
+
+def _line_end(text: str, index: int, lines_after: int) -> int:
+    """Where the line `lines_after` lines below the one at `index` ends."""
+    index -= 1
+    for _ in range(lines_after + 1):
+        index = text.find("\n", index + 1)
+        if index == -1:
+            return len(text)
+    return index
+
+
+def _track_regions(
+    regions: list[tuple[int, int]],
+    start: int,
+    end: int,
+    delta: int,
+    edited: tuple[int, int],
+) -> list[tuple[int, int]]:
+    """
+    Move `regions` of a text for an edit that replaced its `start` to `end` and
+    changed its length by `delta`, and add the `edited` region, merging it with
+    the regions it overlaps.
+    """
+    tracked = []
+    edited_start, edited_end = edited
+    for region_start, region_end in regions:
+        if region_end < start:
+            tracked.append((region_start, region_end))
+        elif region_start > end:
+            tracked.append((region_start + delta, region_end + delta))
+        else:
+            edited_start = min(edited_start, region_start)
+            if region_end > end:
+                edited_end = max(edited_end, region_end + delta)
+    tracked.append((edited_start, edited_end))
+    return sorted(tracked)
+
+
+def _snippet_windows(
+    text: str, regions: list[tuple[int, int]]
+) -> list[tuple[int, int]]:
+    """The snippets around sorted `regions` of `text`, merged where they overlap."""
+    windows: list[tuple[int, int]] = []
+    for region_start, region_end in regions:
+        start = _line_start(text, region_start, SNIPPET_LINES)
+        end = _line_end(text, region_end, SNIPPET_LINES)
+        if windows and start <= windows[-1][1] + 1:
+            windows[-1] = (windows[-1][0], max(windows[-1][1], end))
+        else:
+            windows.append((start, end))
+    return windows
+
+
+class FileHistory:
+    """
+    Prior versions of edited files for `undo_edit`, stored zlib-compressed. Past
+    `max_file_bytes` for a file or `max_bytes` in total, the oldest versions are
+    dropped first.
+    """
+
+    def __init__(
+        self,
+        max_file_bytes: int = HISTORY_MAX_FILE_BYTES,
+        max_bytes: int = HISTORY_MAX_BYTES,
+    ):
+        self.max_file_bytes = max_file_bytes
+        self.max_bytes = max_bytes
+        self._versions: dict[Path, deque[tuple[int, bytes]]] = {}
+        self._file_bytes: dict[Path, int] = {}
+        self._bytes = 0
+        # (sequence number, path) of every version, oldest first; versions that
+        # were undone or dropped for their file are skipped when evicting
+        self._order: deque[tuple[int, Path]] = deque()
+        self._seq = itertools.count()
+
+    def push(self, path: Path, text: str):
+        blob = zlib.compress(text.encode(errors="surrogatepass"), 1)
+        if len(blob) > min(self.max_file_bytes, self.max_bytes):
+            # older versions can't be undone to without undoing this one first
+            self.forget(path)
+            return
+        seq = next(self._seq)
+        self._versions.setdefault(path, deque()).append((seq, blob))
+        self._file_bytes[path] = self._file_bytes.get(path, 0) + len(blob)
+        self._bytes += len(blob)
+        self._order.append((seq, path))
+
+        while self._file_bytes[path] > self.max_file_bytes:
+            self._drop_oldest(path)
+        while self._bytes > self.max_bytes:
+            seq, oldest = self._order.popleft()
+            if (versions := self._versions.get(oldest)) and versions[0][0] == seq:
+                self._drop_oldest(oldest)
+        if len(self._order) > 2 * sum(map(len, self._versions.values())) + 64:
+            self._order = deque(
+                sorted(
+                    (seq, path)
+                    for path, versions in self._versions.items()
+                    for seq, _ in versions
+                )
+            )
+
+    def pop(self, path: Path) -> str | None:
+        """The latest version of `path`, removed from the history."""
+        if not (versions := self._versions.get(path)):
+            return None
+        _, blob = versions.pop()
+        self._forget_bytes(path, len(blob))
+        return zlib.decompress(blob).decode(errors="surrogatepass")
+
+    def versions(self, path: Path) -> list[str]:
+        """Every version of `path` kept, oldest first."""
+        return [
+            zlib.decompress(blob).decode(errors="surrogatepass")
+            for _, blob in self._versions.get(path, ())
+        ]
+
+    def forget(self, path: Path):
+        for _, blob in self._versions.pop(path, ()):
+            self._forget_bytes(path, len(blob))
+
+    def clear(self):
+        self._versions.clear()
+        self._file_bytes.clear()
+        self._bytes = 0
+        self._order.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "files": len(self._versions),
+            "versions": sum(map(len, self._versions.values())),
+            "bytes": self._bytes,
+        }
+
+    def _drop_oldest(self, path: Path):
+        _, blob = self._versions[path].popleft()
+        self._forget_bytes(path, len(blob))
+
+    def _forget_bytes(self, path: Path, size: int):
+        self._bytes -= size
+        self._file_bytes[path] -= size
+        if not self._file_bytes[path]:
+            del self._file_bytes[path]
+            self._versions.pop(path, None)
 
 
 class EditTool20250124(BaseAnthropicTool):
@@ -24,12 +253,17 @@ class EditTool20250124(BaseAnthropicTool):
     api_type: Literal["text_editor_20250124"] = "text_editor_20250124"
     name: Literal["str_replace_editor"] = "str_replace_editor"
 
-    _file_history: dict[Path, list[str]]
+    _file_history: FileHistory
 
     def __init__(self):
-        self._file_history = defaultdict(list)
+        self._file_history = FileHistory()
+        self._line_indexes = LineIndexCache()
+        self._directory_cache = DirectoryCache()
         super().__init__()
 
+    def stats(self) -> dict[str, Any]:
+        return {"io": EDIT_IO.stats.summary(), "history": self._file_history.stats()}
+
     def to_params(self) -> Any:
         return {
             "name": self.name,
@@ -55,15 +289,15 @@ class EditTool20250124(BaseAnthropicTool):
         elif command == "create":
             if file_text is None:
                 raise ToolError("Parameter `file_text` is required for command: create")
-            self.write_file(_path, file_text)
-            self._file_history[_path].append(file_text)
-            return ToolResult(output=f"File created successfully at: {_path}")
+            return await EDIT_IO.run("create", self.create, _path, file_text)
         elif command == "str_replace":
             if old_str is None:
                 raise ToolError(
                     "Parameter `old_str` is required for command: str_replace"
                 )
-            return self.str_replace(_path, old_str, new_str)
+            return await EDIT_IO.run(
+                "str_replace", self.str_replace, _path, old_str, new_str
+            )
         elif command == "insert":
             if insert_line is None:
                 raise ToolError(
@@ -71,9 +305,9 @@ class EditTool20250124(BaseAnthropicTool):
                 )
             if new_str is None:
                 raise ToolError("Parameter `new_str` is required for command: insert")
-            return self.insert(_path, insert_line, new_str)
+            return await EDIT_IO.run("insert", self.insert, _path, insert_line, new_str)
         elif command == "undo_edit":
-            return self.undo_edit(_path)
+            return await EDIT_IO.run("undo_edit", self.undo_edit, _path)
         raise ToolError(
             f'Unrecognized command {command}. The allowed commands for the {self.name} tool are: {", ".join(get_args(Command))}'
         )
@@ -112,36 +346,32 @@ class EditTool20250124(BaseAnthropicTool):
                     "The `view_range` parameter is not allowed when `path` points to a directory."
                 )
 
-            _, stdout, stderr = await run(
-                rf"find {path} -maxdepth 2 -not -path '*/\.*'"
-            )
+            listing = self._directory_cache.get(path)
+            if listing is None:
+                listing = await EDIT_IO.run("list", list_directory, path)
+                self._directory_cache.put(path, listing)
+            stdout = "\n".join(listing.paths) + "\n"
+            if listing.truncated:
+                stdout += f"<response clipped: only the first {len(listing.paths) - 1} entries are listed>\n"
+            stderr = "\n".join(listing.errors)
             if not stderr:
                 stdout = f"Here's the files and directories up to 2 levels deep in {path}, excluding hidden items:\n{stdout}\n"
             return CLIResult(output=stdout, error=stderr)
 
+        return await EDIT_IO.run("view", self.view_file, path, view_range)
+
+    def view_file(self, path: Path, view_range: list[int] | None = None):
+        """View a file, or the lines of it in `view_range`."""
+        if (index := self._line_index(path)) is not None:
+            return self._view_indexed(path, index, view_range)
+
         file_content = self.read_file(path)
         init_line = 1
         if view_range:
-            if len(view_range) != 2 or not all(isinstance(i, int) for i in view_range):
-                raise ToolError(
-                    "Invalid `view_range`. It should be a list of two integers."
-                )
             file_lines = file_content.split("\n")
-            n_lines_file = len(file_lines)
-            init_line, final_line = view_range
-            if init_line < 1 or init_line > n_lines_file:
-                raise ToolError(
-                    f"Invalid `view_range`: {view_range}. Its first element `{init_line}` should be within the range of lines of the file: {[1, n_lines_file]}"
-                )
-            if final_line > n_lines_file:
-                raise ToolError(
-                    f"Invalid `view_range`: {view_range}. Its second element `{final_line}` should be smaller than the number of lines in the file: `{n_lines_file}`"
-                )
-            if final_line != -1 and final_line < init_line:
-                raise ToolError(
-                    f"Invalid `view_range`: {view_range}. Its second element `{final_line}` should be larger or equal than its first `{init_line}`"
-                )
-
+            init_line, final_line = self._validate_view_range(
+                view_range, len(file_lines)
+            )
             if final_line == -1:
                 file_content = "\n".join(file_lines[init_line - 1 :])
             else:
@@ -151,44 +381,94 @@ class EditTool20250124(BaseAnthropicTool):
             output=self._make_output(file_content, str(path), init_line=init_line)
         )
 
-    def str_replace(self, path: Path, old_str: str, new_str: str | None):
-        """Implement the str_replace command, which replaces old_str with new_str in the file content"""
-        # Read the file content
-        file_content = self.read_file(path).expandtabs()
-        old_str = old_str.expandtabs()
-        new_str = new_str.expandtabs() if new_str is not None else ""
+    def _line_index(self, path: Path) -> LineIndex | None:
+        """A line index of `path` if it is large enough to be worth one."""
+        try:
+            if path.stat().st_size < VIEW_INDEX_MIN_BYTES:
+                return None
+            return self._line_indexes.get(path)
+        except OSError:
+            return None
+
+    def _view_indexed(
+        self, path: Path, index: LineIndex, view_range: list[int] | None
+    ) -> CLIResult:
+        """View a large file, reading only the lines shown."""
+        init_line, final_line = 1, index.line_count
+        if view_range:
+            init_line, final_line = self._validate_view_range(
+                view_range, index.line_count
+            )
+            if final_line == -1:
+                final_line = index.line_count
+        # the output is truncated after MAX_RESPONSE_LEN characters of 4 bytes at most
+        max_bytes = 4 * (MAX_RESPONSE_LEN + 1)
+        data = index.read(init_line, final_line, max_bytes)
+        try:
+            decoder = codecs.getincrementaldecoder("utf-8")()
+            file_content = decoder.decode(data, final=len(data) < max_bytes)
+        except UnicodeDecodeError as e:
+            raise ToolError(f"Ran into {e} while trying to read {path}") from None
+        return CLIResult(
+            output=self._make_output(
+                file_content.replace("\r\n", "\n"), str(path), init_line=init_line
+            )
+        )
 
-        # Check if old_str is unique in the file
-        occurrences = file_content.count(old_str)
-        if occurrences == 0:
+    def _validate_view_range(
+        self, view_range: list[int], n_lines_file: int
+    ) -> tuple[int, int]:
+        if len(view_range) != 2 or not all(isinstance(i, int) for i in view_range):
             raise ToolError(
-                f"No replacement was performed, old_str `{old_str}` did not appear verbatim in {path}."
+                "Invalid `view_range`. It should be a list of two integers."
             )
-        elif occurrences > 1:
-            file_content_lines = file_content.split("\n")
-            lines = [
-                idx + 1
-                for idx, line in enumerate(file_content_lines)
-                if old_str in line
-            ]
+        init_line, final_line = view_range
+        if init_line < 1 or init_line > n_lines_file:
+            raise ToolError(
+                f"Invalid `view_range`: {view_range}. Its first element `{init_line}` should be within the range of lines of the file: {[1, n_lines_file]}"
+            )
+        if final_line > n_lines_file:
             raise ToolError(
-                f"No replacement was performed. Multiple occurrences of old_str `{old_str}` in lines {lines}. Please ensure it is unique"
+                f"Invalid `view_range`: {view_range}. Its second element `{final_line}` should be smaller than the number of lines in the file: `{n_lines_file}`"
             )
+        if final_line != -1 and final_line < init_line:
+            raise ToolError(
+                f"Invalid `view_range`: {view_range}. Its second element `{final_line}` should be larger or equal than its first `{init_line}`"
+            )
+        return init_line, final_line
 
-        # Replace old_str with new_str
-        new_file_content = file_content.replace(old_str, new_str)
+    def create(self, path: Path, file_text: str):
+        """Implement the create command, which writes file_text to a new file."""
+        self.write_file(path, file_text)
+        self._file_history.push(path, file_text)
+        return ToolResult(output=f"File created successfully at: {path}")
+
+    def str_replace(self, path: Path, old_str: str, new_str: str | None):
+        """Implement the str_replace command, which replaces old_str with new_str in the file content"""
+        # Read the file content
+        file_content = self.read_file(path)
+        if "\t" in file_content:
+            file_content = file_content.expandtabs()
+        old_str = old_str.expandtabs()
+        new_str = new_str.expandtabs() if new_str is not None else ""
+
+        # Replace old_str with new_str, if it appears exactly once
+        new_file_content, index = _replace_unique(file_content, old_str, new_str, path)
 
         # Write the new content to the file
         self.write_file(path, new_file_content)
 
         # Save the content to history
-        self._file_history[path].append(file_content)
+        self._file_history.push(path, file_content)
 
         # Create a snippet of the edited section
-        replacement_line = file_content.split(old_str)[0].count("\n")
+        replacement_line = file_content.count("\n", 0, index)
         start_line = max(0, replacement_line - SNIPPET_LINES)
-        end_line = replacement_line + SNIPPET_LINES + new_str.count("\n")
-        snippet = "\n".join(new_file_content.split("\n")[start_line : end_line + 1])
+        snippet = new_file_content[
+            _line_start(new_file_content, index, SNIPPET_LINES) : _line_end(
+                new_file_content, index + len(new_str), SNIPPET_LINES
+            )
+        ]
 
         # Prepare the success message
         success_msg = f"The file {path} has been edited. "
@@ -203,31 +483,18 @@ class EditTool20250124(BaseAnthropicTool):
         """Implement the insert command, which inserts new_str at the specified line in the file content."""
         file_text = self.read_file(path).expandtabs()
         new_str = new_str.expandtabs()
-        file_text_lines = file_text.split("\n")
-        n_lines_file = len(file_text_lines)
+        new_file_text, _ = _insert_at_line(file_text, insert_line, new_str)
 
-        if insert_line < 0 or insert_line > n_lines_file:
-            raise ToolError(
-                f"Invalid `insert_line` parameter: {insert_line}. It should be within the range of lines of the file: {[0, n_lines_file]}"
-            )
-
-        new_str_lines = new_str.split("\n")
-        new_file_text_lines = (
-            file_text_lines[:insert_line]
-            + new_str_lines
-            + file_text_lines[insert_line:]
-        )
+        file_text_lines = file_text.split("\n")
         snippet_lines = (
             file_text_lines[max(0, insert_line - SNIPPET_LINES) : insert_line]
-            + new_str_lines
+            + new_str.split("\n")
             + file_text_lines[insert_line : insert_line + SNIPPET_LINES]
         )
-
-        new_file_text = "\n".join(new_file_text_lines)
         snippet = "\n".join(snippet_lines)
 
         self.write_file(path, new_file_text)
-        self._file_history[path].append(file_text)
+        self._file_history.push(path, file_text)
 
         success_msg = f"The file {path} has been edited. "
         success_msg += self._make_output(
@@ -240,16 +507,118 @@ class EditTool20250124(BaseAnthropicTool):
 
     def undo_edit(self, path: Path):
         """Implement the undo_edit command."""
-        if not self._file_history[path]:
+        old_text = self._file_history.pop(path)
+        if old_text is None:
             raise ToolError(f"No edit history found for {path}.")
 
-        old_text = self._file_history[path].pop()
         self.write_file(path, old_text)
 
         return CLIResult(
             output=f"Last edit to {path} undone successfully. {self._make_output(old_text, str(path))}"
         )
 
+    async def batch(self, path: str, edits: list[dict] | None) -> CLIResult:
+        """
+        Apply `edits` to the file at `path` in order, each to the result of the ones
+        before it, and write the file once if they all apply.
+        """
+        _path = Path(path)
+        self.validate_path("str_replace", _path)
+        if not isinstance(edits, list) or not edits:
+            raise ToolError(f"{edits=} must be a non-empty list")
+        if len(edits) > MAX_BATCH_EDITS:
+            raise ToolError(f"A batch is limited to {MAX_BATCH_EDITS} edits")
+        for i, edit in enumerate(edits, start=1):
+            if not isinstance(edit, dict) or edit.get("command") not in get_args(
+                BatchCommand
+            ):
+                raise ToolError(
+                    f"{edit=} must be an object with a command of: {', '.join(get_args(BatchCommand))}"
+                )
+            for param, param_type in BATCH_EDIT_PARAMS.items():
+                value = edit.get(param)
+                # bool is an int, but not a line number
+                if value is not None and (
+                    not isinstance(value, param_type) or isinstance(value, bool)
+                ):
+                    raise ToolError(
+                        f"Edit {i} ({edit['command']}) failed, so no edits were made: Parameter `{param}` must be of type {param_type.__name__}, got {value!r}"
+                    )
+        return await EDIT_IO.run("batch", self.apply_edits, _path, edits)
+
+    def apply_edits(self, path: Path, edits: list[dict]) -> CLIResult:
+        """Implement `batch`, with a single read, write and undo history entry."""
+        file_content = self.read_file(path)
+        if "\t" in file_content:
+            file_content = file_content.expandtabs()
+
+        text = file_content
+        # the edited parts of `text`, as (start, end) offsets
+        regions: list[tuple[int, int]] = []
+        for i, edit in enumerate(edits, start=1):
+            try:
+                new_text, start, new_str, removed = self._apply_edit(text, path, edit)
+            except ToolError as e:
+                raise ToolError(
+                    f"Edit {i} ({edit['command']}) failed, so no edits were made: {e.message}"
+                ) from None
+            # where the edit changed `text`; an insert after the last line starts
+            # with the newline before it
+            changed = min(start, len(text))
+            regions = _track_regions(
+                regions,
+                changed,
+                changed + removed,
+                len(new_text) - len(text),
+                (start, start + len(new_str)),
+            )
+            text = new_text
+
+        self.write_file(path, text)
+        self._file_history.push(path, file_content)
+
+        success_msg = f"The file {path} has been edited by {len(edits)} edits. "
+        line, counted = 1, 0
+        for start, end in _snippet_windows(text, regions):
+            line += text.count("\n", counted, start)
+            counted = start
+            success_msg += self._make_output(
+                text[start:end], f"a snippet of {path}", line
+            )
+        success_msg += "Review the changes and make sure they are as expected. Edit the file again if necessary."
+        return CLIResult(output=success_msg)
+
+    def _apply_edit(
+        self, text: str, path: Path, edit: dict
+    ) -> tuple[str, int, str, int]:
+        """
+        Apply one edit of a batch to `text`, returning the new text, where the new
+        string starts in it, the new string and how much of `text` it replaced.
+        """
+        new_str = edit.get("new_str")
+        if edit["command"] == "str_replace":
+            old_str = edit.get("old_str")
+            if old_str is None:
+                raise ToolError(
+                    "Parameter `old_str` is required for command: str_replace"
+                )
+            old_str = old_str.expandtabs()
+            new_str = new_str.expandtabs() if new_str is not None else ""
+            new_text, start = _replace_unique(text, old_str, new_str, path)
+            return new_text, start, new_str, len(old_str)
+
+        insert_line = edit.get("insert_line")
+        if insert_line is None:
+            raise ToolError("Parameter `insert_line` is required for command: insert")
+        if new_str is None:
+            raise ToolError("Parameter `new_str` is required for command: insert")
+        new_str = new_str.expandtabs()
+        new_text, start = _insert_at_line(text, insert_line, new_str)
+        return new_text, start, new_str, 0
+
+    def companion_tools(self) -> list[CompanionTool]:
+        return [EditBatchTool20250124(self)]
+
     def read_file(self, path: Path):
         """Read the content of a file from a given path; raise a ToolError if an error occurs."""
         try:
@@ -288,5 +657,51 @@ class EditTool20250124(BaseAnthropicTool):
         )
 
 
+class EditBatchTool20250124(CompanionTool[EditTool20250124]):
+    """Exposes the batch mode of an editor tool."""
+
+    name: Literal["str_replace_editor_batch"] = "str_replace_editor_batch"
+    description = (
+        "Apply several str_replace and insert edits to one file in a single "
+        "call, e.g. to rename something used in many places. The edits are "
+        "applied in order, each to the file as the edits before it left it, "
+        "with the same parameters and rules as the editor tool's commands. "
+        "The file is written only if every edit applies, and a single "
+        "undo_edit reverts the whole batch."
+    )
+    input_schema = {
+        "type": "object",
+        "properties": {
+            "path": {"type": "string"},
+            "edits": {
+                "type": "array",
+                "minItems": 1,
+                "maxItems": MAX_BATCH_EDITS,
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "command": {
+                            "type": "string",
+                            "enum": list(get_args(BatchCommand)),
+                        },
+                        "old_str": {"type": "string"},
+                        "new_str": {"type": "string"},
+                        "insert_line": {"type": "integer", "minimum": 0},
+                    },
+                    "required": ["command"],
+                },
+            },
+        },
+        "required": ["path", "edits"],
+    }
+
+    async def __call__(
+        self, *, path: str | None = None, edits: list[dict] | None = None, **kwargs
+    ):
+        if path is None:
+            raise ToolError("Parameter `path` is required")
+        return await self.tool.batch(path, edits)
+
+
 class EditTool20241022(EditTool20250124):
     api_type: Literal["text_editor_20241022"] = "text_editor_20241022"  # pyright: ignore[reportIncompatibleVariableOverride]
@@ -16,6 +16,11 @@ class ToolGroup:
     tools: list[type[BaseAnthropicTool]]
     beta_flag: BetaFlag | None = None
 
+    def create_tools(self) -> list[BaseAnthropicTool]:
+        """Instantiate the group's tools, followed by their companion tools."""
+        tools: list[BaseAnthropicTool] = [ToolCls() for ToolCls in self.tools]
+        return [*tools, *(c for tool in tools for c in tool.companion_tools())]
+
 
 TOOL_GROUPS: list[ToolGroup] = [
     ToolGroup(
@@ -0,0 +1,120 @@
+"""In-memory image processing for screenshots."""
+
+import os
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Literal, get_args
+
+from PIL import Image
+
+from .base import ToolError
+
+ImageFormat = Literal["png", "jpeg", "webp"]
+
+MEDIA_TYPES: dict[ImageFormat, str] = {
+    "png": "image/png",
+    "jpeg": "image/jpeg",
+    "webp": "image/webp",
+}
+
+ResampleFilter = Literal["nearest", "box", "bilinear", "hamming", "bicubic", "lanczos"]
+
+RESAMPLE_FILTERS: dict[ResampleFilter, Image.Resampling] = {
+    "nearest": Image.Resampling.NEAREST,
+    "box": Image.Resampling.BOX,
+    "bilinear": Image.Resampling.BILINEAR,
+    "hamming": Image.Resampling.HAMMING,
+    "bicubic": Image.Resampling.BICUBIC,
+    "lanczos": Image.Resampling.LANCZOS,
+}
+
+
+def resize_image(
+    image: Image.Image, size: tuple[int, int], resample: ResampleFilter = "lanczos"
+) -> Image.Image:
+    """Resample an image to exactly `size`, ignoring its aspect ratio."""
+    if image.size == size:
+        return image
+    return image.resize(size, RESAMPLE_FILTERS[resample])
+
+
+def encode_png(image: Image.Image, compress_level: int = 6) -> bytes:
+    """Encode an image as PNG entirely in memory."""
+    buffer = BytesIO()
+    image.save(buffer, format="PNG", compress_level=compress_level)
+    return buffer.getvalue()
+
+
+@dataclass(kw_only=True, frozen=True)
+class EncodingPolicy:
+    """How screenshots are encoded before they are sent to the API."""
+
+    format: ImageFormat = "png"
+    # starting quality for the lossy formats
+    quality: int = 85
+    # zlib level for png, 1 is fastest and 9 is smallest
+    compress_level: int = 6
+    # if an encoded image is larger than this, quality is stepped down until it fits.
+    # a png over budget is re-encoded as jpeg.
+    max_bytes: int | None = None
+    min_quality: int = 30
+    quality_step: int = 10
+
+    @classmethod
+    def from_env(cls) -> "EncodingPolicy":
+        """
+        Build a policy from $SCREENSHOT_FORMAT, $SCREENSHOT_QUALITY,
+        $SCREENSHOT_COMPRESS_LEVEL and $SCREENSHOT_MAX_BYTES.
+        """
+        policy = cls()
+        image_format = os.getenv("SCREENSHOT_FORMAT") or policy.format
+        if image_format not in get_args(ImageFormat):
+            raise ToolError(
+                f"Unknown screenshot format {image_format!r}, expected one of {list(get_args(ImageFormat))}"
+            )
+        try:
+            return cls(
+                format=image_format,
+                quality=int(os.getenv("SCREENSHOT_QUALITY") or policy.quality),
+                compress_level=int(
+                    os.getenv("SCREENSHOT_COMPRESS_LEVEL") or policy.compress_level
+                ),
+                max_bytes=int(max_bytes)
+                if (max_bytes := os.getenv("SCREENSHOT_MAX_BYTES"))
+                else None,
+            )
+        except ValueError as e:
+            raise ToolError(f"Invalid screenshot encoding setting: {e}") from None
+
+
+@dataclass(kw_only=True, frozen=True)
+class EncodedImage:
+    data: bytes
+    media_type: str
+
+
+def _encode(image: Image.Image, image_format: ImageFormat, quality: int) -> bytes:
+    buffer = BytesIO()
+    image.save(buffer, format=image_format.upper(), quality=quality)
+    return buffer.getvalue()
+
+
+def encode_image(image: Image.Image, policy: EncodingPolicy) -> EncodedImage:
+    """Encode an image according to `policy`, stepping quality down to fit its byte budget."""
+    image_format = policy.format
+    if image_format == "png":
+        data = encode_png(image, compress_level=policy.compress_level)
+        if policy.max_bytes is None or len(data) <= policy.max_bytes:
+            return EncodedImage(data=data, media_type=MEDIA_TYPES[image_format])
+        image_format = "jpeg"
+
+    quality = policy.quality
+    data = _encode(image, image_format, quality)
+    while (
+        policy.max_bytes is not None
+        and len(data) > policy.max_bytes
+        and quality > policy.min_quality
+    ):
+        quality = max(policy.min_quality, quality - policy.quality_step)
+        data = _encode(image, image_format, quality)
+    return EncodedImage(data=data, media_type=MEDIA_TYPES[image_format])
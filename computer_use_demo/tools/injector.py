@@ -0,0 +1,406 @@
+"""
+In-process input injection through the XTEST extension.
+
+The computer tool describes input as xdotool command chains. Instead of spawning
+xdotool for each of them, `parse_xdotool` turns a chain into a list of steps that
+`XTestInjector` replays over one long-lived X connection, keeping xdotool's
+semantics for mouse moves, clicks, key sequences and typing.
+"""
+
+import asyncio
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+
+from .base import ToolError
+from .capture import XLIB_AVAILABLE
+
+if XLIB_AVAILABLE:
+    from Xlib import XK, X, display as xdisplay, error as xerror
+
+    for _group in ("xf86", "xkb", "latin2", "latin3", "latin4", "technical"):
+        XK.load_keysym_group(_group)
+
+INPUT_BACKEND_ENV = "INPUT_BACKEND"
+
+XDOTOOL_COMMANDS = {
+    "mousemove",
+    "mousedown",
+    "mouseup",
+    "click",
+    "key",
+    "keydown",
+    "keyup",
+    "type",
+    "sleep",
+    "getmouselocation",
+}
+
+# xdotool's aliases for modifier names, matched case-insensitively
+KEY_ALIASES = {
+    "alt": "Alt_L",
+    "ctrl": "Control_L",
+    "control": "Control_L",
+    "meta": "Meta_L",
+    "super": "Super_L",
+    "shift": "Shift_L",
+}
+
+# xdotool's defaults, in milliseconds
+CLICK_REPEAT_DELAY_MS = 100
+KEY_DELAY_MS = 12
+
+
+class UnsupportedCommand(Exception):
+    """Raised for xdotool commands the injector can't replay; run xdotool instead."""
+
+
+class InjectionError(ToolError):
+    """
+    Raised when the injector can't reach the X server. `partial` is set if some of
+    the input was sent before it failed.
+    """
+
+    def __init__(self, message, partial: bool = False):
+        super().__init__(message)
+        self.partial = partial
+
+
+@dataclass(frozen=True)
+class Step:
+    command: str
+    args: tuple = ()
+
+
+def _take_options(
+    argv: list[str], i: int, options: dict[str, bool]
+) -> tuple[dict[str, str | bool], int]:
+    """Consume the leading options of a command; `options` maps each to whether it takes a value."""
+    parsed: dict[str, str | bool] = {}
+    while i < len(argv) and argv[i].startswith("--"):
+        option = argv[i]
+        if option == "--":
+            return parsed, i + 1
+        if option not in options:
+            raise UnsupportedCommand(f"unsupported option {option}")
+        if options[option]:
+            if i + 1 >= len(argv):
+                raise UnsupportedCommand(f"{option} needs a value")
+            parsed[option] = argv[i + 1]
+            i += 2
+        else:
+            parsed[option] = True
+            i += 1
+    return parsed, i
+
+
+def _int(value: str) -> int:
+    try:
+        return int(value)
+    except ValueError:
+        raise UnsupportedCommand(f"{value!r} is not an integer") from None
+
+
+def parse_xdotool(argv: list[str]) -> list[Step]:
+    """
+    Parse an xdotool command chain (without the leading `xdotool`) into steps. Key
+    names are resolved to keysyms here, so that a chain with an unknown key is left
+    to xdotool before any of it is injected.
+    """
+    steps: list[Step] = []
+    i = 0
+    while i < len(argv):
+        command = argv[i]
+        i += 1
+        if command not in XDOTOOL_COMMANDS:
+            raise UnsupportedCommand(f"unsupported command {command}")
+        if command == "mousemove":
+            options, i = _take_options(argv, i, {"--sync": False})
+            if i + 2 > len(argv):
+                raise UnsupportedCommand("mousemove needs x and y")
+            steps.append(
+                Step(
+                    command,
+                    (_int(argv[i]), _int(argv[i + 1]), "--sync" in options),
+                )
+            )
+            i += 2
+        elif command in ("mousedown", "mouseup"):
+            if i >= len(argv):
+                raise UnsupportedCommand(f"{command} needs a button")
+            steps.append(Step(command, (_int(argv[i]),)))
+            i += 1
+        elif command == "click":
+            options, i = _take_options(argv, i, {"--repeat": True, "--delay": True})
+            if i >= len(argv):
+                raise UnsupportedCommand("click needs a button")
+            repeat = _int(str(options.get("--repeat", 1)))
+            delay = _int(str(options.get("--delay", CLICK_REPEAT_DELAY_MS)))
+            steps.append(Step(command, (_int(argv[i]), repeat, delay)))
+            i += 1
+        elif command in ("key", "keydown", "keyup"):
+            options, i = _take_options(argv, i, {"--delay": True})
+            delay = _int(str(options.get("--delay", KEY_DELAY_MS)))
+            # key sequences run up to the next chained command
+            sequences = []
+            while i < len(argv) and argv[i] not in XDOTOOL_COMMANDS:
+                sequences.append(argv[i])
+                i += 1
+            if not sequences:
+                raise UnsupportedCommand(f"{command} needs a key sequence")
+            for sequence in sequences:
+                keys = sequence.split("+")
+                if not all(keys):
+                    raise UnsupportedCommand(f"can't parse key sequence {sequence!r}")
+                keysyms = tuple(keysym_for_name(key) for key in keys)
+                steps.append(Step(command, (keysyms, delay)))
+        elif command == "type":
+            options, i = _take_options(argv, i, {"--delay": True})
+            delay = _int(str(options.get("--delay", KEY_DELAY_MS)))
+            # type consumes the rest of the chain
+            steps.append(Step(command, ("".join(argv[i:]), delay)))
+            i = len(argv)
+        elif command == "sleep":
+            if i >= len(argv):
+                raise UnsupportedCommand("sleep needs a duration")
+            try:
+                steps.append(Step(command, (float(argv[i]),)))
+            except ValueError:
+                raise UnsupportedCommand(f"{argv[i]!r} is not a number") from None
+            i += 1
+        elif command == "getmouselocation":
+            options, i = _take_options(argv, i, {"--shell": False})
+            steps.append(Step(command, ("--shell" in options,)))
+    return steps
+
+
+def keysym_for_name(name: str) -> int:
+    """Resolve a key name the way xdotool does."""
+    name = KEY_ALIASES.get(name.lower(), name)
+    keysym = XK.string_to_keysym(name)
+    if keysym == X.NoSymbol and name.startswith("XF86") and name[4:5] != "_":
+        # python-xlib spells XF86AudioMute as XF86_AudioMute
+        keysym = XK.string_to_keysym(f"XF86_{name[4:]}")
+    if keysym == X.NoSymbol and re.fullmatch(r"U[0-9A-Fa-f]{4,6}", name):
+        keysym = 0x01000000 | int(name[1:], 16)
+    if keysym == X.NoSymbol:
+        raise UnsupportedCommand(f"unknown key name {name!r}")
+    return keysym
+
+
+def keysym_for_char(char: str) -> int:
+    """The keysym that types `char`."""
+    if char in "\r\n":
+        return XK.XK_Return
+    if char == "\t":
+        return XK.XK_Tab
+    code = ord(char)
+    if 0x20 <= code <= 0x7E or 0xA0 <= code <= 0xFF:
+        return code
+    return 0x01000000 | code
+
+
+class XTestInjector:
+    """Replays parsed xdotool steps over a persistent X connection with XTEST."""
+
+    name = "xtest"
+
+    def __init__(self, display_num: int | None):
+        if not XLIB_AVAILABLE:
+            raise InjectionError("python-xlib is not installed")
+        self.display_num = display_num
+        self._display = None
+        # keysym -> (keycode, needs shift)
+        self._keycodes: dict[int, tuple[int, bool]] = {}
+        self._spare_keycode: int | None = None
+        # python-xlib connections are not thread safe, and steps run off the event loop
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._display is not None:
+            return self._display
+        name = f":{self.display_num}" if self.display_num is not None else None
+        try:
+            display = xdisplay.Display(name)
+        except (xerror.DisplayError, OSError) as e:
+            raise InjectionError(f"Unable to connect to X display: {e}") from None
+        if not display.has_extension("XTEST"):
+            display.close()
+            raise InjectionError("X server does not support XTEST")
+        self._display = display
+        self._load_keymap()
+        return display
+
+    def _load_keymap(self):
+        assert self._display
+        first = self._display.display.info.min_keycode
+        count = self._display.display.info.max_keycode - first + 1
+        self._keycodes.clear()
+        self._spare_keycode = None
+        for offset, keysyms in enumerate(
+            self._display.get_keyboard_mapping(first, count)
+        ):
+            keycode = first + offset
+            if not any(keysyms):
+                # an unmapped keycode, used to type keysyms missing from the keymap
+                self._spare_keycode = self._spare_keycode or keycode
+                continue
+            for level, keysym in enumerate(keysyms[:2]):
+                if keysym and keysym not in self._keycodes:
+                    self._keycodes[keysym] = (keycode, level == 1)
+
+    async def run(self, steps: list[Step]) -> str:
+        """Replay `steps`, returning what xdotool would have printed."""
+        return await asyncio.to_thread(self._run, steps)
+
+    def _run(self, steps: list[Step]) -> str:
+        with self._lock:
+            display = self._connect()
+            self._check_keysyms(steps)
+            output = []
+            try:
+                for step in steps:
+                    output.append(getattr(self, f"_{step.command}")(*step.args))
+                display.sync()
+            except (xerror.XError, xerror.ConnectionClosedError, OSError) as e:
+                self.close()
+                raise InjectionError(
+                    f"Input injection failed: {e}", partial=bool(output)
+                ) from None
+            return "".join(o for o in output if o)
+
+    def _check_keysyms(self, steps: list[Step]):
+        """Make sure every key of `steps` can be typed before any of it is sent."""
+        if self._spare_keycode is not None:
+            return
+        for step in steps:
+            if step.command in ("key", "keydown", "keyup"):
+                keysyms = step.args[0]
+            elif step.command == "type":
+                keysyms = [keysym_for_char(char) for char in step.args[0]]
+            else:
+                continue
+            for keysym in keysyms:
+                if keysym not in self._keycodes:
+                    raise UnsupportedCommand(f"no keycode to type keysym {keysym:#x}")
+
+    def _root(self):
+        assert self._display
+        return self._display.screen().root
+
+    def _fake(self, event_type: int, detail: int = 0, **kwargs):
+        assert self._display
+        self._display.xtest_fake_input(event_type, detail, **kwargs)
+
+    def _mousemove(self, x: int, y: int, sync: bool):
+        self._fake(X.MotionNotify, 0, root=self._root(), x=x, y=y)
+        if sync:
+            # the server has processed the motion once the round trip completes
+            assert self._display
+            self._display.sync()
+
+    def _mousedown(self, button: int):
+        self._fake(X.ButtonPress, button)
+
+    def _mouseup(self, button: int):
+        self._fake(X.ButtonRelease, button)
+
+    def _click(self, button: int, repeat: int, delay_ms: int):
+        assert self._display
+        for i in range(repeat):
+            if i:
+                self._display.flush()
+                time.sleep(delay_ms / 1000)
+            self._fake(X.ButtonPress, button)
+            self._fake(X.ButtonRelease, button)
+
+    def _keycode(self, keysym: int) -> tuple[int, bool]:
+        if keysym in self._keycodes:
+            return self._keycodes[keysym]
+        if self._spare_keycode is None:
+            raise ToolError(f"No keycode available to type keysym {keysym:#x}")
+        # like xdotool, temporarily bind the keysym to an unused keycode
+        assert self._display
+        self._display.change_keyboard_mapping(self._spare_keycode, [(keysym, keysym)])
+        self._display.sync()
+        return self._spare_keycode, False
+
+    def _release_spare(self, keycode: int):
+        if keycode == self._spare_keycode and self._display is not None:
+            self._display.change_keyboard_mapping(keycode, [(X.NoSymbol, X.NoSymbol)])
+
+    def _press_keysyms(self, keysyms: list[int], delay_ms: int):
+        """Press keys in order and release them in reverse order, like a key combo."""
+        assert self._display
+        keycodes = []
+        for keysym in keysyms:
+            keycode, shift = self._keycode(keysym)
+            if shift:
+                keycodes.append(self._keycode(XK.XK_Shift_L)[0])
+            keycodes.append(keycode)
+        for keycode in keycodes:
+            self._fake(X.KeyPress, keycode)
+        self._display.flush()
+        time.sleep(delay_ms / 2000)
+        for keycode in reversed(keycodes):
+            self._fake(X.KeyRelease, keycode)
+        self._display.flush()
+        time.sleep(delay_ms / 2000)
+        for keycode in keycodes:
+            self._release_spare(keycode)
+
+    def _key(self, keysyms: tuple[int, ...], delay_ms: int):
+        self._press_keysyms(list(keysyms), delay_ms)
+
+    def _keydown(self, keysyms: tuple[int, ...], delay_ms: int):
+        for keysym in keysyms:
+            keycode, _ = self._keycode(keysym)
+            self._fake(X.KeyPress, keycode)
+
+    def _keyup(self, keysyms: tuple[int, ...], delay_ms: int):
+        for keysym in reversed(keysyms):
+            keycode, _ = self._keycode(keysym)
+            self._fake(X.KeyRelease, keycode)
+
+    def _type(self, text: str, delay_ms: int):
+        for char in text:
+            self._press_keysyms([keysym_for_char(char)], delay_ms)
+
+    def _sleep(self, seconds: float):
+        assert self._display
+        self._display.flush()
+        time.sleep(seconds)
+
+    def _getmouselocation(self, shell: bool) -> str:
+        pointer = self._root().query_pointer()
+        window = pointer.child.id if pointer.child else self._root().id
+        if shell:
+            return (
+                f"X={pointer.root_x}\nY={pointer.root_y}\nSCREEN=0\nWINDOW={window}\n"
+            )
+        return f"x:{pointer.root_x} y:{pointer.root_y} screen:0 window:{window}\n"
+
+    def close(self):
+        if self._display is not None:
+            try:
+                self._display.close()
+            except Exception:
+                pass
+            self._display = None
+
+
+def select_input_backend(display_num: int | None) -> XTestInjector | None:
+    """
+    The in-process injector, or None to spawn xdotool for every action, as chosen by
+    $INPUT_BACKEND (`xtest` or `xdotool`, defaulting to xtest when it is available).
+    """
+    backend = os.getenv(INPUT_BACKEND_ENV) or XTestInjector.name
+    if backend == "xdotool" or not XLIB_AVAILABLE:
+        return None
+    if backend != XTestInjector.name:
+        raise ToolError(
+            f"Unknown input backend {backend!r}, expected one of ['xtest', 'xdotool']"
+        )
+    return XTestInjector(display_num)
@@ -0,0 +1,43 @@
+"""Strategies for typing text, picked by its length and the focused window."""
+
+from typing import Literal
+
+TypingStrategy = Literal["direct", "keystrokes", "paste"]
+
+# short text is typed in one go without a delay between keystrokes
+DIRECT_TYPING_MAX_CHARS = 32
+# long text is pasted from a selection when the focused window supports it
+PASTE_MIN_CHARS = 200
+
+# the selection and key that paste into windows of a class (matched lowercased)
+DEFAULT_PASTE = ("clipboard", "ctrl+v")
+PASTE_BY_WINDOW_CLASS: dict[str, tuple[str, str] | None] = {
+    # xterm only pastes the primary selection, with shift+Insert
+    "xterm": ("primary", "shift+Insert"),
+    "uxterm": ("primary", "shift+Insert"),
+    "gnome-terminal-server": ("clipboard", "ctrl+shift+v"),
+    "xfce4-terminal": ("clipboard", "ctrl+shift+v"),
+    "lxterminal": ("clipboard", "ctrl+shift+v"),
+    "konsole": ("clipboard", "ctrl+shift+v"),
+    "tilix": ("clipboard", "ctrl+shift+v"),
+    "kitty": ("clipboard", "ctrl+shift+v"),
+    "alacritty": ("clipboard", "ctrl+shift+v"),
+    # no paste shortcut
+    "urxvt": None,
+    "st-256color": None,
+}
+
+
+def paste_method(window_class: str | None) -> tuple[str, str] | None:
+    """The (selection, key) to paste into a window, or None if it can't be pasted into."""
+    if not window_class:
+        return None
+    return PASTE_BY_WINDOW_CLASS.get(window_class.lower(), DEFAULT_PASTE)
+
+
+def choose_typing_strategy(text: str, can_paste: bool) -> TypingStrategy:
+    if len(text) <= DIRECT_TYPING_MAX_CHARS:
+        return "direct"
+    if len(text) >= PASTE_MIN_CHARS and can_paste:
+        return "paste"
+    return "keystrokes"
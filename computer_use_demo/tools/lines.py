@@ -0,0 +1,81 @@
+"""Read ranges of lines from large files without reading the whole file."""
+
+import mmap
+from bisect import bisect_left
+from collections import OrderedDict
+from pathlib import Path
+
+# bytes between checkpoints of an index; finding a line reads at most this much
+CHECKPOINT_BYTES = 1024 * 1024
+LINE_INDEX_CACHE_ENTRIES = 16
+
+
+class LineIndex:
+    """
+    The number of lines of a file, and how many came before every
+    `checkpoint_bytes` bytes of it, counted in one pass over a memory map.
+    """
+
+    checkpoint_bytes: int = CHECKPOINT_BYTES
+
+    def __init__(self, path: Path):
+        self.path = path
+        stat = path.stat()
+        self.key = (stat.st_mtime_ns, stat.st_size)
+        self.size = stat.st_size
+        # newlines before each checkpoint
+        self._newlines_before: list[int] = []
+        newlines = 0
+        if self.size:
+            with path.open("rb") as f, mmap.mmap(
+                f.fileno(), 0, access=mmap.ACCESS_READ
+            ) as mm:
+                for offset in range(0, self.size, self.checkpoint_bytes):
+                    self._newlines_before.append(newlines)
+                    newlines += mm[offset : offset + self.checkpoint_bytes].count(b"\n")
+        self.line_count = newlines + 1
+
+    def read(self, first: int, last: int, max_bytes: int) -> bytes:
+        """
+        Lines `first` to `last` (1-based, inclusive) without the final newline,
+        cut off after `max_bytes`.
+        """
+        if not self.size:
+            return b""
+        with self.path.open("rb") as f, mmap.mmap(
+            f.fileno(), 0, access=mmap.ACCESS_READ
+        ) as mm:
+            start = self._offset(mm, first)
+            end = self._offset(mm, last + 1) - 1 if last < self.line_count else None
+            end = min(self.size if end is None else end, start + max_bytes)
+            return mm[start:end]
+
+    def _offset(self, mm: mmap.mmap, line: int) -> int:
+        """Where `line` starts, found by scanning from the checkpoint before it."""
+        newlines = line - 1
+        if not newlines:
+            return 0
+        # the last checkpoint before the newline that ends the previous line
+        checkpoint = bisect_left(self._newlines_before, newlines) - 1
+        start = checkpoint * self.checkpoint_bytes
+        chunk = mm[start : start + self.checkpoint_bytes]
+        rest = chunk.split(b"\n", newlines - self._newlines_before[checkpoint])[-1]
+        return start + len(chunk) - len(rest)
+
+
+class LineIndexCache:
+    """Line indexes of recently viewed files, rebuilt once a file changes."""
+
+    def __init__(self, max_entries: int = LINE_INDEX_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Path, LineIndex] = OrderedDict()
+
+    def get(self, path: Path) -> LineIndex:
+        stat = path.stat()
+        index = self._entries.pop(path, None)
+        if index is None or index.key != (stat.st_mtime_ns, stat.st_size):
+            index = LineIndex(path)
+        self._entries[path] = index
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return index
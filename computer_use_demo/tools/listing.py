@@ -0,0 +1,110 @@
+"""List directories for the edit tool in-process, instead of spawning find."""
+
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+DIRECTORY_MAX_DEPTH = 2
+DIRECTORY_MAX_ENTRIES = 1000
+# listings are reused for this long, as long as no directory in them changed
+DIRECTORY_CACHE_TTL = 10.0  # seconds
+DIRECTORY_CACHE_ENTRIES = 16
+
+
+@dataclass(kw_only=True, frozen=True)
+class Listing:
+    """The non-hidden paths under a directory, like `find -maxdepth` prints them."""
+
+    paths: tuple[str, ...]
+    errors: tuple[str, ...]
+    truncated: bool  # True if entries past the limit were left out
+    # modification times of the directories read, which change with their entries
+    mtimes: tuple[tuple[str, int], ...]
+
+
+def _mtime(path: str) -> int:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return -1
+
+
+def list_directory(
+    path: Path,
+    max_depth: int = DIRECTORY_MAX_DEPTH,
+    max_entries: int = DIRECTORY_MAX_ENTRIES,
+) -> Listing:
+    """
+    List `path` and the entries under it, `max_depth` levels deep, skipping hidden
+    ones. Directories are listed before their entries, in name order; symlinks
+    aren't followed.
+    """
+    paths = [str(path)]
+    errors: list[str] = []
+    mtimes: list[tuple[str, int]] = []
+    truncated = False
+
+    def walk(directory: str, depth: int):
+        nonlocal truncated
+        mtimes.append((directory, _mtime(directory)))
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(
+                    (entry for entry in it if not entry.name.startswith(".")),
+                    key=lambda entry: entry.name,
+                )
+        except OSError as e:
+            errors.append(f"Cannot list {directory}: {e.strerror}")
+            return
+        for entry in entries:
+            if len(paths) > max_entries:
+                truncated = True
+                return
+            paths.append(entry.path)
+            if depth < max_depth and entry.is_dir(follow_symlinks=False):
+                walk(entry.path, depth + 1)
+
+    walk(str(path), 1)
+    return Listing(
+        paths=tuple(paths),
+        errors=tuple(errors),
+        truncated=truncated,
+        mtimes=tuple(mtimes),
+    )
+
+
+class DirectoryCache:
+    """Recent listings, reused while none of the directories they read changed."""
+
+    def __init__(
+        self,
+        ttl: float = DIRECTORY_CACHE_TTL,
+        max_entries: int = DIRECTORY_CACHE_ENTRIES,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Path, tuple[float, Listing]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path: Path) -> Listing | None:
+        entry = self._entries.get(path)
+        if entry is not None:
+            created, listing = entry
+            if time.monotonic() - created < self.ttl and all(
+                _mtime(directory) == mtime for directory, mtime in listing.mtimes
+            ):
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return listing
+            del self._entries[path]
+        self.misses += 1
+        return None
+
+    def put(self, path: Path, listing: Listing):
+        self._entries[path] = (time.monotonic(), listing)
+        self._entries.move_to_end(path)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
@@ -0,0 +1,85 @@
+"""Run blocking work off the event loop in a bounded thread pool, and time it."""
+
+import asyncio
+import threading
+import time
+from collections.abc import Callable, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TypeVar
+
+from .stats import SpanStats, percentiles_ms
+
+T = TypeVar("T")
+
+
+@dataclass(kw_only=True, frozen=True)
+class OffloadSpan:
+    """A call run in the pool."""
+
+    label: str
+    waited: float  # seconds queued before a worker picked it up
+    elapsed: float  # seconds running on the worker
+    queue_depth: int  # calls queued when it was submitted, including itself
+
+
+class OffloadStats(SpanStats[OffloadSpan]):
+    """Recent queue waits and run times per label."""
+
+    def summarize(self, spans: Sequence[OffloadSpan]) -> dict[str, float]:
+        """Wait and run time percentiles, and the deepest the queue got."""
+        return {
+            **percentiles_ms((span.waited for span in spans), "wait_"),
+            **percentiles_ms((span.elapsed for span in spans), "run_"),
+            "max_queue_depth": max(span.queue_depth for span in spans),
+        }
+
+
+class Offloader:
+    """
+    Runs blocking calls on at most `max_workers` threads, so that they neither
+    stall the event loop nor start a thread each. Calls past that queue up.
+    """
+
+    def __init__(self, max_workers: int, name: str):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.stats = OffloadStats()
+
+    async def run(self, label: str, func: Callable[..., T], *args) -> T:
+        submitted = time.monotonic()
+        with self._lock:
+            self.queued += 1
+            queue_depth = self.queued
+
+        def call() -> T:
+            started = time.monotonic()
+            with self._lock:
+                self.queued -= 1
+                self.running += 1
+            try:
+                return func(*args)
+            finally:
+                with self._lock:
+                    self.running -= 1
+                self.stats.record(
+                    OffloadSpan(
+                        label=label,
+                        waited=started - submitted,
+                        elapsed=time.monotonic() - started,
+                        queue_depth=queue_depth,
+                    )
+                )
+
+        def cancelled(future: Future):
+            # a call cancelled before a worker picked it up never runs
+            if future.cancelled():
+                with self._lock:
+                    self.queued -= 1
+
+        future = self._executor.submit(call)
+        future.add_done_callback(cancelled)
+        return await asyncio.wrap_future(future)
@@ -1,9 +1,19 @@
 """Utility to run shell commands asynchronously with a timeout."""
 
 import asyncio
+import codecs
+import os
+import shlex
+import time
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+
+from .stats import SpanStats, percentiles_ms
 
 TRUNCATED_MESSAGE: str = "<response clipped><NOTE>To save on context only part of this file has been shown to you. You should retry this tool after you have searched inside the file with `grep -n` in order to find the line numbers of what you are looking for.</NOTE>"
 MAX_RESPONSE_LEN: int = 16000
+# bytes read from a command's output at a time
+READ_SIZE: int = 64 * 1024
 
 
 def maybe_truncate(content: str, truncate_after: int | None = MAX_RESPONSE_LEN):
@@ -15,28 +25,146 @@ def maybe_truncate(content: str, truncate_after: int | None = MAX_RESPONSE_LEN):
     )
 
 
+@dataclass(kw_only=True, frozen=True)
+class SpawnSpan:
+    """A process spawned by `run`."""
+
+    label: str  # the binary, prefixed with "sh -c" when run through the shell
+    elapsed: float  # seconds, from spawning the process until it exited
+    bytes_out: int  # of stdout and stderr, including what was truncated
+    exit_code: int | None  # None if the process timed out
+
+
+class SpawnStats(SpanStats[SpawnSpan]):
+    """Recent spawns per binary, kept to tell how much latency is process overhead."""
+
+    def summarize(self, spans: Sequence[SpawnSpan]) -> dict[str, float]:
+        """Wall time percentiles, bytes of output and failures."""
+        return {
+            **percentiles_ms(span.elapsed for span in spans),
+            "bytes_out": sum(span.bytes_out for span in spans),
+            "failures": sum(span.exit_code != 0 for span in spans),
+        }
+
+
+SPAWN_STATS = SpawnStats()
+
+
+def _spawn_label(cmd: str | Sequence[str]) -> str:
+    if not isinstance(cmd, str):
+        return os.path.basename(cmd[0])
+    # skip variable assignments such as DISPLAY=:1
+    words = [word for word in cmd.split() if "=" not in word]
+    return f"sh -c {os.path.basename(words[0]) if words else ''}".strip()
+
+
+async def _read_truncated(
+    stream: asyncio.StreamReader, truncate_after: int | None
+) -> tuple[str, int]:
+    """
+    Read `stream` to its end, decoding it as it arrives, but keep no more of it
+    than `maybe_truncate` would. Returns the text and the number of bytes read.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    parts: list[str] = []
+    kept = size = 0
+    truncated = False
+    while True:
+        chunk = await stream.read(READ_SIZE)
+        size += len(chunk)
+        # past the limit, the rest is only read so that the process can't block
+        # writing to a full pipe
+        if not truncated:
+            text = decoder.decode(chunk, final=not chunk)
+            if truncate_after and kept + len(text) > truncate_after:
+                text = text[: truncate_after - kept]
+                truncated = True
+            parts.append(text)
+            kept += len(text)
+        if not chunk:
+            break
+    return "".join(parts) + (TRUNCATED_MESSAGE if truncated else ""), size
+
+
+async def _write_input(stream: asyncio.StreamWriter, data: bytes):
+    """Write `data` to a command's stdin and close it, so the command sees its end."""
+    try:
+        stream.write(data)
+        await stream.drain()
+        stream.close()
+    except (BrokenPipeError, ConnectionResetError):
+        # the command exited without reading all of it
+        pass
+
+
 async def run(
-    cmd: str,
+    cmd: str | Sequence[str],
     timeout: float | None = 120.0,  # seconds
     truncate_after: int | None = MAX_RESPONSE_LEN,
+    env: Mapping[str, str] | None = None,
+    stdin: bytes | None = None,
 ):
-    """Run a shell command asynchronously with a timeout."""
-    process = await asyncio.create_subprocess_shell(
-        cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
-    )
+    """
+    Run a command asynchronously with a timeout: a string through the shell, or
+    an argv list directly. `env` is added to the environment of the command, and
+    `stdin` is written to its stdin, which otherwise stays that of this process.
+    """
+    if env is not None:
+        env = {**os.environ, **env}
+    stdin_pipe = asyncio.subprocess.PIPE if stdin is not None else None
+    start = time.monotonic()
+    if isinstance(cmd, str):
+        process = await asyncio.create_subprocess_shell(
+            cmd,
+            stdin=stdin_pipe,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=env,
+        )
+    else:
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdin=stdin_pipe,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                env=env,
+            )
+        except FileNotFoundError:
+            # fail like the shell does, so callers needn't tell the two apart
+            return 127, "", f"{cmd[0]}: command not found\n"
+    assert process.stdout and process.stderr
 
+    bytes_out = 0
     try:
-        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
-        return (
-            process.returncode or 0,
-            maybe_truncate(stdout.decode(), truncate_after=truncate_after),
-            maybe_truncate(stderr.decode(), truncate_after=truncate_after),
-        )
+        async with asyncio.timeout(timeout):
+            # written alongside the reads, so neither side blocks on a full pipe
+            writes = (
+                [_write_input(process.stdin, stdin or b"")] if process.stdin else []
+            )
+            (stdout, stdout_bytes), (stderr, stderr_bytes), *_ = await asyncio.gather(
+                _read_truncated(process.stdout, truncate_after),
+                _read_truncated(process.stderr, truncate_after),
+                *writes,
+            )
+            bytes_out = stdout_bytes + stderr_bytes
+            await process.wait()
+        return process.returncode or 0, stdout, stderr
     except asyncio.TimeoutError as exc:
         try:
             process.kill()
         except ProcessLookupError:
             pass
         raise TimeoutError(
-            f"Command '{cmd}' timed out after {timeout} seconds"
+            f"Command '{cmd if isinstance(cmd, str) else shlex.join(cmd)}' timed out "
+            f"after {timeout} seconds"
         ) from exc
+    finally:
+        SPAWN_STATS.record(
+            SpawnSpan(
+                label=_spawn_label(cmd),
+                elapsed=time.monotonic() - start,
+                bytes_out=bytes_out,
+                exit_code=process.returncode,
+            )
+        )
@@ -0,0 +1,65 @@
+"""Adaptive wait for the screen to stop changing after an action."""
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass
+
+from .stats import SpanStats, percentiles_ms
+
+
+@dataclass(kw_only=True, frozen=True)
+class SettleResult:
+    """How long an action waited before its screenshot was taken."""
+
+    label: str
+    elapsed: float  # seconds
+    samples: int
+    settled: bool  # False if the wait gave up at the timeout
+
+
+class SettleStats(SpanStats[SettleResult]):
+    """Recent settle times per action, kept so the settle parameters can be tuned."""
+
+    def summarize(self, spans: Sequence[SettleResult]) -> dict[str, float]:
+        """Settle time percentiles and the number of waits that timed out."""
+        return {
+            **percentiles_ms(result.elapsed for result in spans),
+            "timeouts": sum(not result.settled for result in spans),
+        }
+
+
+async def wait_for_settle(
+    sample: Callable[[], Awaitable[int]],
+    *,
+    label: str,
+    min_delay: float,
+    max_delay: float,
+    interval: float,
+    stable_samples: int,
+) -> SettleResult:
+    """
+    Wait at least `min_delay` seconds, then poll `sample` every `interval` seconds
+    until it returns the same checksum `stable_samples` times in a row, or until
+    `max_delay` seconds have passed.
+    """
+    start = time.monotonic()
+    await asyncio.sleep(min_delay)
+    previous = await sample()
+    samples, stable = 1, 1
+    while stable < stable_samples:
+        if time.monotonic() - start + interval > max_delay:
+            return SettleResult(
+                label=label,
+                elapsed=time.monotonic() - start,
+                samples=samples,
+                settled=False,
+            )
+        await asyncio.sleep(interval)
+        current = await sample()
+        samples += 1
+        stable = stable + 1 if current == previous else 1
+        previous = current
+    return SettleResult(
+        label=label, elapsed=time.monotonic() - start, samples=samples, settled=True
+    )
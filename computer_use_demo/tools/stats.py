@@ -0,0 +1,57 @@
+"""Recent timings per label, summarized as percentiles."""
+
+import statistics
+from collections import defaultdict, deque
+from collections.abc import Iterable, Sequence
+from typing import Generic, Protocol, TypeVar
+
+
+class Span(Protocol):
+    @property
+    def label(self) -> str: ...
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds the span took."""
+        ...
+
+
+S = TypeVar("S", bound=Span)
+
+
+def percentiles_ms(seconds: Iterable[float], prefix: str = "") -> dict[str, float]:
+    """The median, 95th percentile and maximum of `seconds`, in milliseconds."""
+    values = sorted(value * 1000 for value in seconds)
+    if not values:
+        return {f"{prefix}p50_ms": 0.0, f"{prefix}p95_ms": 0.0, f"{prefix}max_ms": 0.0}
+    return {
+        f"{prefix}p50_ms": statistics.median(values),
+        f"{prefix}p95_ms": values[min(len(values) - 1, int(len(values) * 0.95))],
+        f"{prefix}max_ms": values[-1],
+    }
+
+
+class SpanStats(Generic[S]):
+    """
+    The most recent `window` spans per label. Subclasses pick the figures that
+    `summary` reports for each label.
+    """
+
+    def __init__(self, window: int = 100):
+        self._spans: defaultdict[str, deque[S]] = defaultdict(
+            lambda: deque(maxlen=window)
+        )
+
+    def record(self, span: S):
+        self._spans[span.label].append(span)
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        # spans may be recorded from other threads meanwhile
+        return {
+            label: {"count": len(spans), **self.summarize(list(spans))}
+            for label, spans in list(self._spans.items())
+        }
+
+    def summarize(self, spans: Sequence[S]) -> dict[str, float]:
+        """The figures reported for the spans of one label."""
+        return percentiles_ms(span.elapsed for span in spans)
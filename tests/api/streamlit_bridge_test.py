@@ -0,0 +1,49 @@
+from unittest.mock import patch
+
+import pytest
+
+from computer_use_demo.api.utils import streamlit_bridge
+from computer_use_demo.api.utils.streamlit_bridge import (
+    add_command,
+    append_command_output,
+    get_command_output,
+)
+
+
+@pytest.fixture(autouse=True)
+def commands_file(tmp_path):
+    path = tmp_path / "commands.json"
+    path.write_text("[]")
+    with patch.object(streamlit_bridge, "COMMANDS_FILE", path):
+        yield
+
+
+def test_command_output_since():
+    add_command("1", "build it")
+    assert get_command_output("1") == {
+        "command_id": "1",
+        "status": "pending",
+        "output": "",
+        "output_length": 0,
+        "truncated": False,
+    }
+    append_command_output("1", "step 1\n")
+    append_command_output("1", "step 2\n")
+    output = get_command_output("1")
+    assert output and output["output"] == "step 1\nstep 2\n"
+    output = get_command_output("1", since=output["output_length"] - 7)
+    assert output and output["output"] == "step 2\n"
+    assert get_command_output("2") is None
+
+
+def test_command_output_is_bounded():
+    add_command("1", "build it")
+    append_command_output("1", "abcdef", max_chars=4)
+    output = get_command_output("1")
+    assert output and (output["output"], output["output_length"]) == ("cdef", 6)
+    # the first two characters were dropped
+    assert output["truncated"] is True
+    append_command_output("1", "gh", skipped=10, max_chars=4)
+    output = get_command_output("1", since=6)
+    assert output and (output["output"], output["output_length"]) == ("gh", 18)
+    assert output["truncated"] is True
@@ -3,7 +3,8 @@ from unittest import mock
 from anthropic.types import TextBlock, ToolUseBlock
 from anthropic.types.beta import BetaMessage, BetaMessageParam, BetaTextBlockParam
 
-from computer_use_demo.loop import APIProvider, sampling_loop
+from computer_use_demo.loop import APIProvider, _make_api_tool_result, sampling_loop
+from computer_use_demo.tools import CLIResult, ToolResult
 
 
 async def test_loop():
@@ -23,6 +24,7 @@ async def test_loop():
     ]
 
     tool_collection = mock.AsyncMock()
+    tool_collection.stats = mock.Mock(return_value={})
     tool_collection.run.return_value = mock.Mock(
         output="Tool output", error=None, base64_image=None
     )
@@ -57,7 +59,7 @@ async def test_loop():
 
         assert client.beta.messages.with_raw_response.create.call_count == 2
         tool_collection.run.assert_called_once_with(
-            name="computer", tool_input={"action": "test"}
+            name="computer", tool_input={"action": "test"}, output_callback=None
         )
         output_callback.assert_called_with(
             BetaTextBlockParam(text="Done!", type="text", citations=None)
@@ -65,3 +67,22 @@ async def test_loop():
         assert output_callback.call_count == 3
         assert tool_output_callback.call_count == 1
         assert api_response_callback.call_count == 2
+        tool_collection.stats.assert_called_once_with()
+        tool_collection.close.assert_awaited_once()
+
+
+def test_make_api_tool_result_image_media_type():
+    result = _make_api_tool_result(
+        ToolResult(base64_image="aGVsbG8=", image_media_type="image/jpeg"), "1"
+    )
+    assert result["content"][0]["source"]["media_type"] == "image/jpeg"
+
+    result = _make_api_tool_result(ToolResult(base64_image="aGVsbG8="), "1")
+    assert result["content"][0]["source"]["media_type"] == "image/png"
+
+
+def test_make_api_tool_result_system_without_output():
+    result = _make_api_tool_result(CLIResult(system="exit code 0 after 0.01s"), "1")
+    assert result["content"] == [
+        {"type": "text", "text": "<system>exit code 0 after 0.01s</system>\n"}
+    ]
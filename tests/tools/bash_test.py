@@ -1,11 +1,44 @@
+import asyncio
+import os
+import re
+import time
+from pathlib import Path
+
 import pytest
 
-from computer_use_demo.tools.bash import BashTool20241022, BashTool20250124, ToolError
+from computer_use_demo.tools import bash as bash_module
+from computer_use_demo.tools.bash import (
+    BashJobs,
+    BashJobTool20250124,
+    BashSessionPool,
+    BashTool20241022,
+    BashTool20250124,
+    ToolError,
+)
+from computer_use_demo.tools.collection import ToolCollection
 
 
 @pytest.fixture(params=[BashTool20241022, BashTool20250124])
-def bash_tool(request):
-    return request.param()
+async def bash_tool(request):
+    tool = request.param()
+    yield tool
+    await tool.close()
+
+
+@pytest.fixture
+def jobs(monkeypatch):
+    jobs = BashJobs()
+    monkeypatch.setattr(bash_module, "BASH_JOBS", jobs)
+    yield jobs
+    jobs.close()
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = BashSessionPool(2)
+    monkeypatch.setattr(bash_module, "BASH_SESSION_POOL", pool)
+    yield pool
+    pool.close()
 
 
 @pytest.mark.asyncio
@@ -69,3 +102,217 @@ async def test_bash_tool_timeout(bash_tool):
         match="timed out: bash has not returned in 0.1 seconds and must be restarted",
     ):
         await bash_tool(command="sleep 1")
+
+
+@pytest.mark.asyncio
+async def test_bash_tool_returns_without_polling_delay(bash_tool):
+    await bash_tool(command="true")
+    start = time.monotonic()
+    result = await bash_tool(command="pwd")
+    assert time.monotonic() - start < 0.1
+    assert result.output == os.getcwd()
+
+
+@pytest.mark.asyncio
+async def test_bash_tool_large_output_and_stderr(bash_tool):
+    result = await bash_tool(command="seq 1 100000; echo oops >&2; printf end")
+    assert result.output.startswith("1\n2\n")
+    assert result.output.endswith("100000\nend")
+    assert result.error == "oops"
+    # nothing leaks into the next command
+    result = await bash_tool(command="echo next")
+    assert (result.output, result.error) == ("next", "")
+
+
+@pytest.mark.asyncio
+async def test_bash_tool_exit_code(bash_tool):
+    result = await bash_tool(command="echo '<<exit>>'; false")
+    assert result.output == "<<exit>>"
+    assert result.exit_code == 1
+    assert result.duration is not None and result.duration >= 0
+    assert result.system.startswith("exit code 1 after ")
+
+    result = await bash_tool(command="cat <<EOF\nheredoc\nEOF")
+    assert (result.output, result.exit_code) == ("heredoc", 0)
+
+    result = await bash_tool(command="printf bye; exit 3")
+    assert (result.output, result.exit_code) == ("bye", 3)
+
+
+@pytest.mark.asyncio
+async def test_bash_tool_streams_output(bash_tool):
+    chunks = []
+    result = await bash_tool(
+        command="echo one; sleep 0.1; echo two >&2; sleep 0.1; printf three",
+        output_callback=chunks.append,
+    )
+    assert chunks == ["one\n", "two\n", "three"]
+    assert (result.output, result.error) == ("one\nthree", "two")
+
+
+@pytest.mark.asyncio
+async def test_tool_collection_passes_output_callback(bash_tool):
+    chunks = []
+    collection = ToolCollection(bash_tool)
+    await collection.run(
+        name="bash", tool_input={"command": "echo hi"}, output_callback=chunks.append
+    )
+    assert chunks == ["hi\n"]
+
+
+@pytest.mark.asyncio
+async def test_bash_tool_spills_large_output(bash_tool):
+    await bash_tool(command="true")
+    session = bash_tool._session
+    session._head_bytes = session._tail_bytes = 100
+    expected = "".join(f"{i}\n" for i in range(1, 100001))
+    result = await bash_tool(command="seq 1 100000")
+    match = re.fullmatch(
+        r"(.*)\n<response clipped: (\d+) of (\d+) bytes of stdout were left out; "
+        r"the full output was saved to (.*)>\n(.*)",
+        result.output,
+        re.DOTALL,
+    )
+    assert match
+    head, elided, total, spill, tail = match.groups()
+    assert head == expected[:100]
+    assert tail == expected[-100:-1]
+    assert (int(elided), int(total)) == (len(expected) - 200, len(expected))
+    assert Path(spill).read_text() == expected
+
+    # only the latest spill files are kept, and none once the session stops
+    session._max_spill_files = 1
+    await bash_tool(command="seq 1 100000")
+    assert not Path(spill).exists()
+    latest = session._spill_files[-1]
+    session.stop()
+    assert not latest.exists()
+
+
+@pytest.mark.asyncio
+async def test_bash_tool_restart_claims_pooled_session(bash_tool, pool):
+    await bash_tool(command="cd /tmp")
+    first = bash_tool._session
+    # wait for the pool to fill up in the background
+    await asyncio.to_thread(pool._wait_for_spawns)
+    assert pool.stats()["ready"] == pool.size
+    await bash_tool(restart=True)
+    assert bash_tool._session is not first
+    assert (await bash_tool(command="pwd")).output == os.getcwd()
+    stats = pool.stats()
+    assert (stats["claims"], stats["cold_starts"]) == (2, 1)
+    assert stats["spawn_p50_ms"] > 0
+    # the old session is stopped in the background
+    assert await asyncio.wait_for(first._process.wait(), timeout=5) is not None
+
+
+def test_bash_session_pool_outlives_event_loops(pool):
+    processes = []
+
+    async def turn():
+        # like a sampling_loop, which runs in a new event loop on every rerun
+        tool = BashTool20250124()
+        try:
+            output = (await tool(command="echo hi")).output
+            processes.append(tool._session._process.popen)
+            return output
+        finally:
+            await tool.close()
+
+    assert asyncio.run(turn()) == "hi"
+    pool._wait_for_spawns()
+    assert asyncio.run(turn()) == "hi"
+    stats = pool.stats()
+    assert (stats["claims"], stats["cold_starts"]) == (2, 1)
+    # the shells that were claimed exit once their tool is closed
+    assert [process.wait(timeout=5) for process in processes] == [0, 0]
+    pool._wait_for_spawns()
+    assert pool.stats()["ready"] == pool.size
+
+
+@pytest.mark.asyncio
+async def test_bash_tool_close_keeps_background_commands(bash_tool, tmp_path):
+    pid_file = tmp_path / "pid"
+    await bash_tool(command=f"(sleep 30 & echo $! > {pid_file})")
+    process = bash_tool._session._process.popen
+    await bash_tool.close()
+    await asyncio.to_thread(process.wait, 5)
+    pid = int(pid_file.read_text())
+    try:
+        # still running, after the shell that started it has exited
+        os.kill(pid, 0)
+    finally:
+        os.kill(pid, 9)
+
+
+@pytest.mark.asyncio
+async def test_bash_tool_job(bash_tool, jobs, tmp_path):
+    await bash_tool(command=f"cd {tmp_path}")
+    result = await bash_tool.job(
+        "start", command="pwd; echo err >&2; sleep 0.2; exit 2"
+    )
+    assert result.output == "started job 1"
+    assert "job 1 running" in (await bash_tool.job("poll", job_id=1)).system
+    # the session is free while the job runs
+    assert (await bash_tool(command="echo hi")).output == "hi"
+
+    job = jobs.get(1)
+    await asyncio.to_thread(job.process.wait)
+    result = await bash_tool.job("poll", job_id=1)
+    assert (result.output, result.exit_code) == (f"{tmp_path}\nerr", 2)
+    assert result.system.startswith("job 1 exited with code 2 after ")
+    assert (await bash_tool.job("tail", job_id=1, lines=1)).output == "err"
+
+
+@pytest.mark.asyncio
+async def test_bash_tool_job_kill_and_list(bash_tool, jobs):
+    await bash_tool.job("start", command="echo started; sleep 30")
+    await bash_tool.job("start", command="true")
+    await asyncio.to_thread(jobs.get(2).process.wait)
+    result = await bash_tool.job("kill", job_id=1)
+    assert "job 1 killed by signal 15" in result.system
+    listing = (await bash_tool.job("list")).output.splitlines()
+    assert [line.split(" after ")[0] for line in listing] == [
+        "job 1 killed by signal 15",
+        "job 2 exited with code 0",
+    ]
+
+    with pytest.raises(ToolError, match="no job with job_id=3"):
+        await bash_tool.job("poll", job_id=3)
+
+    # finished jobs make room for new ones
+    jobs.max_jobs = 2
+    await bash_tool.job("start", command="true")
+    assert [job.id for job in jobs.jobs()] == [2, 3]
+
+
+@pytest.mark.asyncio
+async def test_bash_job_tool(bash_tool, jobs):
+    [job_tool] = bash_tool.companion_tools()
+    assert isinstance(job_tool, BashJobTool20250124)
+    assert job_tool.tool is bash_tool
+    assert job_tool.to_params()["name"] == "bash_job"
+    result = await job_tool(action="start", command="echo hi")
+    assert result.output == "started job 1"
+
+
+@pytest.mark.asyncio
+async def test_bash_job_after_shell_exited(bash_tool, jobs):
+    collection = ToolCollection(bash_tool, *bash_tool.companion_tools())
+    await collection.run(name="bash", tool_input={"command": "exit 3"})
+    result = await collection.run(
+        name="bash_job", tool_input={"action": "start", "command": "pwd"}
+    )
+    assert result.output == "started job 1"
+    await asyncio.to_thread(jobs.get(1).process.wait)
+    # started where the app runs, since the shell can't tell where it was
+    assert jobs.get(1).output() == os.getcwd()
+
+
+@pytest.mark.asyncio
+async def test_bash_jobs_outlive_the_tool(bash_tool, jobs):
+    await bash_tool.job("start", command="sleep 30")
+    await bash_tool.close()
+    # the tools of the next sampling_loop can still reach the job
+    result = await BashTool20250124().job("kill", job_id=1)
+    assert "job 1 killed by signal 15" in result.system
@@ -1,14 +1,46 @@
-from unittest.mock import AsyncMock, patch
+import asyncio
+import base64
+import os
+import shlex
+import threading
+from io import BytesIO
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, PropertyMock, patch
 
 import pytest
-
+from PIL import Image
+
+from computer_use_demo.tools.capture import (
+    CaptureBackend,
+    CaptureError,
+    Frame,
+    ScrotCapture,
+    draw_cursor,
+)
+from computer_use_demo.tools.collection import ToolCollection
 from computer_use_demo.tools.computer import (
+    ComputerBatchTool20250124,
     ComputerTool20241022,
     ComputerTool20250124,
+    ComputerZoomTool20250124,
     ScalingSource,
+    ScreenshotCache,
+    ScreenshotRing,
     ToolError,
     ToolResult,
 )
+from computer_use_demo.tools.damage import DamageTracker
+from computer_use_demo.tools.groups import TOOL_GROUPS_BY_VERSION
+from computer_use_demo.tools.imaging import EncodedImage, EncodingPolicy, encode_image
+from computer_use_demo.tools.injector import (
+    InjectionError,
+    Step,
+    UnsupportedCommand,
+    XTestInjector,
+    keysym_for_char,
+    keysym_for_name,
+    parse_xdotool,
+)
 
 
 @pytest.fixture(params=[ComputerTool20241022, ComputerTool20250124])
@@ -34,14 +66,140 @@ async def test_computer_tool_type(computer_tool):
         patch.object(
             computer_tool, "screenshot", new_callable=AsyncMock
         ) as mock_screenshot,
+        patch.object(
+            computer_tool, "wait_for_settle", new_callable=AsyncMock
+        ) as mock_settle,
     ):
         mock_shell.return_value = ToolResult(output="Text typed")
         mock_screenshot.return_value = ToolResult(base64_image="base64_screenshot")
         result = await computer_tool(action="type", text="Hello, World!")
         assert mock_shell.call_count == 1
-        assert "type --delay 12 -- 'Hello, World!'" in mock_shell.call_args[0][0]
+        assert "type --delay 0 -- 'Hello, World!'" in mock_shell.call_args[0][0]
         assert result.output == "Text typed"
         assert result.base64_image == "base64_screenshot"
+        assert result.system and result.system.startswith(
+            "typed 13 characters by direct"
+        )
+        mock_settle.assert_awaited_once_with(f"{computer_tool.xdotool} type")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "window_class, xclip, expected",
+    [
+        ("Firefox-esr", "/usr/bin/xclip", "key -- ctrl+v"),
+        ("XTerm", "/usr/bin/xclip", "key -- shift+Insert"),
+        ("URxvt", "/usr/bin/xclip", None),
+        ("Firefox-esr", None, None),
+    ],
+)
+async def test_computer_tool_type_long_text(
+    computer_tool, window_class, xclip, expected
+):
+    text = "x" * 220
+
+    async def fake_shell(command, take_screenshot=True):
+        if command.endswith("getwindowclassname"):
+            return ToolResult(output=f"{window_class}\n")
+        return ToolResult()
+
+    with (
+        patch.object(computer_tool, "shell", side_effect=fake_shell) as mock_shell,
+        patch.object(computer_tool, "screenshot", new_callable=AsyncMock),
+        patch.object(computer_tool, "wait_for_settle", new_callable=AsyncMock),
+        patch("computer_use_demo.tools.computer.shutil.which", return_value=xclip),
+        patch(
+            "computer_use_demo.tools.computer.run", new_callable=AsyncMock
+        ) as mock_run,
+    ):
+        mock_run.return_value = (0, "", "")
+        result = await computer_tool(action="type", text=text)
+    commands = [call.args[0] for call in mock_shell.call_args_list]
+    if expected:
+        assert commands[-1].endswith(expected)
+        assert "xclip -selection" in mock_run.call_args.args[0]
+        assert mock_run.call_args.kwargs["stdin"] == text.encode()
+        assert result.system and " by paste " in result.system
+    else:
+        # typed in chunks of TYPING_GROUP_SIZE
+        assert sum("type --delay 12 --" in command for command in commands) == 5
+        mock_run.assert_not_called()
+        assert result.system and " by keystrokes " in result.system
+
+
+@pytest.mark.asyncio
+async def test_computer_tool_paste_does_not_wait_for_xclip_child(
+    computer_tool, tmp_path, monkeypatch
+):
+    # like xclip, leave a child running in the background to serve the selection
+    xclip = tmp_path / "xclip"
+    xclip.write_text(f"#!/bin/sh\ncat > {tmp_path / 'selection'}\nsleep 10 &\n")
+    xclip.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{tmp_path}:{os.environ['PATH']}")
+    computer_tool._display_prefix = ""
+
+    async def fake_shell(command, take_screenshot=True):
+        if command.endswith("getwindowclassname"):
+            return ToolResult(output="Firefox-esr\n")
+        return ToolResult()
+
+    # longer than a single argument may be
+    text = "x" * 140_000
+    with (
+        patch.object(computer_tool, "shell", side_effect=fake_shell),
+        patch.object(computer_tool, "screenshot", new_callable=AsyncMock),
+        patch.object(computer_tool, "wait_for_settle", new_callable=AsyncMock),
+    ):
+        result = await asyncio.wait_for(computer_tool(action="type", text=text), 5)
+    assert result.system and " by paste " in result.system
+    assert (tmp_path / "selection").read_text() == text
+
+
+@pytest.mark.asyncio
+async def test_computer_tool_paste_falls_back_when_xclip_cannot_run(computer_tool):
+    async def fake_shell(command, take_screenshot=True):
+        if command.endswith("getwindowclassname"):
+            return ToolResult(output="Firefox-esr\n")
+        return ToolResult()
+
+    with (
+        patch.object(computer_tool, "shell", side_effect=fake_shell) as mock_shell,
+        patch.object(computer_tool, "screenshot", new_callable=AsyncMock),
+        patch.object(computer_tool, "wait_for_settle", new_callable=AsyncMock),
+        patch("computer_use_demo.tools.computer.shutil.which", return_value="xclip"),
+        patch(
+            "computer_use_demo.tools.computer.run",
+            side_effect=OSError(7, "Argument list too long"),
+        ),
+    ):
+        result = await computer_tool(action="type", text="x" * 220)
+    assert (
+        sum("type --delay 12 --" in c.args[0] for c in mock_shell.call_args_list) == 5
+    )
+    assert result.system and " by keystrokes " in result.system
+
+
+@pytest.mark.asyncio
+async def test_computer_tool_type_waits_for_damage_after_injection(computer_tool):
+    computer_tool._capture = capture = FakeCapture()
+    computer_tool._settle_min_delay = computer_tool._settle_interval = 0.01
+    computer_tool.injector = injector = AsyncMock()
+
+    async def inject(steps):
+        # the window only redraws the text after the input was injected
+        asyncio.get_running_loop().call_later(
+            0.005, computer_tool.damage._record, (0, 0, 10, 10)
+        )
+        return ""
+
+    injector.run.side_effect = inject
+    with patch.object(
+        DamageTracker, "running", new_callable=PropertyMock, return_value=True
+    ):
+        before = await computer_tool.screenshot()
+        result = await computer_tool(action="type", text="hello")
+    assert capture.grabs == 2
+    assert result.base64_image != before.base64_image
 
 
 @pytest.mark.asyncio
@@ -138,3 +296,604 @@ async def test_computer_tool_missing_coordinate(computer_tool):
 async def test_computer_tool_missing_text(computer_tool):
     with pytest.raises(ToolError, match="text is required for type"):
         await computer_tool(action="type")
+
+
+class FakeCapture(CaptureBackend):
+    name = "fake"
+    in_process = True
+
+    def __init__(self, width=1024, height=768, fail=False, fills=None):
+        super().__init__(display_num=1)
+        self.width, self.height, self.fail = width, height, fail
+        # the byte every successive frame is filled with, a new one per grab by default
+        self.fills = iter(fills) if fills is not None else None
+        self.grabs = 0
+
+    async def grab(self, box=None):
+        if self.fail:
+            raise CaptureError("no display")
+        self.grabs += 1
+        self.last_box = box
+        fill = next(self.fills) if self.fills is not None else self.grabs % 256
+        width, height = self.width, self.height
+        if box is not None:
+            width, height = box[2] - box[0], box[3] - box[1]
+        return Frame(
+            width=width, height=height, data=bytes([fill]) * (width * height * 3)
+        )
+
+
+def _decode(result: ToolResult) -> Image.Image:
+    assert result.base64_image
+    return Image.open(BytesIO(base64.b64decode(result.base64_image)))
+
+
+@pytest.mark.asyncio
+async def test_computer_tool_screenshot_in_memory(computer_tool):
+    computer_tool._capture = FakeCapture(width=1920, height=1080)
+    computer_tool.width, computer_tool.height = 1920, 1080
+    result = await computer_tool.screenshot()
+    image = _decode(result)
+    assert image.format == "PNG"
+    assert image.size == (1366, 768)
+
+
+@pytest.mark.asyncio
+async def test_computer_tool_screenshot_falls_back_to_scrot(computer_tool):
+    computer_tool._capture = FakeCapture(fail=True)
+    fallback = FakeCapture()
+    with patch(
+        "computer_use_demo.tools.computer.ScrotCapture",
+        return_value=fallback,
+    ) as mock_scrot:
+        result = await computer_tool.screenshot()
+    mock_scrot.assert_called_once_with(computer_tool.display_num)
+    assert computer_tool._capture is fallback
+    assert _decode(result).size == (1024, 768)
+
+
+@pytest.mark.asyncio
+async def test_computer_tool_settles_once_screen_is_stable(computer_tool):
+    computer_tool._capture = FakeCapture(fills=[1, 2, 3, 3, 3])
+    computer_tool._settle_min_delay = computer_tool._settle_interval = 0.001
+    result = await computer_tool.wait_for_settle(f"{computer_tool.xdotool} click 1")
+    assert result.settled
+    assert result.label == "click"
+    assert result.samples == 5
+    assert result.elapsed < computer_tool._screenshot_delay
+    assert computer_tool.settle_stats.summary()["click"]["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_computer_tool_settle_times_out(computer_tool):
+    computer_tool._capture = FakeCapture()
+    computer_tool._screenshot_delay = 0.05
+    computer_tool._settle_min_delay = computer_tool._settle_interval = 0.01
+    result = await computer_tool.wait_for_settle(f"{computer_tool.xdotool} key -- a")
+    assert not result.settled
+    assert result.elapsed <= 0.1
+    assert computer_tool.settle_stats.summary()["key"]["timeouts"] == 1
+
+
+@pytest.mark.asyncio
+async def test_computer_tool_screenshot_cache(computer_tool):
+    computer_tool._capture = FakeCapture(fills=[1, 1, 2])
+    first = await computer_tool.screenshot()
+    with patch("computer_use_demo.tools.computer.encode_image") as mock_encode:
+        second = await computer_tool.screenshot()
+    mock_encode.assert_not_called()
+    assert second.base64_image == first.base64_image
+    third = await computer_tool.screenshot()
+    assert third.base64_image != first.base64_image
+    assert computer_tool.screenshot_cache.stats()["hits"] == 1
+    assert computer_tool.screenshot_cache.stats()["misses"] == 2
+
+
+def test_screenshot_cache_evicts_least_recently_used():
+    cache = ScreenshotCache(max_entries=2, max_bytes=10)
+    a, b, c = (ToolResult(base64_image=char * 4) for char in "abc")
+    cache.put("a", a)
+    cache.put("b", b)
+    assert cache.get("a") is a
+    cache.put("c", c)
+    assert cache.get("b") is None
+    cache.put("d", ToolResult(base64_image="dddddd"))
+    assert cache.get("a") is None
+    assert cache.stats() == {"hits": 1, "misses": 2, "entries": 2, "bytes": 10}
+    # evicted down to the byte budget, not just the entry count
+    cache.put("e", ToolResult(base64_image="eeeeeeee"))
+    assert cache.stats()["entries"] == 1
+    assert cache.stats()["bytes"] == 8
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "policy,media_type,image_format",
+    [
+        (EncodingPolicy(), "image/png", "PNG"),
+        (EncodingPolicy(format="jpeg", quality=70), "image/jpeg", "JPEG"),
+        (EncodingPolicy(format="webp"), "image/webp", "WEBP"),
+        # a png over budget is re-encoded as jpeg
+        (EncodingPolicy(max_bytes=1), "image/jpeg", "JPEG"),
+    ],
+)
+async def test_computer_tool_screenshot_encoding(
+    computer_tool, policy, media_type, image_format
+):
+    computer_tool._capture = FakeCapture()
+    computer_tool.encoding_policy = policy
+    result = await computer_tool.screenshot()
+    assert result.image_media_type == media_type
+    assert _decode(result).format == image_format
+
+
+def test_encode_image_steps_quality_down_to_fit_budget():
+    image = Image.effect_noise((256, 256), 64).convert("RGB")
+    full = encode_image(image, EncodingPolicy(format="jpeg", quality=95))
+    budget = len(full.data) // 2
+    fitted = encode_image(
+        image, EncodingPolicy(format="jpeg", quality=95, max_bytes=budget)
+    )
+    assert len(fitted.data) <= budget
+    # gives up at min_quality rather than degrading further
+    floor = encode_image(
+        image, EncodingPolicy(format="jpeg", quality=95, max_bytes=1, min_quality=50)
+    )
+    assert (
+        floor.data
+        == encode_image(image, EncodingPolicy(format="jpeg", quality=50)).data
+    )
+
+
+@pytest.mark.asyncio
+async def test_computer_tool_encodes_off_the_event_loop():
+    computer_tool = ComputerTool20250124()
+    computer_tool._capture = FakeCapture()
+    threads = []
+
+    def record_thread(func):
+        def wrapper(*args, **kwargs):
+            threads.append(threading.get_ident())
+            return func(*args, **kwargs)
+
+        return wrapper
+
+    with (
+        patch.object(Frame, "digest", record_thread(Frame.digest)),
+        patch(
+            "computer_use_demo.tools.computer.encode_image",
+            record_thread(encode_image),
+        ),
+    ):
+        await computer_tool.screenshot()
+        await computer_tool(action="zoom", region=[0, 0, 10, 10], scale=2)
+    assert len(threads) == 3
+    assert threading.get_ident() not in threads
+
+
+@pytest.mark.asyncio
+async def test_computer_tool_shell_keeps_screenshot_media_type(computer_tool):
+    computer_tool._capture = FakeCapture()
+    computer_tool.encoding_policy = EncodingPolicy(format="jpeg")
+    with (
+        patch(
+            "computer_use_demo.tools.computer.run", new_callable=AsyncMock
+        ) as mock_run,
+        patch.object(computer_tool, "wait_for_settle", new_callable=AsyncMock),
+    ):
+        mock_run.return_value = (0, "", "")
+        result = await computer_tool.shell(f"{computer_tool.xdotool} click 1")
+    assert result.image_media_type == "image/jpeg"
+    assert _decode(result).format == "JPEG"
+
+
+@pytest.mark.asyncio
+async def test_computer_tool_zoom():
+    computer_tool = ComputerTool20250124()
+    computer_tool._capture = capture = FakeCapture(width=1920, height=1080)
+    computer_tool.width, computer_tool.height = 1920, 1080
+    result = await computer_tool(action="zoom", region=[0, 0, 683, 384])
+    # API coordinates are mapped back to native screen pixels
+    assert capture.last_box == (0, 0, 960, 540)
+    assert _decode(result).size == (960, 540)
+
+    result = await computer_tool(action="zoom", region=[100, 100, 200, 150], scale=2)
+    assert _decode(result).size == (
+        2 * (capture.last_box[2] - capture.last_box[0]),
+        2 * (capture.last_box[3] - capture.last_box[1]),
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "kwargs,match",
+    [
+        ({}, "region is required for zoom"),
+        ({"region": [0, 0, 10]}, "must be a list of four non-negative ints"),
+        ({"region": [10, 0, 5, 10]}, "x0 < x1"),
+        ({"region": [0, 0, 10, 10], "scale": 10}, "must be a number between 1 and"),
+    ],
+)
+async def test_computer_tool_zoom_invalid(kwargs, match):
+    computer_tool = ComputerTool20250124()
+    computer_tool._capture = FakeCapture()
+    with pytest.raises(ToolError, match=match):
+        await computer_tool(action="zoom", **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_computer_tool_zoom_outside_screen():
+    computer_tool = ComputerTool20250124()
+    computer_tool._capture = capture = FakeCapture(width=1920, height=1080)
+    computer_tool.width, computer_tool.height = 1920, 1080
+    # inside the native width, but not the 1366x768 screen the API sees
+    with pytest.raises(ToolError, match="must lie within the 1366x768 screen"):
+        await computer_tool(action="zoom", region=[1300, 0, 1400, 100])
+    assert capture.grabs == 0
+    # the far edge of the screen maps back to at most the native size
+    await computer_tool(action="zoom", region=[1300, 700, 1366, 768])
+    assert capture.last_box == (1827, 984, 1920, 1080)
+    assert computer_tool._capture is capture
+
+
+@pytest.mark.asyncio
+async def test_computer_zoom_tool():
+    tools = TOOL_GROUPS_BY_VERSION["computer_use_20250124"].create_tools()
+    computer_tool = tools[0]
+    zoom_tool = next(t for t in tools if isinstance(t, ComputerZoomTool20250124))
+    assert zoom_tool.tool is computer_tool
+    assert zoom_tool.to_params()["name"] == "computer_zoom"
+    with patch.object(computer_tool, "zoom", new_callable=AsyncMock) as mock_zoom:
+        await zoom_tool(region=[0, 0, 10, 10])
+    mock_zoom.assert_awaited_once_with([0, 0, 10, 10], None)
+
+
+def test_damage_tracker_records_dirty_rects():
+    tracker = DamageTracker(display_num=1, max_rects=2)
+    assert tracker.quiet_for() == float("inf")
+    generation = tracker.generation
+    tracker._record((0, 0, 10, 10))
+    tracker._record((20, 20, 30, 30))
+    assert tracker.changed_since(generation)
+    assert tracker.dirty_rects() == [(0, 0, 10, 10), (20, 20, 30, 30)]
+    # merged into the bounding box once there are too many rectangles
+    tracker._record((5, 40, 8, 50))
+    assert tracker.dirty_rects(clear=True) == [(0, 0, 30, 50)]
+    assert tracker.dirty_rects() == []
+    assert tracker.quiet_for() < 1
+
+
+@pytest.mark.asyncio
+async def test_computer_tool_close(computer_tool):
+    computer_tool._capture = capture = Mock(spec=CaptureBackend)
+    computer_tool.injector = injector = Mock()
+    with patch.object(computer_tool.damage, "stop") as stop:
+        await ToolCollection(computer_tool).close()
+    stop.assert_called_once_with()
+    capture.close.assert_called_once_with()
+    injector.close.assert_called_once_with()
+
+
+@pytest.mark.asyncio
+async def test_computer_tool_screenshot_skips_capture_without_damage(computer_tool):
+    computer_tool._capture = capture = FakeCapture()
+    with patch.object(
+        DamageTracker, "running", new_callable=PropertyMock, return_value=True
+    ):
+        first = await computer_tool.screenshot()
+        assert await computer_tool.screenshot() is first
+        assert capture.grabs == 1
+        # settling only consults the tracker
+        await computer_tool._sample_checksum()
+        assert capture.grabs == 1
+
+        computer_tool.damage._record((0, 0, 1, 1))
+        await computer_tool.screenshot()
+        assert capture.grabs == 2
+
+
+@pytest.mark.asyncio
+async def test_scrot_capture_removes_its_scratch_file(tmp_path):
+    async def fake_scrot(cmd, env):
+        assert env == {"DISPLAY": ":1"}
+        path = cmd[-1]
+        Image.new("RGB", (8, 6)).save(path)
+        return 0, "", ""
+
+    with (
+        patch("computer_use_demo.tools.capture.SCRATCH_DIR", str(tmp_path)),
+        patch("computer_use_demo.tools.capture.run", side_effect=fake_scrot),
+    ):
+        frame = await ScrotCapture(display_num=1).grab()
+    assert (frame.width, frame.height) == (8, 6)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_screenshot_ring_evicts_oldest(tmp_path):
+    (tmp_path / "screenshot_leftover.png").write_bytes(b"x" * 4)
+    ring = ScreenshotRing(directory=str(tmp_path), max_files=2, max_bytes=10)
+    image = EncodedImage(data=b"y" * 4, media_type="image/jpeg")
+    first = ring.write(image)
+    assert first.suffix == ".jpg"
+    assert len(list(tmp_path.iterdir())) == 2
+    ring.write(image)
+    assert not (tmp_path / "screenshot_leftover.png").exists()
+    assert first.exists()
+    # evicted down to the byte budget, not just the file count
+    last = ring.write(EncodedImage(data=b"z" * 8, media_type="image/png"))
+    assert list(tmp_path.iterdir()) == [last]
+    assert ring.bytes_written == 16
+
+
+@pytest.mark.asyncio
+async def test_computer_tool_screenshot_ring(computer_tool, tmp_path):
+    computer_tool._capture = FakeCapture()
+    assert computer_tool.screenshot_ring is None
+    assert "screenshot_ring" not in computer_tool.stats()
+    computer_tool.screenshot_ring = ScreenshotRing(directory=str(tmp_path))
+    await computer_tool.screenshot()
+    [path] = tmp_path.iterdir()
+    size = path.stat().st_size
+    assert computer_tool.stats()["screenshot_ring"] == {
+        "bytes_written": size,
+        "files": 1,
+        "bytes": size,
+    }
+
+
+def test_screenshot_ring_from_env(monkeypatch):
+    monkeypatch.delenv("SCREENSHOT_RING_MAX_FILES", raising=False)
+    assert ScreenshotRing.from_env() is None
+    monkeypatch.setenv("SCREENSHOT_RING_MAX_FILES", "many")
+    with pytest.raises(ToolError, match="Invalid screenshot ring setting"):
+        ScreenshotRing.from_env()
+
+
+CTRL = keysym_for_name("Control_L")
+SHIFT = keysym_for_name("Shift_L")
+
+
+@pytest.mark.parametrize(
+    "command, expected",
+    [
+        ("mousemove --sync 10 20", [Step("mousemove", (10, 20, True))]),
+        (
+            "mousedown 1 mousemove --sync 5 6 mouseup 1",
+            [
+                Step("mousedown", (1,)),
+                Step("mousemove", (5, 6, True)),
+                Step("mouseup", (1,)),
+            ],
+        ),
+        ("click --repeat 2 --delay 10 1", [Step("click", (1, 2, 10))]),
+        ("click 3", [Step("click", (3, 1, 100))]),
+        (
+            "key -- ctrl+a Return",
+            [
+                Step("key", ((CTRL, keysym_for_name("a")), 12)),
+                Step("key", ((keysym_for_name("Return"),), 12)),
+            ],
+        ),
+        (
+            "keydown shift click --repeat 3 5 keyup shift",
+            [
+                Step("keydown", ((SHIFT,), 12)),
+                Step("click", (5, 3, 100)),
+                Step("keyup", ((SHIFT,), 12)),
+            ],
+        ),
+        (
+            "keydown ctrl sleep 1.5 keyup ctrl",
+            [
+                Step("keydown", ((CTRL,), 12)),
+                Step("sleep", (1.5,)),
+                Step("keyup", ((CTRL,), 12)),
+            ],
+        ),
+        ("type --delay 12 -- 'a b -- c'", [Step("type", ("a b -- c", 12))]),
+        ("getmouselocation --shell", [Step("getmouselocation", (True,))]),
+    ],
+)
+def test_parse_xdotool(command, expected):
+    assert parse_xdotool(shlex.split(command)) == expected
+
+
+@pytest.mark.parametrize(
+    "command",
+    [
+        "search --name foo",
+        "mousemove --window 1 5 6",
+        "key",
+        "click x",
+        # unknown keys are found before anything is injected
+        "key -- ctrl+a Return NotAKey",
+    ],
+)
+def test_parse_xdotool_unsupported(command):
+    with pytest.raises(UnsupportedCommand):
+        parse_xdotool(shlex.split(command))
+
+
+def test_injector_checks_keysyms_before_injecting():
+    injector = XTestInjector(display_num=1)
+    injector._keycodes = {keysym_for_name("a"): (38, False)}
+    steps = parse_xdotool(["key", "a", "type", "ab"])
+    with pytest.raises(UnsupportedCommand, match="no keycode to type keysym 0x62"):
+        injector._check_keysyms(steps)
+    # missing keysyms are bound to the spare keycode while they are typed
+    injector._spare_keycode = 255
+    injector._check_keysyms(steps)
+
+
+def test_keysyms():
+    assert keysym_for_name("ctrl") == keysym_for_name("Control_L")
+    assert keysym_for_name("Return") == 0xFF0D
+    assert keysym_for_name("XF86AudioMute") != 0
+    assert keysym_for_char("\n") == 0xFF0D
+    assert keysym_for_char("é") == 0xE9
+    assert keysym_for_char("€") == 0x01000000 | 0x20AC
+
+
+@pytest.mark.asyncio
+async def test_computer_tool_shell_injects_xdotool_commands(computer_tool):
+    computer_tool.injector = AsyncMock()
+    computer_tool.injector.run.return_value = "X=1\nY=2\nSCREEN=0\nWINDOW=3\n"
+    with patch("computer_use_demo.tools.computer.run") as mock_run:
+        result = await computer_tool(action="cursor_position")
+    mock_run.assert_not_called()
+    computer_tool.injector.run.assert_awaited_once_with(
+        [Step("getmouselocation", (True,))]
+    )
+    assert result.output == "X=1,Y=2"
+
+
+@pytest.mark.asyncio
+async def test_computer_tool_shell_falls_back_to_xdotool(computer_tool):
+    injector = computer_tool.injector = AsyncMock()
+    injector.close = Mock()
+    injector.run.side_effect = InjectionError("no display")
+    with patch(
+        "computer_use_demo.tools.computer.run", new_callable=AsyncMock
+    ) as mock_run:
+        mock_run.return_value = (0, "moved", "")
+        result = await computer_tool.shell(
+            f"{computer_tool.xdotool} mousemove 1 2", take_screenshot=False
+        )
+        # unsupported commands are left to xdotool without disabling the injector
+        computer_tool.injector = AsyncMock()
+        await computer_tool.shell(
+            f"{computer_tool.xdotool} search --name foo", take_screenshot=False
+        )
+    assert result.output == "moved"
+    injector.close.assert_called_once()
+    assert mock_run.await_count == 2
+    computer_tool.injector.run.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_computer_tool_shell_does_not_repeat_partial_input(computer_tool):
+    injector = computer_tool.injector = AsyncMock()
+    injector.close = Mock()
+    injector.run.side_effect = InjectionError("connection lost", partial=True)
+    with patch(
+        "computer_use_demo.tools.computer.run", new_callable=AsyncMock
+    ) as mock_run:
+        with pytest.raises(ToolError, match="connection lost"):
+            await computer_tool.shell(
+                f"{computer_tool.xdotool} key a b", take_screenshot=False
+            )
+    mock_run.assert_not_called()
+    injector.close.assert_called_once()
+    assert computer_tool.injector is None
+
+
+@pytest.mark.asyncio
+async def test_computer_tool_batch_takes_one_screenshot():
+    computer_tool = ComputerTool20250124()
+    computer_tool._capture = FakeCapture(fills=[1, 1, 1, 1])
+    with (
+        patch(
+            "computer_use_demo.tools.computer.run", new_callable=AsyncMock
+        ) as mock_run,
+        patch.object(
+            computer_tool, "wait_for_settle", new_callable=AsyncMock
+        ) as mock_settle,
+    ):
+        computer_tool.injector = None
+        mock_run.return_value = (0, "", "")
+        result = await computer_tool.batch(
+            [
+                {"action": "left_click", "coordinate": [10, 20]},
+                {"action": "type", "text": "hello"},
+                {"action": "key", "text": "Return"},
+            ]
+        )
+    # xdotool is run without a shell
+    assert [call.args[0] for call in mock_run.await_args_list] == [
+        ["xdotool", "mousemove", "--sync", "10", "20", "click", "1"],
+        ["xdotool", "type", "--delay", "0", "--", "hello"],
+        ["xdotool", "key", "--", "Return"],
+    ]
+    mock_settle.assert_awaited_once_with("batch")
+    assert computer_tool._capture.grabs == 1
+    assert (
+        result.output == "Step 1 (left_click): ok\nStep 2 (type): ok\nStep 3 (key): ok"
+    )
+    assert result.error is None
+    assert result.base64_image
+
+
+@pytest.mark.asyncio
+async def test_computer_tool_batch_stops_at_first_error():
+    computer_tool = ComputerTool20250124()
+    computer_tool._capture = FakeCapture()
+    with (
+        patch.object(computer_tool, "shell", new_callable=AsyncMock) as mock_shell,
+        patch.object(computer_tool, "wait_for_settle", new_callable=AsyncMock),
+    ):
+        mock_shell.return_value = ToolResult(output="clicked")
+        result = await computer_tool.batch(
+            [
+                {"action": "left_click"},
+                {"action": "mouse_move"},
+                {"action": "key", "text": "Return"},
+            ]
+        )
+    assert mock_shell.await_count == 1
+    assert result.output == "Step 1 (left_click): clicked"
+    assert (
+        result.error
+        == "Step 2 (mouse_move) failed: coordinate is required for mouse_move"
+    )
+    assert result.base64_image
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "actions",
+    [None, [], [{"text": "a"}], [{"action": "screenshot"}], [{"action": "key"}] * 21],
+)
+async def test_computer_tool_batch_invalid(actions):
+    with pytest.raises(ToolError):
+        await ComputerTool20250124().batch(actions)
+
+
+@pytest.mark.asyncio
+async def test_computer_batch_tool():
+    tools = TOOL_GROUPS_BY_VERSION["computer_use_20250124"].create_tools()
+    computer_tool = tools[0]
+    batch_tool = next(t for t in tools if isinstance(t, ComputerBatchTool20250124))
+    assert batch_tool.tool is computer_tool
+    params = batch_tool.to_params()
+    assert params["name"] == "computer_batch"
+    enum = params["input_schema"]["properties"]["actions"]["items"]["properties"][
+        "action"
+    ]["enum"]
+    assert "left_click" in enum and "screenshot" not in enum
+    with patch.object(computer_tool, "batch", new_callable=AsyncMock) as mock_batch:
+        await batch_tool(actions=[{"action": "left_click"}])
+    mock_batch.assert_awaited_once_with([{"action": "left_click"}])
+
+
+def test_draw_cursor():
+    # a 2x2 pointer, opaque red but for a half transparent white bottom right pixel,
+    # drawn on black
+    cursor = SimpleNamespace(
+        x=3,
+        y=1,
+        xhot=1,
+        yhot=1,
+        width=2,
+        height=2,
+        cursor_image=[0xFFFF0000, 0xFFFF0000, 0xFFFF0000, 0x80808080],
+    )
+    frame = Frame(width=4, height=3, data=bytes(4 * 4 * 3), mode="BGRX")
+    image = draw_cursor(frame, cursor).to_image()
+    assert image.getpixel((2, 0)) == (255, 0, 0)
+    assert image.getpixel((3, 1)) == (128, 128, 128)
+    assert image.getpixel((1, 1)) == (0, 0, 0)
+    # the part of the pointer outside a captured region is clipped
+    image = draw_cursor(frame, cursor, left=2, top=0).to_image()
+    assert image.getpixel((0, 0)) == (255, 0, 0)
+    assert image.getpixel((1, 1)) == (128, 128, 128)
+    assert draw_cursor(frame, cursor, left=10) is frame
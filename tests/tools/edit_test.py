@@ -1,10 +1,21 @@
+import os
+import random
+import zlib
 from pathlib import Path
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
 
 import pytest
 
+from computer_use_demo.tools import TOOL_GROUPS_BY_VERSION
 from computer_use_demo.tools.base import CLIResult, ToolError, ToolResult
-from computer_use_demo.tools.edit import EditTool20241022, EditTool20250124
+from computer_use_demo.tools.edit import (
+    EditBatchTool20250124,
+    EditTool20241022,
+    EditTool20250124,
+    FileHistory,
+)
+from computer_use_demo.tools.lines import LineIndex
+from computer_use_demo.tools.listing import DirectoryCache, Listing, list_directory
 
 
 @pytest.fixture(params=[EditTool20241022, EditTool20250124])
@@ -27,8 +38,13 @@ async def test_view_command(edit_tool):
     # Test viewing a directory
     with patch("pathlib.Path.exists", return_value=True), patch(
         "pathlib.Path.is_dir", return_value=True
-    ), patch("computer_use_demo.tools.edit.run") as mock_run:
-        mock_run.return_value = (None, "file1.txt\nfile2.txt", None)
+    ), patch("computer_use_demo.tools.edit.list_directory") as mock_list:
+        mock_list.return_value = Listing(
+            paths=("/test/dir", "/test/dir/file1.txt", "/test/dir/file2.txt"),
+            errors=(),
+            truncated=False,
+            mtimes=(),
+        )
         result = await edit_tool(command="view", path="/test/dir")
         assert isinstance(result, CLIResult)
         assert result.output
@@ -155,7 +171,9 @@ async def test_str_replace_command(edit_tool):
             old_str="Original",
             new_str="New",
         )
-        assert edit_tool._file_history[Path("/test/file.txt")] == ["Original content"]
+        assert edit_tool._file_history.versions(Path("/test/file.txt")) == [
+            "Original content"
+        ]
 
 
 @pytest.mark.asyncio
@@ -235,7 +253,9 @@ async def test_insert_command(edit_tool):
         await edit_tool(
             command="insert", path="/test/file.txt", insert_line=1, new_str="New Line"
         )
-        assert edit_tool._file_history[Path("/test/file.txt")] == ["Original content"]
+        assert edit_tool._file_history.versions(Path("/test/file.txt")) == [
+            "Original content"
+        ]
 
 
 @pytest.mark.asyncio
@@ -321,3 +341,228 @@ async def test_validate_path(edit_tool):
         "pathlib.Path.is_dir", return_value=True
     ):
         edit_tool.validate_path("view", Path("/directory/path"))
+
+
+def test_file_history_is_bounded():
+    versions = [random.Random(i).randbytes(300).hex() for i in range(5)]
+    size = max(len(zlib.compress(text.encode(), 1)) for text in versions)
+    history = FileHistory(max_file_bytes=size * 5 // 2, max_bytes=size * 7 // 2)
+    a, b = Path("/a"), Path("/b")
+    for text in versions[:3]:
+        history.push(a, text)
+    # the oldest version of /a is dropped to fit its cap
+    assert history.versions(a) == versions[1:3]
+    history.push(b, versions[3])
+    history.push(b, versions[4])
+    # the oldest versions overall are dropped to fit the total cap
+    assert history.versions(a) == versions[2:3]
+    assert history.versions(b) == versions[3:5]
+    assert history.stats()["bytes"] <= history.max_bytes
+
+    assert history.pop(b) == versions[4]
+    assert history.pop(b) == versions[3]
+    assert history.pop(b) is None
+
+    # a version too large to keep leaves nothing older to undo to
+    history.push(a, random.Random(6).randbytes(1200).hex())
+    assert history.pop(a) is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "view_range", [None, [1, 1], [2, 5], [7, -1], [12, 12], [12, -1], [1, -1]]
+)
+async def test_view_large_file_by_line_index(tmp_path, view_range, monkeypatch):
+    path = tmp_path / "big.txt"
+    path.write_text("zero\n\tone\r\ntwo\n\n" + "".join(f"ä{i}\n" for i in range(7)))
+    tool = EditTool20250124()
+    expected = await tool(command="view", path=str(path), view_range=view_range)
+
+    monkeypatch.setattr("computer_use_demo.tools.edit.VIEW_INDEX_MIN_BYTES", 0)
+    monkeypatch.setattr(LineIndex, "checkpoint_bytes", 5)
+    with patch("pathlib.Path.read_text") as mock_read_text:
+        result = await tool(command="view", path=str(path), view_range=view_range)
+    mock_read_text.assert_not_called()
+    assert result == expected
+
+
+@pytest.mark.asyncio
+async def test_view_large_file_rebuilds_stale_index(tmp_path, monkeypatch):
+    monkeypatch.setattr("computer_use_demo.tools.edit.VIEW_INDEX_MIN_BYTES", 0)
+    path = tmp_path / "big.txt"
+    path.write_text("a\nb\n")
+    tool = EditTool20250124()
+    with pytest.raises(ToolError, match=r"should be within the range .*\[1, 3\]"):
+        await tool(command="view", path=str(path), view_range=[4, 4])
+    path.write_text("a\nb\nc\nd\n")
+    result = await tool(command="view", path=str(path), view_range=[4, 4])
+    assert result.output.endswith("     4\td\n")
+
+
+@pytest.mark.asyncio
+async def test_str_replace_snippet_and_ambiguous_lines(tmp_path):
+    rng = random.Random(0)
+    tool = EditTool20250124()
+    path = tmp_path / "file.txt"
+    for _ in range(50):
+        lines = [f"line {i}" for i in range(rng.randint(1, 20))]
+        target = rng.randrange(len(lines))
+        lines[target] = "\ttarget"
+        content = "\n".join(lines)
+        new_str = "\n".join("new" for _ in range(rng.randint(1, 3)))
+        path.write_text(content)
+        result = await tool(
+            command="str_replace", path=str(path), old_str="\ttarget", new_str=new_str
+        )
+
+        # what splitting the whole file into lines gives
+        expanded = content.expandtabs()
+        new_content = expanded.replace("\ttarget".expandtabs(), new_str)
+        replacement_line = expanded.split("\ttarget".expandtabs())[0].count("\n")
+        start_line = max(0, replacement_line - 4)
+        end_line = replacement_line + 4 + new_str.count("\n")
+        snippet = "\n".join(new_content.split("\n")[start_line : end_line + 1])
+        assert path.read_text() == new_content
+        assert tool._make_output(snippet, f"a snippet of {path}", start_line + 1) in (
+            result.output or ""
+        )
+
+    path.write_text("a b\nb\nc\nb b\n")
+    with pytest.raises(ToolError, match=r"in lines \[1, 2, 4\]"):
+        await tool(command="str_replace", path=str(path), old_str="b", new_str="x")
+    with pytest.raises(ToolError, match=r"in lines \[1, 3\]"):
+        await tool(command="str_replace", path=str(path), old_str="\nb", new_str="x")
+
+
+@pytest.mark.asyncio
+async def test_view_directory(tmp_path, monkeypatch):
+    for name in ["b/d/e/f", "a", ".hidden/x", "b/.git/y", "c/z"]:
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).touch()
+    # so that adding an entry surely changes it, however coarse the clock
+    os.utime(tmp_path / "c", ns=(0, 0))
+    tool = EditTool20250124()
+    result = await tool(command="view", path=str(tmp_path))
+    assert result.output == (
+        f"Here's the files and directories up to 2 levels deep in {tmp_path}, "
+        "excluding hidden items:\n"
+        + "".join(
+            f"{tmp_path}{name}\n" for name in ["", "/a", "/b", "/b/d", "/c", "/c/z"]
+        )
+        + "\n"
+    )
+
+    # unchanged directories are listed from the cache
+    assert await tool(command="view", path=str(tmp_path)) == result
+    assert tool._directory_cache.hits == 1
+    (tmp_path / "c" / "new").touch()
+    result = await tool(command="view", path=str(tmp_path))
+    assert f"{tmp_path}/c/new\n" in (result.output or "")
+    assert tool._directory_cache.hits == 1
+
+    monkeypatch.setattr(tool, "_directory_cache", DirectoryCache())
+    monkeypatch.setattr(
+        "computer_use_demo.tools.edit.list_directory",
+        lambda path: list_directory(path, max_entries=2),
+    )
+    result = await tool(command="view", path=str(tmp_path))
+    assert (result.output or "").endswith(
+        f"{tmp_path}/b\n<response clipped: only the first 2 entries are listed>\n\n"
+    )
+
+
+@pytest.mark.asyncio
+async def test_batch_edits(tmp_path):
+    original = "\n".join(f"line {i}" for i in range(1, 31))
+    edits = [
+        {"command": "str_replace", "old_str": "line 3\n", "new_str": "three\n"},
+        {"command": "insert", "insert_line": 20, "new_str": "after 20\nand more"},
+        {"command": "str_replace", "old_str": "line 4", "new_str": "four"},
+        {"command": "insert", "insert_line": 32, "new_str": "\tlast"},
+        {"command": "str_replace", "old_str": "more\nline 21"},
+    ]
+    batched, single = tmp_path / "batched.txt", tmp_path / "single.txt"
+    batched.write_text(original)
+    single.write_text(original)
+
+    tool = EditTool20250124()
+    result = await tool.batch(str(batched), edits)
+    for edit in edits:
+        await tool(path=str(single), **edit)
+    assert batched.read_text() == single.read_text()
+
+    output = result.output or ""
+    assert output.startswith(f"The file {batched} has been edited by 5 edits. ")
+    # edits close together share a snippet
+    assert output.count("Here's the result of running `cat -n`") == 3
+    assert "     1\tline 1\n     2\tline 2\n     3\tthree\n     4\tfour\n" in output
+    assert "     8\tline 8\n" in output and "     9\t" not in output
+    assert "    17\tline 17\n" in output and "    16\t" not in output
+    assert "    21\tafter 20\n    22\tand \n    23\tline 22\n" in output
+    assert "    26\tline 25\nHere's" in output
+    assert output.endswith(
+        "    31\tline 30\n    32\t        last\nReview the changes and make sure they are as expected. Edit the file again if necessary."
+    )
+
+    # the batch is undone at once
+    await tool(command="undo_edit", path=str(batched))
+    assert batched.read_text() == original
+
+
+@pytest.mark.asyncio
+async def test_batch_edits_fail_without_writing(tmp_path):
+    path = tmp_path / "file.txt"
+    path.write_text("a\nb\n")
+    tool = EditTool20250124()
+    with pytest.raises(
+        ToolError,
+        match=r"Edit 2 \(str_replace\) failed, so no edits were made: No replacement was performed, old_str `a` did not appear",
+    ):
+        await tool.batch(
+            str(path),
+            [
+                {"command": "str_replace", "old_str": "a", "new_str": "c"},
+                {"command": "str_replace", "old_str": "a", "new_str": "d"},
+            ],
+        )
+    assert path.read_text() == "a\nb\n"
+    with pytest.raises(ToolError, match="No edit history found"):
+        await tool(command="undo_edit", path=str(path))
+
+    with pytest.raises(ToolError, match="must be an object with a command of"):
+        await tool.batch(str(path), [{"command": "view"}])
+    with pytest.raises(ToolError, match="must be a non-empty list"):
+        await tool.batch(str(path), [])
+    with pytest.raises(
+        ToolError,
+        match=r"Edit 2 \(insert\) failed, so no edits were made: Parameter `insert_line` must be of type int",
+    ):
+        await tool.batch(
+            str(path),
+            [
+                {"command": "insert", "insert_line": 1, "new_str": "c"},
+                {"command": "insert", "insert_line": "3", "new_str": "d"},
+            ],
+        )
+    with pytest.raises(
+        ToolError, match=r"Edit 1 \(str_replace\) .* `old_str` must be of type str"
+    ):
+        await tool.batch(str(path), [{"command": "str_replace", "old_str": 5}])
+    with pytest.raises(ToolError, match="`new_str` must be of type str"):
+        await tool.batch(
+            str(path), [{"command": "str_replace", "old_str": "a", "new_str": ["c"]}]
+        )
+    assert path.read_text() == "a\nb\n"
+
+
+@pytest.mark.asyncio
+async def test_edit_batch_tool():
+    tools = TOOL_GROUPS_BY_VERSION["computer_use_20250124"].create_tools()
+    editor = next(t for t in tools if isinstance(t, EditTool20250124))
+    batch_tool = next(t for t in tools if isinstance(t, EditBatchTool20250124))
+    assert batch_tool.tool is editor
+    assert batch_tool.to_params()["name"] == "str_replace_editor_batch"
+    edits = [{"command": "insert", "insert_line": 0, "new_str": "x"}]
+    with patch.object(editor, "batch", new_callable=AsyncMock) as mock_batch:
+        await batch_tool(path="/a", edits=edits)
+    mock_batch.assert_awaited_once_with("/a", edits)
@@ -0,0 +1,53 @@
+import asyncio
+import threading
+
+import pytest
+
+from computer_use_demo.tools.offload import Offloader
+
+
+@pytest.mark.asyncio
+async def test_offloader_bounds_workers_and_records_queueing():
+    offloader = Offloader(max_workers=2, name="test")
+    release = threading.Event()
+    loop_thread = threading.get_ident()
+
+    def work(i: int) -> tuple[int, bool]:
+        release.wait(5)
+        return i, threading.get_ident() != loop_thread
+
+    tasks = [asyncio.create_task(offloader.run("work", work, i)) for i in range(5)]
+    await asyncio.sleep(0.05)
+    # two calls run while the rest wait for a worker, without blocking the loop
+    assert (offloader.running, offloader.queued) == (2, 3)
+    release.set()
+    assert await asyncio.gather(*tasks) == [(i, True) for i in range(5)]
+    assert (offloader.running, offloader.queued) == (0, 0)
+
+    summary = offloader.stats.summary()["work"]
+    assert summary["count"] == 5
+    assert summary["max_queue_depth"] >= 3
+    assert summary["wait_p95_ms"] >= 40
+
+
+@pytest.mark.asyncio
+async def test_offloader_cancelled_while_queued():
+    offloader = Offloader(max_workers=1, name="test")
+    release = threading.Event()
+    running = asyncio.create_task(offloader.run("block", release.wait, 5))
+    queued = asyncio.create_task(offloader.run("never", lambda: None))
+    await asyncio.sleep(0.05)
+    queued.cancel()
+    await asyncio.sleep(0)
+    release.set()
+    assert await running
+    assert (offloader.running, offloader.queued) == (0, 0)
+    assert "never" not in offloader.stats.summary()
+
+
+@pytest.mark.asyncio
+async def test_offloader_propagates_errors():
+    offloader = Offloader(max_workers=1, name="test")
+    with pytest.raises(ZeroDivisionError):
+        await offloader.run("fail", lambda: 1 / 0)
+    assert offloader.stats.summary()["fail"]["count"] == 1
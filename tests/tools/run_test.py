@@ -0,0 +1,66 @@
+import pytest
+
+from computer_use_demo.tools import run as run_module
+from computer_use_demo.tools.run import (
+    TRUNCATED_MESSAGE,
+    SpawnStats,
+    maybe_truncate,
+    run,
+)
+
+
+@pytest.mark.asyncio
+async def test_run():
+    assert await run("printf out; printf err >&2; exit 3") == (3, "out", "err")
+
+
+@pytest.mark.asyncio
+async def test_run_truncates_while_reading():
+    # far more output than fits in a pipe, which must be drained to the end
+    returncode, stdout, stderr = await run(
+        "seq 1 1000000; echo done >&2", truncate_after=100
+    )
+    assert returncode == 0
+    expected = "".join(f"{i}\n" for i in range(1, 100))
+    assert stdout == maybe_truncate(expected, truncate_after=100)
+    assert stdout.endswith(TRUNCATED_MESSAGE)
+    assert stderr == "done\n"
+
+
+@pytest.mark.asyncio
+async def test_run_decodes_split_utf8(monkeypatch):
+    monkeypatch.setattr("computer_use_demo.tools.run.READ_SIZE", 1)
+    assert await run("printf 'héllo \\377'") == (0, "héllo �", "")
+
+
+@pytest.mark.asyncio
+async def test_run_timeout():
+    with pytest.raises(TimeoutError, match="timed out after 0.1 seconds"):
+        await run("sleep 5", timeout=0.1)
+
+
+@pytest.mark.asyncio
+async def test_run_argv_without_shell(monkeypatch):
+    monkeypatch.setattr("computer_use_demo.tools.run.SPAWN_STATS", SpawnStats())
+    assert await run(["printf", "%s $X", "a;b"], env={"X": "1"}) == (0, "a;b $X", "")
+    assert await run("X=1 printenv X") == (0, "1\n", "")
+    assert await run(["no_such_binary"]) == (
+        127,
+        "",
+        "no_such_binary: command not found\n",
+    )
+    summary = run_module.SPAWN_STATS.summary()
+    assert set(summary) == {"printf", "sh -c printenv"}
+    assert summary["printf"]["count"] == 1
+    assert summary["printf"]["bytes_out"] == 6
+    assert summary["printf"]["failures"] == 0
+    assert summary["printf"]["p50_ms"] > 0
+
+
+@pytest.mark.asyncio
+async def test_run_writes_stdin():
+    # far more than a pipe buffers, or than fits in an argument
+    data = b"x" * 200_000
+    assert await run("wc -c", stdin=data) == (0, f"{len(data)}\n", "")
+    # a command that stops reading early must not fail the write
+    assert await run(["head", "-c", "1"], stdin=data) == (0, "x", "")
@@ -0,0 +1,46 @@
+from dataclasses import dataclass
+
+from computer_use_demo.tools.collection import ToolCollection
+from computer_use_demo.tools.groups import TOOL_GROUPS_BY_VERSION
+from computer_use_demo.tools.stats import SpanStats, percentiles_ms
+
+
+@dataclass(frozen=True)
+class FakeSpan:
+    label: str
+    elapsed: float
+
+
+def test_percentiles_ms():
+    assert percentiles_ms([0.003, 0.001, 0.002]) == {
+        "p50_ms": 2.0,
+        "p95_ms": 3.0,
+        "max_ms": 3.0,
+    }
+    assert percentiles_ms([], "wait_") == {
+        "wait_p50_ms": 0.0,
+        "wait_p95_ms": 0.0,
+        "wait_max_ms": 0.0,
+    }
+
+
+def test_span_stats_keeps_a_window_per_label():
+    stats = SpanStats[FakeSpan](window=2)
+    for elapsed in (1.0, 0.002, 0.004):
+        stats.record(FakeSpan("a", elapsed))
+    stats.record(FakeSpan("b", 0.5))
+    summary = stats.summary()
+    assert summary["a"] == {"count": 2, "p50_ms": 3.0, "p95_ms": 4.0, "max_ms": 4.0}
+    assert summary["b"]["count"] == 1
+
+
+def test_tool_collection_stats():
+    collection = ToolCollection(
+        *TOOL_GROUPS_BY_VERSION["computer_use_20250124"].create_tools()
+    )
+    stats = collection.stats()
+    # custom tools report nothing of their own
+    assert set(stats) == {"computer", "bash", "str_replace_editor"}
+    assert "settle" in stats["computer"]
+    assert "cold_starts" in stats["bash"]["session_pool"]
+    assert "io" in stats["str_replace_editor"]